@@ -1,26 +1,43 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, make_response, send_file
+from flask import Flask, render_template, request, redirect, url_for, flash, make_response, send_file, send_from_directory, abort, g, jsonify
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.orm import Session, contains_eager, selectinload
+from sqlalchemy.orm.attributes import get_history
+from sqlalchemy.exc import IntegrityError
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from flask_wtf import FlaskForm
 from flask_wtf.csrf import CSRFProtect
 from wtforms import StringField, PasswordField, SelectField, SubmitField, FileField, MultipleFileField, TextAreaField, IntegerField, FloatField, SelectMultipleField, FieldList, FormField
 from wtforms.validators import DataRequired, Length, EqualTo, Optional, NumberRange
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import generate_password_hash, check_password_hash, safe_join
 from datetime import datetime, date
 import datetime as dt
-from functools import wraps
+from functools import wraps, lru_cache
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Table, LongTable, TableStyle, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 import pandas as pd
 import json
+import re
 import os
 import sys
 import io
+import tempfile
 from werkzeug.utils import secure_filename
 import uuid
+import hashlib
+import base64
+import random
+import threading
+import time
+import cProfile
+import pstats
+from concurrent.futures import ThreadPoolExecutor, Future
+from collections import OrderedDict, deque
+import queue
+from xml.sax.saxutils import escape
 
 # Load environment variables
 try:
@@ -31,7 +48,7 @@ except ImportError:
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-change-this-for-production'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///arcade.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///arcade.db')  # Override to run against another database
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['UPLOAD_FOLDER'] = 'static/uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
@@ -44,12 +61,114 @@ ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 MAX_PHOTOS_PER_RECORD = 10  # Limit photos per maintenance record
 MAX_TOTAL_STORAGE_MB = 500  # Total storage limit in MB
 
+# Photo derivatives generated at upload time (size name -> max dimensions).
+# 'full' keeps the uploaded filename, smaller sizes are saved next to it.
+PHOTO_SIZES = {
+    'full': (1200, 1200),
+    'medium': (640, 640),
+    'thumb': (200, 200)
+}
+
+# Optional smaller encodings written next to every JPEG (e.g. PHOTO_FORMATS=webp,avif).
+# Formats the installed Pillow can't encode are skipped. Photos are served in the
+# smallest variant the browser accepts, see serve_photo().
+PHOTO_FORMATS = [f.strip().lower() for f in os.getenv('PHOTO_FORMATS', '').split(',') if f.strip()]
+PHOTO_FORMAT_OPTIONS = {
+    'webp': {'quality': 80, 'method': 4},
+    'avif': {'quality': 60, 'speed': 6}
+}
+PHOTO_MIMETYPES = {
+    '.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.png': 'image/png', '.gif': 'image/gif',
+    '.webp': 'image/webp', '.avif': 'image/avif'
+}
+
+# Photo folders that serve_photo() may serve from (kind -> path under static/)
+PHOTO_FOLDERS = {
+    'maintenance': 'maintenance_photos',
+    'uploads': 'uploads',
+    'profile': 'profile_pics'
+}
+
+# Photos are compressed on a shared, bounded thread pool (Pillow releases the GIL
+# while resizing and encoding), so a 10 photo upload doesn't run one after another
+PHOTO_WORKERS = int(os.getenv('PHOTO_WORKERS', str(min(4, os.cpu_count() or 1))))
+photo_executor = ThreadPoolExecutor(max_workers=PHOTO_WORKERS, thread_name_prefix='photo')
+
+# Images without stored derivatives are resized on request by /img/<kind>/<filename>?w=
+# and kept in a bounded disk cache (least recently used files are evicted first)
+IMAGE_CACHE_DIR = os.getenv('IMAGE_CACHE_DIR', os.path.join(app.root_path, 'image_cache'))
+IMAGE_CACHE_MAX_MB = int(os.getenv('IMAGE_CACHE_MAX_MB', '200'))
+IMAGE_RESIZE_WIDTHS = (80, 160, 320, 480, 640, 960, 1200)  # Requested widths are rounded up to one of these
+
+# Media URLs from get_image_url/get_cloud_url are fingerprinted, so browsers may keep
+# the files for a year without revalidating. MEDIA_SENDFILE hands the file transfer
+# to the front proxy: 'x-accel-redirect' (nginx, internal location MEDIA_ACCEL_PREFIX
+# aliased to the app directory) or 'x-sendfile' (Apache mod_xsendfile, lighttpd).
+MEDIA_MAX_AGE = 365 * 24 * 60 * 60
+MEDIA_SENDFILE = os.getenv('MEDIA_SENDFILE', '').lower()
+MEDIA_ACCEL_PREFIX = os.getenv('MEDIA_ACCEL_PREFIX', '/_media')
+CONTENT_ADDRESSED_NAME = re.compile(r'[0-9a-f]{64}(_[a-z]+)?\.[a-z0-9]+')
+
+# Stored photos live in two-level hashed subdirectories (ab/cd/<name>) so no single
+# directory grows past a few hundred files. References stored in the database are
+# the relative path; files stored before shard_photo_store.py ran sit at the top
+# of the folder and are still found by media_path().
+SHARD_DEPTH = 2
+
 # Cloud storage configuration (set these via environment variables)
 USE_CLOUD_STORAGE = os.getenv('USE_CLOUD_STORAGE', 'false').lower() == 'true'
 AWS_ACCESS_KEY_ID = os.getenv('AWS_ACCESS_KEY_ID')
 AWS_SECRET_ACCESS_KEY = os.getenv('AWS_SECRET_ACCESS_KEY')
 AWS_BUCKET_NAME = os.getenv('AWS_BUCKET_NAME', 'arcade-tracker-photos')
 AWS_REGION = os.getenv('AWS_REGION', 'us-east-1')
+AWS_S3_ENDPOINT_URL = os.getenv('AWS_S3_ENDPOINT_URL')  # S3 compatible stand-in (moto server, MinIO); unset for AWS
+
+# Cloud uploads go through a durable outbox (CloudUpload) drained by a background
+# worker thread, so a slow or failing S3 never holds up a photo upload request
+CLOUD_UPLOAD_WORKERS = int(os.getenv('CLOUD_UPLOAD_WORKERS', '4'))  # Parallel uploads (and S3 connection pool size)
+CLOUD_UPLOAD_MAX_ATTEMPTS = int(os.getenv('CLOUD_UPLOAD_MAX_ATTEMPTS', '6'))
+CLOUD_UPLOAD_RETRY_SECONDS = float(os.getenv('CLOUD_UPLOAD_RETRY_SECONDS', '30'))  # First retry delay, doubled per attempt
+CLOUD_UPLOAD_POLL_SECONDS = float(os.getenv('CLOUD_UPLOAD_POLL_SECONDS', '30'))
+CLOUD_UPLOAD_LEASE_SECONDS = float(os.getenv('CLOUD_UPLOAD_LEASE_SECONDS', '600'))  # A claimed entry is retried after this
+CLOUD_UPLOAD_BUFFER_SECONDS = float(os.getenv('CLOUD_UPLOAD_BUFFER_SECONDS', '300'))  # Queued bytes kept in memory this long
+CLOUD_UPLOAD_BUFFER_MAX_MB = int(os.getenv('CLOUD_UPLOAD_BUFFER_MAX_MB', '64'))  # and at most this much of them
+cloud_upload_executor = ThreadPoolExecutor(max_workers=CLOUD_UPLOAD_WORKERS, thread_name_prefix='cloud-upload')
+
+# On-demand request profiling (admins only, off unless enabled)
+PROFILER_ENABLED = os.getenv('ENABLE_REQUEST_PROFILER', 'false').lower() == 'true'
+PROFILE_DIR = os.path.join(app.root_path, 'profiles')
+MAX_STORED_PROFILES = int(os.getenv('MAX_STORED_PROFILES', '20'))  # Oldest profiles are removed beyond this
+
+# Read-only JSON API (/api/v1) page sizes, rows per request
+API_PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', '100'))
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', '1000'))
+READINGS_BATCH_MAX = int(os.getenv('READINGS_BATCH_MAX', '1000'))  # Entries per /api/v1/readings:batch request
+
+# Live updates (/events, Server-Sent Events) are fanned out from one broadcaster per
+# process. Reconnecting clients get up to LIVE_EVENTS_BACKLOG missed events replayed.
+LIVE_EVENTS_BACKLOG = int(os.getenv('LIVE_EVENTS_BACKLOG', '200'))
+LIVE_EVENTS_QUEUE_SIZE = int(os.getenv('LIVE_EVENTS_QUEUE_SIZE', '500'))  # A subscriber this far behind is dropped
+LIVE_EVENTS_KEEPALIVE_SECONDS = float(os.getenv('LIVE_EVENTS_KEEPALIVE_SECONDS', '15'))
+
+# Seconds the home dashboard numbers are reused before they are queried again
+DASHBOARD_CACHE_SECONDS = float(os.getenv('DASHBOARD_CACHE_SECONDS', '30'))
+
+# Revenue report buckets, finest first, with their length in days
+REVENUE_BUCKET_DAYS = {'day': 1, 'week': 7, 'month': 28}
+
+# Maintenance orders listed per page on the orders and reports pages
+MAINTENANCE_PAGE_SIZE = int(os.getenv('MAINTENANCE_PAGE_SIZE', '50'))
+
+# Seconds between full reloads of the MTBF/MTTR numbers. Work order changes made by
+# this process refresh their game on the next read; this bounds how long changes
+# made by other processes (workers, scripts) take to show up.
+RELIABILITY_CACHE_SECONDS = float(os.getenv('RELIABILITY_CACHE_SECONDS', '300'))
+
+# Full-detail PDF exports (?detail=full): rows per table chunk, rows fetched per
+# database round trip, and PDF size kept in memory before spooling to disk
+PDF_TABLE_CHUNK_ROWS = int(os.getenv('PDF_TABLE_CHUNK_ROWS', '200'))
+PDF_FETCH_ROWS = int(os.getenv('PDF_FETCH_ROWS', '1000'))
+PDF_SPOOL_MAX_BYTES = int(os.getenv('PDF_SPOOL_MAX_MB', '16')) * 1024 * 1024
 
 db = SQLAlchemy(app)
 login_manager = LoginManager()
@@ -65,97 +184,651 @@ def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def compress_and_save_image(file, file_path, max_size=(1200, 1200), quality=85):
-    """Compress image while maintaining reasonable quality"""
+def derivative_filename(filename, size):
+    """Get the filename of a photo derivative ('full' is the photo itself)"""
+    if size == 'full' or size not in PHOTO_SIZES:
+        return filename
+    name_part, _ = os.path.splitext(filename)
+    return f"{name_part}_{size}.jpg"
+
+def alternate_filename(filename, fmt):
+    """Get the filename of a photo's WebP/AVIF variant (stored next to the JPEG)"""
+    name_part, _ = os.path.splitext(filename)
+    return f"{name_part}.{fmt}"
+
+def derivative_filenames(filename):
+    """Get the filenames of a photo and all of its derivatives and format variants"""
+    names = [derivative_filename(filename, size) for size in PHOTO_SIZES]
+    return names + [alternate_filename(name, fmt) for name in names for fmt in PHOTO_FORMAT_OPTIONS]
+
+def shard_directory(filename):
+    """Shard subdirectory of a photo ('ab/cd'), shared by its derivatives and variants"""
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    for size in PHOTO_SIZES:
+        if stem.endswith(f'_{size}'):
+            stem = stem[:-len(size) - 1]
+            break
+    key = stem if re.fullmatch(r'[0-9a-f]{64}', stem) else hashlib.sha1(stem.encode()).hexdigest()
+    return '/'.join(key[i * 2:i * 2 + 2] for i in range(SHARD_DEPTH))
+
+def sharded_filename(filename):
+    """Reference of a file in the sharded layout ('<name>' -> 'ab/cd/<name>')"""
+    name = os.path.basename(filename)
+    return f'{shard_directory(name)}/{name}'
+
+def is_sharded_filename(filename):
+    """Whether a reference already points into the sharded layout"""
+    return filename == sharded_filename(filename)
+
+@lru_cache(maxsize=None)
+def enabled_photo_formats():
+    """PHOTO_FORMATS the installed Pillow can encode"""
     try:
         from PIL import Image
-        
-        # Open the uploaded image
-        image = Image.open(file)
-        
-        # Convert RGBA to RGB if necessary (for JPEG compatibility)
-        if image.mode in ('RGBA', 'LA'):
-            background = Image.new('RGB', image.size, (255, 255, 255))
-            background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-            image = background
-        elif image.mode != 'RGB':
-            image = image.convert('RGB')
-        
-        # Resize if image is too large
-        image.thumbnail(max_size, Image.Resampling.LANCZOS)
+        Image.init()
+    except ImportError:
+        return ()
+    return tuple(fmt for fmt in PHOTO_FORMATS if fmt in PHOTO_FORMAT_OPTIONS and fmt.upper() in Image.SAVE)
+
+def save_alternate_formats(image, file_path, formats=None):
+    """Write WebP/AVIF variants of an already decoded image next to file_path.
+    
+    Returns a dict of format -> path for every variant written.
+    """
+    if formats is None:
+        formats = enabled_photo_formats()
+    saved = {}
+    for fmt in formats:
+        variant_path = alternate_filename(file_path, fmt)
+        image.save(variant_path, fmt.upper(), **PHOTO_FORMAT_OPTIONS[fmt])
+        saved[fmt] = variant_path
+    return saved
+
+def choose_photo_variant(kind, filename, accept_mimetypes):
+    """Path of the smallest stored variant of filename that the client accepts.
+    
+    Only types the client lists explicitly count, so clients sending just */*
+    keep getting the JPEG.
+    """
+    accepted = {value for value, quality in accept_mimetypes if quality > 0}
+    candidates = [filename] + [alternate_filename(filename, fmt) for fmt in PHOTO_FORMAT_OPTIONS
+                               if PHOTO_MIMETYPES[f'.{fmt}'] in accepted]
+    sizes = []
+    for candidate in candidates:
+        path = media_path(kind, candidate)
+        try:
+            sizes.append((os.path.getsize(path), path))
+        except OSError:
+            continue
+    return min(sizes)[1] if sizes else media_path(kind, filename)
+
+def prepare_image(file, max_size=PHOTO_SIZES['full']):
+    """Decode an uploaded image into an RGB image no larger than max_size.
+    
+    Raises if the upload is not a decodable image. The result carries no metadata
+    (EXIF, GPS, ICC); the EXIF orientation is applied to the pixels first.
+    """
+    from PIL import Image, ImageOps
+    
+    # Open the uploaded image
+    image = Image.open(file)
+    
+    # Let the JPEG decoder downscale while decoding instead of decoding all 12MP
+    image.draft('RGB', max_size)
+    
+    # Phone photos are often stored sideways with an orientation tag
+    image = ImageOps.exif_transpose(image)
+    
+    # Convert RGBA to RGB if necessary (for JPEG compatibility)
+    if image.mode in ('RGBA', 'LA'):
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
+        image = background
+    elif image.mode != 'RGB':
+        image = image.convert('RGB')
+    
+    # Resize if image is too large
+    image.thumbnail(max_size, Image.Resampling.LANCZOS)
+    return image
+
+class HashingWriter:
+    """File wrapper that computes the SHA-256 and size of everything written through it"""
+    
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+    
+    def write(self, data):
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.fileobj.write(data)
+    
+    def flush(self):
+        # No fileno() on purpose, encoders would write to the descriptor and skip the hash
+        self.fileobj.flush()
+
+class MemoryviewReader(io.RawIOBase):
+    """Seekable read-only file over a memoryview, so uploaders can stream a buffer without copying it"""
+    
+    def __init__(self, data):
+        self._data = memoryview(data).cast('B')
+        self._position = 0
+    
+    def readable(self):
+        return True
+    
+    def seekable(self):
+        return True
+    
+    def readinto(self, buffer):
+        count = max(0, min(len(buffer), len(self._data) - self._position))
+        buffer[:count] = self._data[self._position:self._position + count]
+        self._position += count
+        return count
+    
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._data)}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+    
+    def tell(self):
+        return self._position
+
+def encode_image(image, fmt, **options):
+    """Encode image into memory, hashing the bytes as the encoder writes them.
+    
+    Returns (data, sha256 hex digest) where data is a memoryview of the encoded file.
+    """
+    buffer = io.BytesIO()
+    writer = HashingWriter(buffer)
+    image.save(writer, fmt, **options)
+    return buffer.getbuffer(), writer.sha256.hexdigest()
+
+def encode_derivatives(image, quality=85, derivatives=True):
+    """Encode the enabled PHOTO_FORMATS variants of image and, if derivatives is set,
+    the smaller PHOTO_SIZES versions and their variants.
+    
+    Each smaller size is resized from the previous one, largest first.
+    Returns a dict of key ('full.webp', 'thumb', 'thumb.webp', ...) -> memoryview.
+    """
+    from PIL import Image
+    
+    encoded = {}
+    for fmt in enabled_photo_formats():
+        encoded[f'full.{fmt}'], _ = encode_image(image, fmt.upper(), **PHOTO_FORMAT_OPTIONS[fmt])
+    if derivatives:
+        for size, dimensions in sorted(PHOTO_SIZES.items(), key=lambda x: x[1], reverse=True):
+            if size == 'full':
+                continue
+            image = image.copy()
+            image.thumbnail(dimensions, Image.Resampling.LANCZOS)
+            encoded[size], _ = encode_image(image, 'JPEG', quality=quality, optimize=True)
+            for fmt in enabled_photo_formats():
+                encoded[f'{size}.{fmt}'], _ = encode_image(image, fmt.upper(), **PHOTO_FORMAT_OPTIONS[fmt])
+    return encoded
+
+def photo_set_filename(filename, key):
+    """Filename of one encoded file of a photo ('thumb.webp' -> <stem>_thumb.webp)"""
+    size, _, fmt = key.partition('.')
+    name = derivative_filename(filename, size)
+    return alternate_filename(name, fmt) if fmt else name
+
+def write_file(file_path, data):
+    """Write bytes (or a memoryview) to file_path atomically"""
+    temp_path = os.path.join(os.path.dirname(file_path), f'.upload_{uuid.uuid4().hex}')
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def compress_and_save_image(file, file_path, max_size=PHOTO_SIZES['full'], quality=85, derivatives=True):
+    """Compress image while maintaining reasonable quality.
+    
+    The upload is decoded once. The full size image is written to file_path and,
+    if derivatives is set, the smaller PHOTO_SIZES versions are written next to it.
+    Each JPEG also gets the enabled PHOTO_FORMATS variants ('thumb.webp' etc.).
+    Returns a dict of size name -> path for every file written.
+    """
+    saved_paths = {}
+    try:
+        image = prepare_image(file, max_size)
         
         # Save with compression
-        image.save(file_path, 'JPEG', quality=quality, optimize=True)
+        encoded = {'full': encode_image(image, 'JPEG', quality=quality, optimize=True)[0]}
+        encoded.update(encode_derivatives(image, quality, derivatives))
+        directory, filename = os.path.split(file_path)
+        for key, data in encoded.items():
+            path = os.path.join(directory, photo_set_filename(filename, key))
+            write_file(path, data)
+            saved_paths[key] = path
         
     except Exception as e:
         # Fallback: save original file if compression fails
         print(f"Compression failed, saving original: {e}")
         file.seek(0)  # Reset file pointer
         file.save(file_path)
+        saved_paths = {'full': file_path}
+    
+    return saved_paths
+
+def stored_filename(directory, name):
+    """Reference for a file named name in directory: flat if it was stored before sharding"""
+    if os.path.exists(os.path.join(directory, name)):
+        return name
+    return sharded_filename(name)
+
+def compress_and_store_image(file, directory, max_size=PHOTO_SIZES['full'], quality=85, derivatives=True,
+                             keep_invalid=True):
+    """Compress an upload like compress_and_save_image, stored under its content hash.
+    
+    Every size and variant is encoded once into memory; the same buffer is written
+    to disk and can be handed to the cloud uploader. The full size JPEG is hashed
+    while it is encoded, and an identical photo that is already stored is reused
+    without encoding the derivatives.
+    Returns (filename, saved) where filename is the sharded reference (or the flat
+    one of an identical photo stored before sharding) and saved maps size name ->
+    (path, memoryview) for every file written, empty when the photo was already stored.
+    
+    Uploads that can't be decoded are stored as-is if keep_invalid is set,
+    otherwise ValueError is raised.
+    """
+    os.makedirs(directory, exist_ok=True)
+    try:
+        image = prepare_image(file, max_size)
+    except Exception as e:
+        if not keep_invalid:
+            raise ValueError(f'{file.filename or "Upload"} is not a valid image') from e
+        # Fallback: store original file if compression fails
+        print(f"Compression failed, saving original: {e}")
+        file.seek(0)  # Reset file pointer
+        data = memoryview(file.read())
+        ext = os.path.splitext(secure_filename(file.filename or ''))[1].lower() or '.jpg'
+        filename = stored_filename(directory, f"{hashlib.sha256(data).hexdigest()}{ext}")
+        file_path = os.path.join(directory, filename)
+        if os.path.exists(file_path):
+            return filename, {}
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        write_file(file_path, data)
+        return filename, {'full': (file_path, data)}
+    
+    data, digest = encode_image(image, 'JPEG', quality=quality, optimize=True)
+    filename = stored_filename(directory, f"{digest}.jpg")
+    if os.path.exists(os.path.join(directory, filename)):
+        return filename, {}
+    os.makedirs(os.path.join(directory, os.path.dirname(filename)), exist_ok=True)
+    
+    encoded = {'full': data}
+    encoded.update(encode_derivatives(image, quality, derivatives))
+    saved = {}
+    try:
+        # Derivatives first, so the hash-named full size only appears once the set is complete
+        for key in sorted(encoded, key=lambda k: k == 'full'):
+            file_path = os.path.join(directory, photo_set_filename(filename, key))
+            write_file(file_path, encoded[key])
+            saved[key] = (file_path, encoded[key])
+    except Exception:
+        for file_path, _ in saved.values():
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        raise
+    return filename, saved
+
+def store_image_upload(file, kind):
+    """Run a game image or profile picture upload through the photo pipeline.
+    
+    The upload is validated by decoding it, resized, stripped of metadata and
+    stored with its derivatives under its content hash in the PHOTO_FOLDERS kind
+    folder. Returns (filename, saved) like compress_and_store_image(); pass them
+    to reference_upload() with the record. Raises ValueError for files that
+    aren't images.
+    """
+    return compress_and_store_image(file, photo_folder(kind), keep_invalid=False)
+
+def compress_images_concurrently(jobs):
+    """Run compress_and_store_image for (file, directory) jobs on the photo pool.
+    
+    Returns one ((filename, saved), error) tuple per job, in the same order as jobs.
+    """
+    futures = [photo_executor.submit(compress_and_store_image, file, directory) for file, directory in jobs]
+    results = []
+    for future in futures:
+        try:
+            results.append((future.result(), None))
+        except Exception as e:
+            results.append((None, e))
+    return results
+
+def photo_folder(kind):
+    """Absolute path of a PHOTO_FOLDERS folder"""
+    return os.path.join(app.static_folder, PHOTO_FOLDERS[kind])
+
+def media_path(kind, filename):
+    """Absolute path of a stored file from its reference, in either layout.
+    
+    A flat reference finds the file in its shard once shard_photo_store.py has
+    moved it, and a sharded one finds a file that hasn't been moved yet. If the
+    file exists in neither place the path the reference names is returned.
+    """
+    directory = photo_folder(kind)
+    path = os.path.join(directory, filename)
+    if os.path.exists(path):
+        return path
+    name = os.path.basename(filename)
+    other = os.path.join(directory, name if name != filename else sharded_filename(name))
+    return other if os.path.exists(other) else path
+
+def add_file_reference(kind, filename, size_bytes=None):
+    """Count one more record referencing a stored file (commit with the record).
+    
+    size_bytes is the total size of the file and its derivatives if the caller
+    already knows it, otherwise the file on disk is measured. The reference is
+    flushed right away, so a stored file can be reused once this returns: its
+    row stays locked until commit and delete_unreferenced_file() can't remove
+    it in between. Returns False if the file is missing from disk (it was
+    deleted after compress_and_store_image() found it) and must be stored again.
+    """
+    filters = {'kind': kind, 'filename': filename}
+    if not StoredFile.query.filter_by(**filters).update(
+            {StoredFile.ref_count: StoredFile.ref_count + 1}, synchronize_session=False):
+        file_path = media_path(kind, filename)
+        if size_bytes is None:
+            size_bytes = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+        try:
+            with db.session.begin_nested():
+                db.session.add(StoredFile(kind=kind, filename=filename, size_bytes=size_bytes, ref_count=1))
+        except IntegrityError:
+            # Another first upload of the same file inserted the row meanwhile
+            StoredFile.query.filter_by(**filters).update(
+                {StoredFile.ref_count: StoredFile.ref_count + 1}, synchronize_session=False)
+    return os.path.exists(media_path(kind, filename))
+
+def reference_upload(kind, file, filename, saved):
+    """add_file_reference() for an upload stored by compress_and_store_image().
+    
+    If the identical file it was deduplicated to has been deleted since, the
+    upload is stored again. Returns saved, or the files written the second time.
+    """
+    size_bytes = sum(len(data) for _, data in saved.values()) or None
+    if not add_file_reference(kind, filename, size_bytes):
+        file.seek(0)
+        filename, saved = compress_and_store_image(file, photo_folder(kind))
+        if saved:
+            StoredFile.query.filter_by(kind=kind, filename=filename).update(
+                {StoredFile.size_bytes: sum(len(data) for _, data in saved.values())}, synchronize_session=False)
+    return saved
+
+def release_file_reference(kind, filename):
+    """Drop one reference to a stored file.
+    
+    Returns True when nothing references the file any more, so it can be deleted
+    with delete_unreferenced_file() once the change is committed. Files stored
+    before reference counting have no StoredFile row and belong to a single record.
+    """
+    filters = {'kind': kind, 'filename': filename}
+    if not StoredFile.query.filter_by(**filters).filter(StoredFile.ref_count > 0).update(
+            {StoredFile.ref_count: StoredFile.ref_count - 1}, synchronize_session=False):
+        return True
+    # The row is locked by the update, so the count read back is this transaction's
+    return db.session.query(StoredFile.ref_count).filter_by(**filters).scalar() <= 0
+
+def delete_unreferenced_file(kind, filename):
+    """Delete a released file from disk, unless it has been referenced again.
+    
+    Runs in its own transaction after the release is committed. The StoredFile
+    row is only deleted while its ref_count is 0, and the files are removed
+    before that commits, so an upload reusing the file concurrently either
+    takes its reference first (and the file is kept) or waits and stores it
+    again. Returns True if the file was deleted.
+    """
+    deleted = db.session.execute(db.delete(StoredFile).where(
+        StoredFile.kind == kind, StoredFile.filename == filename, StoredFile.ref_count <= 0)).rowcount
+    if not deleted and db.session.query(StoredFile.id).filter_by(kind=kind, filename=filename).first():
+        db.session.commit()
+        return False
+    try:
+        delete_stored_file(kind, filename)
+    except Exception:
+        db.session.rollback()
+        raise
+    db.session.commit()
+    return True
+
+def delete_stored_file(kind, filename):
+    """Remove a stored file and its derivatives and variants from disk"""
+    for name in derivative_filenames(filename):
+        path = media_path(kind, name)
+        if os.path.exists(path):
+            os.remove(path)
+
+class ResizedImageCache:
+    """Bounded on-disk cache of resized images, evicting the least recently used files by total bytes.
+    
+    Concurrent requests for the same entry wait for a single resize instead of
+    each doing their own.
+    """
+    
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = None  # path -> size, least recently used first (loaded on first use)
+        self._total_bytes = 0
+        self._in_flight = {}  # path -> Future of a resize in progress
+    
+    def _load(self):
+        """Index the files left by earlier runs, oldest modification time first"""
+        files = []
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.startswith('.'):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, path, stat.st_size))
+        self._entries = OrderedDict((path, size) for _, path, size in sorted(files))
+        self._total_bytes = sum(self._entries.values())
+    
+    def _evict(self):
+        """Remove least recently used files until the cache fits (the newest entry always stays)"""
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            path, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
+    def get(self, key, render):
+        """Get the path of the cached file for key, calling render(path) to create it on a miss"""
+        path = os.path.join(self.directory, key)
+        with self._lock:
+            if self._entries is None:
+                self._load()
+            if path in self._entries:
+                if os.path.exists(path):
+                    self._entries.move_to_end(path)
+                    future = None
+                else:
+                    self._total_bytes -= self._entries.pop(path)
+            if path not in self._entries:
+                future = self._in_flight.get(path)
+                if future is not None:
+                    owner = False
+                else:
+                    future = self._in_flight[path] = Future()
+                    owner = True
+        
+        if future is None:
+            # Hit: the modification time keeps the LRU order across restarts
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return path
+        if not owner:
+            return future.result(timeout=60)
+        
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            render(path)
+            size = os.path.getsize(path)
+            with self._lock:
+                self._entries[path] = size
+                self._total_bytes += size
+                self._evict()
+            future.set_result(path)
+            return path
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(path, None)
+
+resized_image_cache = ResizedImageCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_MB * 1024 * 1024)
+
+def resize_image_file(source_path, width, target_path):
+    """Write a JPEG of the image at source_path, at most width pixels wide, to target_path"""
+    with open(source_path, 'rb') as f:
+        image = prepare_image(f, (width, width * 4))
+        data, _ = encode_image(image, 'JPEG', quality=85, optimize=True)
+    write_file(target_path, data)
+
+def get_directory_stats(directory):
+    """Get (total size in bytes, file count) of a directory tree, one stat per entry"""
+    total_size = 0
+    file_count = 0
+    pending = [directory]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total_size += entry.stat(follow_symlinks=False).st_size
+                            file_count += 1
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total_size, file_count
 
 def get_directory_size(directory):
     """Get total size of directory in MB"""
-    total_size = 0
-    try:
-        for dirpath, dirnames, filenames in os.walk(directory):
-            for filename in filenames:
-                filepath = os.path.join(dirpath, filename)
-                if os.path.exists(filepath):
-                    total_size += os.path.getsize(filepath)
-    except OSError:
-        return 0
-    return total_size / (1024 * 1024)  # Convert to MB
+    return get_directory_stats(directory)[0] / (1024 * 1024)  # Convert to MB
+
+def photo_set_reference(filename):
+    """Reference of the full size photo that a stored file (derivative, variant or photo) belongs to"""
+    directory, name = os.path.split(filename)
+    stem, ext = os.path.splitext(name)
+    for size in PHOTO_SIZES:
+        if stem.endswith(f'_{size}'):
+            stem = stem[:-len(size) - 1]
+            break
+    else:
+        if ext[1:].lower() not in PHOTO_FORMAT_OPTIONS:
+            return filename
+    return os.path.join(directory, f'{stem}.jpg')
 
 def cleanup_old_photos(max_age_days=365):
-    """Remove photos older than specified days"""
+    """Remove photos older than specified days that nothing references"""
     from datetime import timedelta
-    upload_dir = os.path.join(app.root_path, 'static', 'maintenance_photos')
+    upload_dir = photo_folder('maintenance')
     cutoff_date = datetime.now() - timedelta(days=max_age_days)
     removed_count = 0
     
     try:
-        for filename in os.listdir(upload_dir):
-            filepath = os.path.join(upload_dir, filename)
-            if os.path.isfile(filepath):
+        # Photos (and their derivatives) still referenced in the database, by their
+        # path in the sharded layout whichever layout the reference uses. Shared
+        # photos count as referenced while their StoredFile row has references.
+        referenced = set()
+        for (photos,) in db.session.query(MaintenanceRecord.photos).filter(MaintenanceRecord.photos.isnot(None)):
+            try:
+                for photo in json.loads(photos) or []:
+                    referenced.update(sharded_filename(name) for name in derivative_filenames(photo))
+            except (json.JSONDecodeError, TypeError):
+                continue
+        for (photo,) in db.session.query(StoredFile.filename).filter(
+                StoredFile.kind == 'maintenance', StoredFile.ref_count > 0):
+            referenced.update(sharded_filename(name) for name in derivative_filenames(photo))
+        
+        stale = set()
+        for dirpath, dirnames, filenames in os.walk(upload_dir):
+            for filename in filenames:
+                filepath = os.path.join(dirpath, filename)
                 file_date = datetime.fromtimestamp(os.path.getctime(filepath))
-                if file_date < cutoff_date:
-                    # Check if file is still referenced in database
-                    records = MaintenanceRecord.query.all()
-                    is_referenced = any(filename in (record.get_photos() or []) for record in records)
-                    
-                    if not is_referenced:
-                        os.remove(filepath)
-                        removed_count += 1
+                if file_date < cutoff_date and sharded_filename(filename) not in referenced:
+                    stale.add(photo_set_reference(os.path.relpath(filepath, upload_dir).replace(os.sep, '/')))
+        db.session.commit()
+        
+        # Removed with their StoredFile row, unless an upload has referenced them again meanwhile
+        for photo in sorted(stale):
+            if delete_unreferenced_file('maintenance', photo):
+                removed_count += 1
     except Exception as e:
         print(f"Cleanup error: {e}")
     
     return removed_count
 
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+def get_s3_client():
+    """Get the shared S3 client, created on first use.
+    
+    boto3 clients are thread-safe and keep a connection pool, so one client
+    serves every upload thread.
+    """
+    global _s3_client
+    with _s3_client_lock:
+        if _s3_client is None:
+            import boto3
+            from botocore.config import Config
+            
+            _s3_client = boto3.client(
+                's3',
+                aws_access_key_id=AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+                region_name=AWS_REGION,
+                endpoint_url=AWS_S3_ENDPOINT_URL,
+                config=Config(max_pool_connections=max(10, CLOUD_UPLOAD_WORKERS))
+            )
+    return _s3_client
+
+def cloud_object_url(key):
+    """Public URL of an object in the photo bucket"""
+    if AWS_S3_ENDPOINT_URL:
+        return f'{AWS_S3_ENDPOINT_URL.rstrip("/")}/{AWS_BUCKET_NAME}/{key}'
+    return f'https://{AWS_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/{key}'
+
+def put_cloud_object(key, file_data):
+    """Upload bytes to the photo bucket, returns the object URL (raises on failure)"""
+    get_s3_client().put_object(
+        Bucket=AWS_BUCKET_NAME,
+        Key=key,
+        Body=file_data,
+        ContentType=PHOTO_MIMETYPES.get(os.path.splitext(key)[1].lower(), 'image/jpeg')
+    )
+    return cloud_object_url(key)
+
 def upload_to_cloud(file_data, filename):
     """Upload file to cloud storage (AWS S3)"""
     if not USE_CLOUD_STORAGE:
         return None
     
     try:
-        import boto3
         from botocore.exceptions import NoCredentialsError, ClientError
         
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-            region_name=AWS_REGION
-        )
-        
-        # Upload file
-        s3_client.put_object(
-            Bucket=AWS_BUCKET_NAME,
-            Key=f'maintenance_photos/{filename}',
-            Body=file_data,
-            ContentType='image/jpeg'
-        )
-        
-        return f'https://{AWS_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/maintenance_photos/{filename}'
+        return put_cloud_object(f'maintenance_photos/{os.path.basename(filename)}', file_data)
         
     except (NoCredentialsError, ClientError) as e:
         print(f'Cloud upload failed: {e}')
@@ -164,11 +837,198 @@ def upload_to_cloud(file_data, filename):
         print('boto3 not installed. Install with: pip install boto3')
         return None
 
-def get_cloud_url(filename):
-    """Get cloud URL for a photo"""
+# Encoded bytes of freshly committed uploads, so the worker uploads them without reading
+# them back from disk. Retries and files queued by another process read the disk copy.
+# Entries another process uploads are never popped here, so they expire after
+# CLOUD_UPLOAD_BUFFER_SECONDS and the oldest are dropped beyond CLOUD_UPLOAD_BUFFER_MAX_MB.
+_cloud_upload_buffers = OrderedDict()  # (kind, filename) -> (expires_at, data), oldest first
+_cloud_upload_buffers_lock = threading.Lock()
+
+def queue_cloud_upload(kind, filename, data=None):
+    """Add a stored file to the cloud upload outbox (commit with the record, then wake_cloud_upload_worker).
+    
+    data is the file's encoded bytes (a memoryview) if the caller still holds them.
+    They are kept for the worker once the transaction commits.
+    """
+    if USE_CLOUD_STORAGE:
+        db.session.add(CloudUpload(kind=kind, filename=filename))
+        if data is not None:
+            db.session.info.setdefault('cloud_upload_buffers', {})[(kind, filename)] = data
+
+@event.listens_for(Session, 'after_commit')
+def keep_cloud_upload_buffers(session):
+    """Hand the buffers of committed outbox entries to the upload worker"""
+    buffers = session.info.pop('cloud_upload_buffers', None)
+    if not buffers:
+        return
+    now = time.monotonic()
+    with _cloud_upload_buffers_lock:
+        for key, data in buffers.items():
+            _cloud_upload_buffers.pop(key, None)
+            _cloud_upload_buffers[key] = (now + CLOUD_UPLOAD_BUFFER_SECONDS, data)
+        total = sum(memoryview(data).nbytes for _, data in _cloud_upload_buffers.values())
+        while _cloud_upload_buffers:
+            key, (expires_at, data) = next(iter(_cloud_upload_buffers.items()))
+            if expires_at > now and total <= CLOUD_UPLOAD_BUFFER_MAX_MB * 1024 * 1024:
+                break
+            del _cloud_upload_buffers[key]
+            total -= memoryview(data).nbytes
+
+@event.listens_for(Session, 'after_rollback')
+def discard_cloud_upload_buffers(session):
+    session.info.pop('cloud_upload_buffers', None)
+
+def upload_stored_file(kind, filename):
+    """Upload one file from a PHOTO_FOLDERS folder, returns its URL (runs on the upload pool)"""
+    # Buckets keep the flat layout: object keys are content hashes already
+    key = f'{PHOTO_FOLDERS[kind]}/{os.path.basename(filename)}'
+    with _cloud_upload_buffers_lock:
+        buffered = _cloud_upload_buffers.pop((kind, filename), None)
+    if buffered is not None:
+        return put_cloud_object(key, MemoryviewReader(buffered[1]))
+    with open(media_path(kind, filename), 'rb') as f:
+        return put_cloud_object(key, f)
+
+def claim_cloud_uploads(limit=100):
+    """Claim up to limit due outbox entries for this worker and return them.
+    
+    Each entry is moved to Uploading with a lease of CLOUD_UPLOAD_LEASE_SECONDS
+    by a conditional UPDATE, so when several processes run a worker only one
+    of them gets it. Uploading entries whose lease ran out (their worker died)
+    are due again.
+    """
+    now = datetime.now(dt.UTC)
+    due = (CloudUpload.status.in_(('Pending', 'Uploading')), CloudUpload.next_attempt_at <= now)
+    candidate_ids = [entry_id for (entry_id,) in db.session.query(CloudUpload.id).filter(*due)
+                     .order_by(CloudUpload.id).limit(limit)]
+    lease_until = now + dt.timedelta(seconds=CLOUD_UPLOAD_LEASE_SECONDS)
+    claimed_ids = []
+    for entry_id in candidate_ids:
+        result = db.session.execute(
+            db.update(CloudUpload).where(CloudUpload.id == entry_id, *due)
+            .values(status='Uploading', next_attempt_at=lease_until)
+            .execution_options(synchronize_session=False))
+        if result.rowcount == 1:
+            claimed_ids.append(entry_id)
+    db.session.commit()
+    if not claimed_ids:
+        return []
+    return CloudUpload.query.filter(CloudUpload.id.in_(claimed_ids)).order_by(CloudUpload.id).all()
+
+def process_cloud_uploads(limit=100):
+    """Upload the outbox entries that are due, in parallel on the upload pool.
+    
+    Failed uploads are retried with exponential backoff until
+    CLOUD_UPLOAD_MAX_ATTEMPTS, then marked Failed. Needs an app context.
+    Returns (uploaded, failed) counts.
+    """
+    entries = claim_cloud_uploads(limit)
+    futures = [(entry, cloud_upload_executor.submit(upload_stored_file, entry.kind, entry.filename))
+               for entry in entries]
+    
+    uploaded = failed = 0
+    for entry, future in futures:
+        entry.attempts = (entry.attempts or 0) + 1
+        try:
+            entry.url = future.result()
+            entry.status = 'Uploaded'
+            entry.uploaded_at = datetime.now(dt.UTC)
+            entry.last_error = None
+            uploaded += 1
+        except Exception as e:
+            failed += 1
+            entry.last_error = str(e)[:500]
+            if isinstance(e, FileNotFoundError) or entry.attempts >= CLOUD_UPLOAD_MAX_ATTEMPTS:
+                # Deleted before it was uploaded, or out of retries
+                entry.status = 'Failed'
+            else:
+                delay = CLOUD_UPLOAD_RETRY_SECONDS * 2 ** (entry.attempts - 1) * random.uniform(1.0, 1.25)
+                entry.status = 'Pending'
+                entry.next_attempt_at = datetime.now(dt.UTC) + dt.timedelta(seconds=delay)
+    if entries:
+        db.session.commit()
+    return uploaded, failed
+
+_cloud_upload_wakeup = threading.Event()
+_cloud_upload_thread = None
+_cloud_upload_thread_lock = threading.Lock()
+
+def _cloud_upload_loop():
+    """Drain the outbox, then sleep until woken or the next poll"""
+    while True:
+        try:
+            with app.app_context():
+                while sum(process_cloud_uploads()) == 100:
+                    pass  # A full batch, there may be more due
+        except Exception as e:
+            print(f'Cloud upload worker error: {e}')
+        _cloud_upload_wakeup.wait(CLOUD_UPLOAD_POLL_SECONDS)
+        _cloud_upload_wakeup.clear()
+
+def start_cloud_upload_worker():
+    """Start the background outbox worker for this process (no-op if it is running)"""
+    global _cloud_upload_thread
+    with _cloud_upload_thread_lock:
+        if _cloud_upload_thread is None or not _cloud_upload_thread.is_alive():
+            _cloud_upload_thread = threading.Thread(target=_cloud_upload_loop, name='cloud-upload-outbox', daemon=True)
+            _cloud_upload_thread.start()
+
+@app.before_request
+def ensure_cloud_upload_worker():
+    """Start the outbox worker with the first request, so uploads left pending by a previous run are picked up"""
+    if USE_CLOUD_STORAGE and _cloud_upload_thread is None:
+        start_cloud_upload_worker()
+
+def wake_cloud_upload_worker():
+    """Have the outbox worker pick up newly committed uploads now"""
+    if USE_CLOUD_STORAGE:
+        start_cloud_upload_worker()
+        _cloud_upload_wakeup.set()
+
+def media_fingerprint(kind, filename):
+    """Version string for a media URL, None if the filename is already a content hash"""
+    if CONTENT_ADDRESSED_NAME.fullmatch(os.path.basename(filename)):
+        return None
+    try:
+        stat = os.stat(media_path(kind, filename))
+    except OSError:
+        return None
+    return hashlib.sha1(f'{stat.st_mtime_ns}:{stat.st_size}'.encode()).hexdigest()[:12]
+
+def has_derivative(kind, filename, size):
+    """Whether a photo was stored with its derivative of a PHOTO_SIZES size.
+    
+    Content-hash JPEGs always are (the derivatives are written first), so only
+    older names cost a disk check.
+    """
+    if CONTENT_ADDRESSED_NAME.fullmatch(os.path.basename(filename)) and filename.endswith('.jpg'):
+        return True
+    return os.path.exists(media_path(kind, derivative_filename(filename, size)))
+
+def get_image_url(filename, kind='uploads', size='full'):
+    """Get the local URL of a stored image (game image by default), or of one of its PHOTO_SIZES derivatives.
+    
+    URLs are fingerprinted (content-hash names, or ?v= for older names) so they
+    can be cached as immutable.
+    """
+    if size != 'full' and size in PHOTO_SIZES:
+        if has_derivative(kind, filename, size):
+            filename = derivative_filename(filename, size)
+        else:
+            # Images stored before derivatives existed are resized on request
+            return url_for('resized_image', kind=kind, filename=filename, w=PHOTO_SIZES[size][0],
+                           v=media_fingerprint(kind, filename))
+    # Served through serve_photo() for the cache headers and so the browser gets WebP/AVIF when it can
+    return url_for('serve_photo', kind=kind, filename=filename, v=media_fingerprint(kind, filename))
+
+def get_cloud_url(filename, size='full'):
+    """Get cloud URL for a photo, or for one of its PHOTO_SIZES derivatives"""
     if USE_CLOUD_STORAGE and AWS_BUCKET_NAME:
-        return f'https://{AWS_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/maintenance_photos/{filename}'
-    return url_for('static', filename=f'maintenance_photos/{filename}')
+        # Photos uploaded before derivatives existed only have the full size
+        if size != 'full' and has_derivative('maintenance', filename, size):
+            filename = derivative_filename(filename, size)
+        return cloud_object_url(f'maintenance_photos/{os.path.basename(filename)}')
+    return get_image_url(filename, 'maintenance', size)
 
 @login_manager.user_loader
 def load_user(user_id):
@@ -176,7 +1036,7 @@ def load_user(user_id):
 
 @app.context_processor
 def utility_processor():
-    return dict(today=date.today, get_cloud_url=get_cloud_url)
+    return dict(today=date.today, get_cloud_url=get_cloud_url, get_image_url=get_image_url)
 
 # Permission decorator
 def requires_role(role):
@@ -192,6 +1052,93 @@ def requires_role(role):
         return decorated_function
     return decorator
 
+# Request profiling
+def _profiling_requested():
+    """Check if the current request asked to be profiled and is allowed to be"""
+    if not PROFILER_ENABLED:
+        return False
+    if request.args.get('__profile') != '1' and request.headers.get('X-Profile-Request') != '1':
+        return False
+    return current_user.is_authenticated and current_user.has_role('admin')
+
+def prune_request_profiles(max_profiles=MAX_STORED_PROFILES):
+    """Remove the oldest stored profiles beyond the retention limit"""
+    if not os.path.exists(PROFILE_DIR):
+        return 0
+    profile_files = [os.path.join(PROFILE_DIR, f) for f in os.listdir(PROFILE_DIR) if f.endswith('.prof')]
+    profile_files.sort(key=os.path.getmtime, reverse=True)
+    removed_count = 0
+    for filepath in profile_files[max_profiles:]:
+        try:
+            os.remove(filepath)
+            removed_count += 1
+        except OSError as e:
+            print(f"Could not remove old profile {filepath}: {e}")
+    return removed_count
+
+def request_profile_filename(endpoint):
+    """Name of a new .prof file for a request to endpoint"""
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return f"{timestamp}_{endpoint or 'unknown'}_{uuid.uuid4().hex[:8]}.prof"
+
+def save_request_profile(profiler, filename):
+    """Write profiler stats to a .prof file and enforce the retention limit"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profiler.dump_stats(os.path.join(PROFILE_DIR, filename))
+    prune_request_profiles()
+    return filename
+
+def list_request_profiles():
+    """Get stored profiles, newest first"""
+    profiles = []
+    if not os.path.exists(PROFILE_DIR):
+        return profiles
+    for filename in os.listdir(PROFILE_DIR):
+        if not filename.endswith('.prof'):
+            continue
+        filepath = os.path.join(PROFILE_DIR, filename)
+        try:
+            stats = pstats.Stats(filepath)
+            total_time = stats.total_tt
+        except Exception:
+            total_time = None
+        parts = filename[:-len('.prof')].split('_')
+        profiles.append({
+            'filename': filename,
+            'endpoint': '_'.join(parts[2:-1]) if len(parts) > 3 else 'unknown',
+            'size': os.path.getsize(filepath),
+            'created': datetime.fromtimestamp(os.path.getmtime(filepath)),
+            'total_time': total_time
+        })
+    profiles.sort(key=lambda x: x['created'], reverse=True)
+    return profiles
+
+@app.before_request
+def start_request_profiler():
+    if _profiling_requested():
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+@app.after_request
+def name_request_profile(response):
+    # The profile is saved on teardown, the name is chosen now so the response can carry it
+    if 'profiler' in g:
+        g.profile_filename = request_profile_filename(request.endpoint)
+        response.headers['X-Profile-File'] = g.profile_filename
+    return response
+
+@app.teardown_request
+def stop_request_profiler(exc):
+    # Runs even when the view raised and after_request was skipped
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return
+    profiler.disable()
+    try:
+        save_request_profile(profiler, g.pop('profile_filename', None) or request_profile_filename(request.endpoint))
+    except OSError as e:
+        print(f"Failed to save request profile: {e}")
+
 # Authentication Forms
 class LoginForm(FlaskForm):
     username = StringField('Username', validators=[DataRequired()])
@@ -264,6 +1211,15 @@ class MaintenanceWithInventoryForm(FlaskForm):
     submit = SubmitField('Save Maintenance Record')
 
 # Database Models
+class SyncTracked:
+    """Rows stamped with a sync version on every change, for the /api/v1/sync change feed.
+
+    The version is taken from SyncCounter once per flush (see stamp_sync_versions),
+    so it only grows, and deletes leave a SyncTombstone.
+    """
+    sync_version = db.Column(db.Integer, nullable=False, default=0, server_default='0', index=True)
+    updated_at = db.Column(db.DateTime, nullable=True, index=True)
+
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -295,7 +1251,7 @@ class User(UserMixin, db.Model):
     def get_id(self):
         return str(self.id)
 
-class Game(db.Model):
+class Game(SyncTracked, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     manufacturer = db.Column(db.String(50), nullable=True)
@@ -335,7 +1291,14 @@ class PlayRecord(db.Model):
     date_recorded = db.Column(db.Date, nullable=False, default=date.today)
     notes = db.Column(db.Text, nullable=True)
 
-class MaintenanceRecord(db.Model):
+class ReadingSubmission(db.Model):
+    """Idempotency key of a coin reading sent to /api/v1/readings:batch"""
+    id = db.Column(db.Integer, primary_key=True)
+    client_id = db.Column(db.String(64), unique=True, nullable=False)  # Generated by the handheld per reading
+    play_record_id = db.Column(db.Integer, db.ForeignKey('play_record.id', ondelete='SET NULL'), nullable=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(dt.UTC))
+
+class MaintenanceRecord(SyncTracked, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     game_id = db.Column(db.Integer, db.ForeignKey('game.id'), nullable=False)
     issue_description = db.Column(db.Text, nullable=False)
@@ -375,7 +1338,33 @@ class MaintenanceRecord(db.Model):
             photos.remove(filename)
             self.photos = json.dumps(photos) if photos else None
 
-class WorkLog(db.Model):
+class StoredFile(db.Model):
+    """A content-addressed photo or image, shared by every record that references it"""
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # PHOTO_FOLDERS key: maintenance, uploads, profile
+    filename = db.Column(db.String(255), nullable=False)  # <sha256>.<ext>
+    size_bytes = db.Column(db.Integer, default=0)  # File plus derivatives and variants, for quota accounting
+    ref_count = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(dt.UTC))
+    
+    __table_args__ = (db.UniqueConstraint('kind', 'filename'),)
+
+class CloudUpload(db.Model):
+    """Outbox of stored files waiting to be copied to cloud storage"""
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # PHOTO_FOLDERS key
+    filename = db.Column(db.String(255), nullable=False)
+    status = db.Column(db.String(20), default='Pending', nullable=False)  # Pending, Uploading, Uploaded, Failed
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, default=lambda: datetime.now(dt.UTC), nullable=False)
+    last_error = db.Column(db.Text, nullable=True)
+    url = db.Column(db.String(500), nullable=True)  # Final cloud URL once uploaded
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(dt.UTC))
+    uploaded_at = db.Column(db.DateTime, nullable=True)
+    
+    __table_args__ = (db.Index('ix_cloud_upload_due', 'status', 'next_attempt_at'),)
+
+class WorkLog(SyncTracked, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     maintenance_id = db.Column(db.Integer, db.ForeignKey('maintenance_record.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -387,7 +1376,7 @@ class WorkLog(db.Model):
     
     user = db.relationship('User', backref='work_logs')
 
-class InventoryItem(db.Model):
+class InventoryItem(SyncTracked, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=True)
@@ -467,6 +1456,180 @@ class InventoryRequest(db.Model):
     requested_by = db.relationship('User', backref='inventory_requests')
     item = db.relationship('InventoryItem', backref='requests')
 
+class SyncCounter(db.Model):
+    """Single row holding the last sync version handed out"""
+    id = db.Column(db.Integer, primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+class SyncTombstone(db.Model):
+    """A deleted SyncTracked row, so clients of /api/v1/sync drop their copy"""
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)  # SYNC_ENTITIES key
+    row_id = db.Column(db.Integer, nullable=False)
+    sync_version = db.Column(db.Integer, nullable=False, index=True)
+    deleted_at = db.Column(db.DateTime, default=lambda: datetime.now(dt.UTC))
+
+# Change feed entities (name used by /api/v1/sync -> model)
+SYNC_ENTITIES = {
+    'games': Game,
+    'work_orders': MaintenanceRecord,
+    'work_logs': WorkLog,
+    'inventory': InventoryItem,
+}
+SYNC_ENTITY_NAMES = {model: name for name, model in SYNC_ENTITIES.items()}
+
+def next_sync_version(connection):
+    """Take the next sync version. The counter row stays locked until the transaction
+    commits, so versions become visible in order."""
+    counter = SyncCounter.__table__
+    if not connection.execute(counter.update().values(value=counter.c.value + 1)).rowcount:
+        connection.execute(counter.insert().values(id=1, value=1))
+    return connection.execute(db.select(counter.c.value)).scalar_one()
+
+def add_sync_tombstones(session, model, row_ids, version=None):
+    """Record deletes of SyncTracked rows that bypass the ORM (bulk query deletes)"""
+    row_ids = list(row_ids)
+    if not row_ids:
+        return
+    version = version or next_sync_version(session.connection())
+    session.add_all(SyncTombstone(entity=SYNC_ENTITY_NAMES[model], row_id=row_id, sync_version=version)
+                    for row_id in row_ids)
+
+@event.listens_for(Session, 'before_flush')
+def stamp_sync_versions(session, flush_context, instances):
+    """Give every SyncTracked row changed in this flush the next sync version, and tombstone deletes.
+
+    Bulk query updates and deletes don't flush, they must stamp or tombstone themselves.
+    """
+    changed = [obj for obj in session.new if isinstance(obj, SyncTracked)]
+    changed += [obj for obj in session.dirty
+                if isinstance(obj, SyncTracked) and session.is_modified(obj, include_collections=False)]
+    deleted = [obj for obj in session.deleted if isinstance(obj, SyncTracked)]
+    if not changed and not deleted:
+        return
+    version = next_sync_version(session.connection())
+    now = datetime.now(dt.UTC)
+    for obj in changed:
+        obj.sync_version = version
+        obj.updated_at = now
+    for obj in deleted:
+        session.add(SyncTombstone(entity=SYNC_ENTITY_NAMES[type(obj)], row_id=obj.id, sync_version=version))
+
+class LiveEventBroadcaster:
+    """Fans live events out to every open /events stream of this process.
+
+    Each subscriber has a bounded queue. One that falls LIVE_EVENTS_QUEUE_SIZE
+    events behind is dropped, and its stream ends so the browser reconnects and
+    catches up from the backlog.
+    """
+    def __init__(self, backlog=LIVE_EVENTS_BACKLOG, queue_size=LIVE_EVENTS_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._backlog = deque(maxlen=backlog)
+        self._subscribers = set()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def publish(self, name, data, role='readonly'):
+        """Send an event to every subscriber whose user has role"""
+        with self._lock:
+            event = (self._next_id, name, json.dumps(data, separators=(',', ':')), role)
+            self._next_id += 1
+            self._backlog.append(event)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                self.unsubscribe(subscriber)
+                with subscriber.mutex:
+                    subscriber.queue.clear()
+                subscriber.put_nowait(None)  # Ends the stream
+
+    def subscribe(self, last_event_id=None):
+        """Queue receiving (id, name, json, role) events, or None when dropped.
+
+        Events after last_event_id that are still in the backlog are queued first.
+        """
+        subscriber = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            if last_event_id is not None:
+                for event in self._backlog:
+                    if event[0] > last_event_id:
+                        subscriber.put_nowait(event)
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+live_events = LiveEventBroadcaster()
+
+OPEN_MAINTENANCE_STATUSES = ('Open', 'In_Progress')
+CLOSED_MAINTENANCE_STATUSES = ('Fixed', 'Deferred')
+
+# Words in an issue description that put a work order in a category on the maintenance reports
+MAINTENANCE_ISSUE_CATEGORIES = {
+    'screen': ('screen', 'display', 'monitor'),
+    'button': ('button', 'stick', 'control'),
+    'sound': ('sound', 'audio', 'speaker'),
+    'power': ('power', 'electric', 'voltage'),
+}
+
+def closes_work_order(status):
+    """Whether a work order with this status is closed (Fixed, Deferred)"""
+    return status not in OPEN_MAINTENANCE_STATUSES
+
+@event.listens_for(Session, 'after_flush')
+def collect_live_events(session, flush_context):
+    """Note the live events of this flush, they are published once the transaction commits"""
+    events = session.info.setdefault('live_events', [])
+    for obj in session.new:
+        if isinstance(obj, PlayRecord):
+            events.append(('reading', {'game_id': obj.game_id, 'coin_count': obj.coin_count, 'plays': obj.plays_count,
+                                       'revenue': obj.revenue, 'date': api_json_value(obj.date_recorded)}, 'manager'))
+            events.append(('revenue', {'plays': obj.plays_count, 'revenue': obj.revenue}, 'manager'))
+        elif isinstance(obj, MaintenanceRecord) and not closes_work_order(obj.status):
+            events.append(('work_order', {'id': obj.id, 'game_id': obj.game_id, 'status': obj.status,
+                                          'change': 'opened'}, 'operator'))
+        elif isinstance(obj, LowStockAlert):
+            with session.no_autoflush:
+                item = session.get(InventoryItem, obj.item_id)
+            events.append(('low_stock', {'item_id': obj.item_id, 'name': item.name if item else None,
+                                         'stock_quantity': item.stock_quantity if item else None,
+                                         'minimum_stock': item.minimum_stock if item else None}, 'operator'))
+    for obj in session.dirty:
+        if isinstance(obj, MaintenanceRecord):
+            history = get_history(obj, 'status')
+            if history.deleted:
+                was_closed, is_closed = closes_work_order(history.deleted[0]), closes_work_order(obj.status)
+                if was_closed != is_closed:
+                    events.append(('work_order', {'id': obj.id, 'game_id': obj.game_id, 'status': obj.status,
+                                                  'change': 'closed' if is_closed else 'reopened'}, 'operator'))
+    for obj in session.deleted:
+        if isinstance(obj, PlayRecord):
+            events.append(('revenue', {'plays': -obj.plays_count, 'revenue': -obj.revenue}, 'manager'))
+
+@event.listens_for(Session, 'after_commit')
+def publish_live_events(session):
+    """Publish what collect_live_events() noted, with the revenue changes of the commit merged into one event"""
+    events = session.info.pop('live_events', None)
+    if not events:
+        return
+    plays = revenue = 0
+    for name, data, role in events:
+        if name == 'revenue':
+            plays += data['plays']
+            revenue += data['revenue']
+        else:
+            live_events.publish(name, data, role)
+    if plays or revenue:
+        live_events.publish('revenue', {'plays': plays, 'revenue': round(revenue, 2)}, 'manager')
+
+@event.listens_for(Session, 'after_rollback')
+def discard_live_events(session):
+    session.info.pop('live_events', None)
+
 # Authentication Routes
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -522,27 +1685,24 @@ def profile():
     form = ProfileForm()
     if form.validate_on_submit():
         if form.profile_picture.data:
-            import os
-            import uuid
-            from werkzeug.utils import secure_filename
-            
             file = form.profile_picture.data
-            filename = secure_filename(file.filename)
-            if filename and filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif')):
-                # Create unique filename
-                file_ext = filename.rsplit('.', 1)[1].lower()
-                unique_filename = f"{uuid.uuid4()}.{file_ext}"
-                
-                # Ensure upload directory exists
-                upload_dir = os.path.join(app.root_path, 'static', 'profile_pics')
-                os.makedirs(upload_dir, exist_ok=True)
-                
-                file_path = os.path.join(upload_dir, unique_filename)
-                file.save(file_path)
-                
+            try:
+                # Validated, compressed and stored under its content hash (identical pictures are shared)
+                stored_filename, picture_saved = store_image_upload(file, 'profile')
+            except ValueError:
+                stored_filename = None
+            
+            if stored_filename:
                 # Update user profile picture in database
-                current_user.profile_picture = unique_filename
+                stale_picture = None
+                if stored_filename != current_user.profile_picture:
+                    if current_user.profile_picture and release_file_reference('profile', current_user.profile_picture):
+                        stale_picture = current_user.profile_picture
+                    reference_upload('profile', file, stored_filename, picture_saved)
+                    current_user.profile_picture = stored_filename
                 db.session.commit()
+                if stale_picture:
+                    delete_unreferenced_file('profile', stale_picture)
                 flash('Profile picture updated successfully!')
             else:
                 flash('Please upload a valid image file (PNG, JPG, JPEG, GIF).')
@@ -612,47 +1772,132 @@ def setup():
     return render_template('setup.html', form=form)
 
 # Main Routes
+def ttl_cache(seconds):
+    """Reuse a function's result (per arguments) for `seconds`, shared by all threads"""
+    def decorator(f):
+        entries = {}
+        lock = threading.Lock()
+        
+        @wraps(f)
+        def cached(*args):
+            now = time.monotonic()
+            with lock:
+                entry = entries.get(args)
+            if entry and entry[0] > now:
+                return entry[1]
+            value = f(*args)
+            with lock:
+                entries[args] = (now + seconds(), value)
+            return value
+        cached.cache_clear = entries.clear
+        return cached
+    return decorator
+
+def sql_days_since(column):
+    """Whole days from a datetime column until now, computed by the database"""
+    if db.engine.dialect.name == 'sqlite':
+        return db.cast(db.func.julianday('now') - db.func.julianday(column), db.Integer)
+    return db.cast(db.func.extract('epoch', db.func.now() - column) / 86400, db.Integer)
+
+def sql_elapsed_days(later, earlier):
+    """Days, with fractions, from one datetime expression to another, computed by the database"""
+    if db.engine.dialect.name == 'sqlite':
+        return db.func.julianday(later) - db.func.julianday(earlier)
+    return db.func.extract('epoch', later - earlier) / 86400.0
+
+def sql_days_between(later, earlier):
+    """Whole calendar days between the dates of two datetime columns, computed by the database"""
+    if db.engine.dialect.name == 'sqlite':
+        return db.cast(db.func.julianday(db.func.date(later)) - db.func.julianday(db.func.date(earlier)), db.Integer)
+    return db.cast(later, db.Date) - db.cast(earlier, db.Date)
+
+def sql_date_bucket(column, bucket):
+    """Start date of the day, week (from Monday) or month a date column falls in, computed by the database"""
+    if db.engine.dialect.name == 'sqlite':
+        if bucket == 'week':
+            return db.func.date(column, '-6 days', 'weekday 1')
+        if bucket == 'month':
+            return db.func.strftime('%Y-%m-01', column)
+        return db.func.date(column)
+    return db.cast(db.func.date_trunc(bucket, column), db.Date)
+
+def choose_revenue_bucket(days, bucket='auto', max_points=None):
+    """Pick the day, week or month bucket for a revenue series over `days` days
+    
+    'auto' uses days up to a quarter and weeks up to two years. With
+    `max_points`, coarser buckets are used until the series fits (months are
+    the coarsest).
+    """
+    buckets = list(REVENUE_BUCKET_DAYS)
+    if bucket not in buckets:
+        bucket = 'day' if days <= 92 else 'week' if days <= 730 else 'month'
+    if max_points and max_points > 0:
+        for coarser in buckets[buckets.index(bucket):]:
+            bucket = coarser
+            if days // REVENUE_BUCKET_DAYS[bucket] + 2 <= max_points:
+                break
+    return bucket
+
+@ttl_cache(lambda: DASHBOARD_CACHE_SECONDS)
+def dashboard_payload():
+    """Numbers and short lists shown on the home dashboard, from four bounded queries"""
+    open_maintenance = db.select(db.func.count(MaintenanceRecord.id)).where(
+        MaintenanceRecord.status.in_(OPEN_MAINTENANCE_STATUSES)).scalar_subquery()
+    total_games, floor_count, total_plays, total_revenue, open_count = db.session.execute(db.select(
+        db.func.count(Game.id),
+        db.func.count(db.case((Game.location == 'Floor', 1))),
+        db.func.coalesce(db.func.sum(Game.total_plays), 0),
+        db.func.coalesce(db.func.sum(Game.total_revenue), 0.0),
+        open_maintenance,
+    )).one()
+    
+    # Floor games: the first 10 for the list, and the 3 working counters with the lowest daily revenue
+    days = sql_days_since(Game.date_added)
+    daily_revenue = Game.total_revenue / db.case((days < 1, 1), else_=days)
+    working = Game.counter_status == 'Working'
+    floor = db.select(
+        Game.id, Game.name, Game.floor_position, Game.total_revenue, Game.status, working.label('working'),
+        daily_revenue.label('daily_revenue'),
+        db.func.row_number().over(order_by=Game.id).label('position'),
+        db.func.row_number().over(partition_by=working, order_by=(daily_revenue, Game.id)).label('worst_rank'),
+    ).where(Game.location == 'Floor').subquery()
+    floor_rows = db.session.execute(db.select(floor).where(
+        (floor.c.position <= 10) | (floor.c.working & (floor.c.worst_rank <= 3))).order_by(floor.c.position)).all()
+    
+    recent_records = db.session.execute(
+        db.select(PlayRecord.id, PlayRecord.game_id, PlayRecord.plays_count, PlayRecord.date_recorded, Game.name)
+        .join(Game).order_by(PlayRecord.date_recorded.desc(), PlayRecord.id.desc()).limit(5)).all()
+    recent_maintenance = db.session.execute(
+        db.select(MaintenanceRecord.id, MaintenanceRecord.game_id, MaintenanceRecord.issue_description,
+                  MaintenanceRecord.status, MaintenanceRecord.date_reported, Game.name)
+        .join(Game).where(MaintenanceRecord.status == 'Open')
+        .order_by(MaintenanceRecord.id).limit(5)).all()
+    
+    def game(row):
+        return {'id': row.id, 'name': row.name, 'floor_position': row.floor_position,
+                'total_revenue': row.total_revenue, 'status': row.status}
+    
+    worst = sorted((row for row in floor_rows if row.working and row.worst_rank <= 3), key=lambda row: row.worst_rank)
+    return {
+        'total_games': total_games,
+        'floor_count': floor_count,
+        'floor_games_preview': [game(row) for row in floor_rows if row.position <= 10],
+        'total_plays': total_plays,
+        'total_revenue': total_revenue,
+        'open_maintenance_count': open_count,
+        'worst_performers': [(game(row), row.daily_revenue) for row in worst],
+        'recent_records': [{'id': r.id, 'game_id': r.game_id, 'plays_count': r.plays_count,
+                            'date_recorded': r.date_recorded, 'game': {'name': r.name}} for r in recent_records],
+        'recent_maintenance': [{'id': r.id, 'game_id': r.game_id, 'issue_description': r.issue_description,
+                                'status': r.status, 'date_reported': r.date_reported, 'game': {'name': r.name}}
+                               for r in recent_maintenance],
+    }
+
 @app.route('/')
 @login_required
 def home():
-    # Quick stats for dashboard
-    all_games = Game.query.all()
-    total_games = len(all_games)
-    floor_games = Game.query.filter_by(location='Floor').all()
-    total_plays = sum(game.total_plays for game in all_games)
-    total_revenue = sum(game.total_revenue for game in all_games)
-    
-    # Recent activity
-    recent_records = PlayRecord.query.order_by(PlayRecord.date_recorded.desc()).limit(5).all()
-    recent_maintenance = MaintenanceRecord.query.filter_by(status='Open').limit(5).all()
-    
-    # Calculate worst performers for the dashboard - only floor games with working counters
-    worst_performers = []
-    if floor_games:
-        performers = []
-        for game in floor_games:
-            # Skip games with broken or missing counters
-            if game.counter_status != 'Working':
-                continue
-            # Make game.date_added timezone-aware if it's naive
-            date_added = game.date_added
-            if date_added.tzinfo is None:
-                date_added = date_added.replace(tzinfo=dt.UTC)
-            days_active = (datetime.now(dt.UTC) - date_added).days or 1
-            daily_revenue_avg = game.total_revenue / days_active
-            performers.append((game, daily_revenue_avg))
-        
-        # Sort and get worst 3 for dashboard
-        worst_performers = sorted(performers, key=lambda x: x[1])[:3]
-    
-    return render_template('index.html', 
-                         total_games=total_games,
-                         floor_games=floor_games, 
-                         total_plays=total_plays,
-                         recent_records=recent_records,
-                         recent_maintenance=recent_maintenance,
-                         total_revenue=total_revenue,
-                         worst_performers=worst_performers)
+    # Quick stats for dashboard, computed in SQL and shared by every request for DASHBOARD_CACHE_SECONDS
+    return render_template('index.html', **dashboard_payload())
 
 @app.route('/games')
 @login_required
@@ -720,21 +1965,15 @@ def add_game():
             year = None
         
         # Handle image upload
-        image_filename = None
+        image_filename, image_saved = None, {}
         if 'image' in request.files:
             file = request.files['image']
-            if file and file.filename != '' and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                # Add UUID to prevent filename conflicts
-                name_part, ext = os.path.splitext(filename)
-                filename = f"{name_part}_{uuid.uuid4().hex[:8]}{ext}"
-                
-                # Ensure upload directory exists
-                os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-                
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(filepath)
-                image_filename = filename
+            if file and file.filename != '':
+                # Validated, compressed and stored under its content hash (identical images are shared)
+                try:
+                    image_filename, image_saved = store_image_upload(file, 'uploads')
+                except ValueError as e:
+                    flash(f'{e}. The game was saved without an image.', 'warning')
         
         game = Game(
             name=name,
@@ -751,6 +1990,8 @@ def add_game():
         )
         
         db.session.add(game)
+        if image_filename:
+            reference_upload('uploads', file, image_filename, image_saved)
         db.session.commit()
         
         # Handle initial coin count if provided and counter is working
@@ -956,27 +2197,23 @@ def edit_game(game_id):
         game.notes = request.form.get('notes', '')
         
         # Handle new image upload
+        stale_image = None
         if 'image' in request.files:
             file = request.files['image']
-            if file and file.filename != '' and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                # Add UUID to prevent filename conflicts
-                name_part, ext = os.path.splitext(filename)
-                filename = f"{name_part}_{uuid.uuid4().hex[:8]}{ext}"
-                
-                # Ensure upload directory exists
-                os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-                
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(filepath)
-                
-                # Remove old image if it exists
-                if game.image_filename:
-                    old_path = os.path.join(app.config['UPLOAD_FOLDER'], game.image_filename)
-                    if os.path.exists(old_path):
-                        os.remove(old_path)
+            if file and file.filename != '':
+                # Validated, compressed and stored under its content hash (identical images are shared)
+                try:
+                    filename, image_saved = store_image_upload(file, 'uploads')
+                except ValueError as e:
+                    flash(f'{e}. The current image was kept.', 'warning')
+                    filename = game.image_filename
                 
-                game.image_filename = filename
+                if filename != game.image_filename:
+                    # Release the old image, it is removed after commit if nothing else uses it
+                    if game.image_filename and release_file_reference('uploads', game.image_filename):
+                        stale_image = game.image_filename
+                    reference_upload('uploads', file, filename, image_saved)
+                    game.image_filename = filename
         
         # Handle initial coin count if provided and no actual play records exist
         if not has_play_records:
@@ -1012,6 +2249,8 @@ def edit_game(game_id):
                     pass  # Ignore invalid input
         
         db.session.commit()
+        if stale_image:
+            delete_unreferenced_file('uploads', stale_image)
         
         success_msg = f'Game "{game.name}" updated successfully!'
         if not has_play_records:
@@ -1116,22 +2355,224 @@ def maintenance(game_id):
     
     return render_template('maintenance_with_inventory.html', form=form, game=game)
 
+class ReliabilityStats:
+    """Mean time between failures (MTBF) and mean time to repair (MTTR), in days,
+    per game and rolled up per manufacturer and genre.
+
+    Every work order counts as a failure; the time between failures is the gap
+    to the previous order of the same game (LAG over date_reported) and the
+    time to repair runs from date_reported to date_fixed of closed orders. The
+    per-game sums are kept between requests. Games passed to invalidate() are
+    queried again on the next read, everything is reloaded after max_age
+    seconds.
+    """
+    GROUPS = ('game', 'manufacturer', 'genre')
+    
+    def __init__(self, max_age):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._games = {}
+        self._stale = set()
+        self._loaded_at = None
+    
+    def invalidate(self, game_ids):
+        with self._lock:
+            self._stale.update(game_ids)
+    
+    def clear(self):
+        with self._lock:
+            self._games = {}
+            self._stale = set()
+            self._loaded_at = None
+    
+    def _query(self, game_ids=None):
+        """Per-game failure and repair sums, for every game with work orders or only game_ids"""
+        record = MaintenanceRecord
+        previous = db.func.lag(record.date_reported).over(partition_by=record.game_id,
+                                                            order_by=(record.date_reported, record.id))
+        repaired = record.status.in_(CLOSED_MAINTENANCE_STATUSES) & record.date_fixed.isnot(None)
+        intervals = db.select(
+            record.game_id,
+            sql_elapsed_days(record.date_reported, previous).label('between'),
+            db.case((repaired, sql_elapsed_days(record.date_fixed, record.date_reported))).label('repair'),
+        )
+        if game_ids is not None:
+            intervals = intervals.where(record.game_id.in_(game_ids))
+        intervals = intervals.subquery()
+        rows = db.session.execute(db.select(
+            Game.id, Game.name, Game.manufacturer, Game.genre,
+            db.func.count().label('failures'),
+            db.func.coalesce(db.func.sum(intervals.c.between), 0).label('between_days'),
+            db.func.count(intervals.c.between).label('intervals'),
+            db.func.coalesce(db.func.sum(intervals.c.repair), 0).label('repair_days'),
+            db.func.count(intervals.c.repair).label('repairs'),
+        ).join(intervals, intervals.c.game_id == Game.id).group_by(Game.id)).all()
+        return {row.id: row for row in rows}
+    
+    def games(self):
+        """Per-game sums, reloading what changed since the last read"""
+        with self._lock:
+            now = time.monotonic()
+            if self._loaded_at is None or now - self._loaded_at > self.max_age:
+                self._games = self._query()
+                self._stale = set()
+                self._loaded_at = now
+            elif self._stale:
+                stale, self._stale = self._stale, set()
+                games = {game_id: row for game_id, row in self._games.items() if game_id not in stale}
+                games.update(self._query(stale))
+                self._games = games
+            return self._games
+    
+    def by(self, group):
+        """MTBF and MTTR rows for one of GROUPS, least reliable first"""
+        if group not in self.GROUPS:
+            raise ValueError(f"group must be one of {', '.join(self.GROUPS)}")
+        grouped = {}
+        for row in self.games().values():
+            key = row.id if group == 'game' else getattr(row, group) or 'Unknown'
+            grouped.setdefault(key, []).append(row)
+        
+        results = []
+        for key, rows in grouped.items():
+            intervals = sum(row.intervals for row in rows)
+            repairs = sum(row.repairs for row in rows)
+            results.append({
+                group: key,
+                **({'name': rows[0].name} if group == 'game' else {'games': len(rows)}),
+                'failures': sum(row.failures for row in rows),
+                'repairs': repairs,
+                'mtbf_days': round(sum(row.between_days for row in rows) / intervals, 2) if intervals else None,
+                'mttr_days': round(sum(row.repair_days for row in rows) / repairs, 2) if repairs else None,
+            })
+        # Shortest time between failures first, groups with a single failure last
+        results.sort(key=lambda r: (r['mtbf_days'] is None, r['mtbf_days'] or 0, -r['failures']))
+        return results
+    
+    @property
+    def by_game(self):
+        return self.by('game')
+    
+    @property
+    def by_manufacturer(self):
+        return self.by('manufacturer')
+    
+    @property
+    def by_genre(self):
+        return self.by('genre')
+
+reliability_stats = ReliabilityStats(RELIABILITY_CACHE_SECONDS)
+
+@event.listens_for(Session, 'after_flush')
+def collect_reliability_changes(session, flush_context):
+    """Note the games whose work orders this flush added, changed or deleted"""
+    games = session.info.setdefault('reliability_games', set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, MaintenanceRecord):
+            games.add(obj.game_id)
+            games.update(game_id for game_id in get_history(obj, 'game_id').deleted if game_id is not None)
+
+@event.listens_for(Session, 'after_commit')
+def refresh_reliability_stats(session):
+    games = session.info.pop('reliability_games', None)
+    if games:
+        reliability_stats.invalidate(games)
+
+@event.listens_for(Session, 'after_rollback')
+def discard_reliability_changes(session):
+    session.info.pop('reliability_games', None)
+
+def maintenance_order_page(page, per_page, *conditions):
+    """One page of the open, closed and all maintenance order lists, with their totals
+
+    Everything comes from one windowed query: the counts, the cost figures of
+    closed orders, the issue categories and the average/median resolution days
+    are window aggregates over all matching orders, and only rows on the page
+    (plus the ones needed for the median) are returned. The record lists hold
+    that page only; use the *_count values for totals.
+    """
+    status = MaintenanceRecord.status
+    issue = db.func.lower(MaintenanceRecord.issue_description)
+    group = db.case((status.in_(OPEN_MAINTENANCE_STATUSES), 'open'),
+                    (status.in_(CLOSED_MAINTENANCE_STATUSES), 'closed'), else_='other')
+    days_to_fix = sql_days_between(MaintenanceRecord.date_fixed, MaintenanceRecord.date_reported)
+    resolution_days = db.case(
+        (status.in_(CLOSED_MAINTENANCE_STATUSES) & MaintenanceRecord.date_fixed.isnot(None)
+         & MaintenanceRecord.date_reported.isnot(None), db.case((days_to_fix < 1, 1), else_=days_to_fix)))  # At least 1 day
+    newest_first = (MaintenanceRecord.date_reported.desc(), MaintenanceRecord.id.desc())
+    windowed = db.select(
+        MaintenanceRecord.id,
+        group.label('list'),
+        resolution_days.label('resolution_days'),
+        db.func.row_number().over(order_by=newest_first).label('position'),
+        db.func.row_number().over(partition_by=group, order_by=newest_first).label('list_position'),
+        db.func.row_number().over(partition_by=resolution_days.is_(None), order_by=resolution_days).label('resolution_rank'),
+        db.func.count().over().label('all_count'),
+        db.func.count(db.case((group == 'open', 1))).over().label('open_count'),
+        db.func.count(db.case((group == 'closed', 1))).over().label('closed_count'),
+        db.func.count(resolution_days).over().label('resolved_count'),
+        db.func.sum(db.case((group == 'closed', MaintenanceRecord.cost))).over().label('total_cost'),
+        db.func.max(db.case((group == 'closed', MaintenanceRecord.cost))).over().label('max_closed_cost'),
+        db.func.count(db.case(((group == 'closed') & (MaintenanceRecord.cost > 50), 1))).over().label('costly_closed_count'),
+        db.func.avg(resolution_days).over().label('avg_resolution_days'),
+        *(db.func.count(db.case((db.or_(*(issue.contains(word) for word in words)), 1))).over().label(f'{category}_issues')
+          for category, words in MAINTENANCE_ISSUE_CATEGORIES.items()),
+    ).where(*conditions).subquery()
+    
+    first, last = (page - 1) * per_page + 1, page * per_page
+    middle = ((windowed.c.resolved_count + 1) // 2, (windowed.c.resolved_count + 2) // 2)  # Integer division, as below
+    rows = db.session.execute(
+        db.select(MaintenanceRecord, windowed).join(windowed, windowed.c.id == MaintenanceRecord.id)
+        .join(Game).options(contains_eager(MaintenanceRecord.game))
+        .where(windowed.c.position.between(first, last)
+               | windowed.c.list_position.between(first, last)
+               | (windowed.c.position == 1)  # Carries the totals when the page is past the end
+               | (windowed.c.resolution_days.isnot(None) & windowed.c.resolution_rank.in_(middle)))
+        .order_by(windowed.c.position)).all()
+    
+    totals = rows[0] if rows else None
+    middle_days = [row.resolution_days for row in rows if row.resolution_days is not None
+                   and row.resolution_rank in ((row.resolved_count + 1) // 2, (row.resolved_count + 2) // 2)]
+    
+    def listed(name):
+        return [row.MaintenanceRecord for row in rows
+                if (name == 'all' or row.list == name)
+                and first <= (row.position if name == 'all' else row.list_position) <= last]
+    
+    def total(name):
+        return (getattr(totals, name) or 0) if totals else 0
+    
+    all_count = total('all_count')
+    return {
+        'all_records': listed('all'),
+        'open_records': listed('open'),
+        'closed_records': listed('closed'),
+        'all_count': all_count,
+        'open_count': total('open_count'),
+        'closed_count': total('closed_count'),
+        'total_cost': total('total_cost'),
+        'max_closed_cost': total('max_closed_cost'),
+        'costly_closed_count': total('costly_closed_count'),
+        'issue_categories': {category: total(f'{category}_issues') for category in MAINTENANCE_ISSUE_CATEGORIES},
+        'avg_resolution_days': total('avg_resolution_days'),
+        'median_resolution_days': sum(middle_days) / len(middle_days) if middle_days else 0,
+        'page': page,
+        'per_page': per_page,
+        'page_count': max(1, -(-all_count // per_page)),
+    }
+
+def requested_page():
+    """The 1-based ?page= number, 1 when missing or invalid"""
+    page = request.args.get('page', 1, type=int)
+    return page if page and page > 0 else 1
+
 @app.route('/maintenance_orders')
 @login_required
 @requires_role('manager')
 def maintenance_orders():
-    """View all maintenance orders in spreadsheet format"""
-    # Get all maintenance records, ordered by date
-    all_records = MaintenanceRecord.query.join(Game).order_by(MaintenanceRecord.date_reported.desc()).all()
-    
-    # Separate by status
-    open_records = [r for r in all_records if r.status in ['Open', 'In_Progress']]
-    closed_records = [r for r in all_records if r.status in ['Fixed', 'Deferred']]
-    
-    return render_template('maintenance_orders.html', 
-                         all_records=all_records,
-                         open_records=open_records, 
-                         closed_records=closed_records)
+    """View all maintenance orders in spreadsheet format, one page at a time"""
+    return render_template('maintenance_orders.html',
+                         **maintenance_order_page(requested_page(), MAINTENANCE_PAGE_SIZE))
 
 @app.route('/update_maintenance/<int:maintenance_id>', methods=['GET', 'POST'])
 @login_required
@@ -1305,6 +2746,7 @@ def maintenance_photos(maintenance_id):
                 print(f"DEBUG: Files in '{field_name}': {[f.filename if f and hasattr(f, 'filename') else 'No filename' for f in files]}")
         
         uploaded_count = 0
+        upload_results = []  # Per-file outcome reported back to the client
         
         # Filter out empty files and validate
         valid_files = []
@@ -1316,6 +2758,8 @@ def maintenance_photos(maintenance_id):
                     print(f"DEBUG: File {file.filename} is valid")
                 else:
                     flash(f'File {file.filename} has an invalid file type. Allowed: PNG, JPG, JPEG, GIF', 'warning')
+                    upload_results.append({'filename': file.filename, 'status': 'rejected',
+                                           'error': 'Invalid file type'})
         
         print(f"DEBUG: Valid files count: {len(valid_files)}")
         
@@ -1337,69 +2781,188 @@ def maintenance_photos(maintenance_id):
             flash(f'Storage limit ({MAX_TOTAL_STORAGE_MB}MB) reached. Please contact administrator.', 'error')
             return redirect(url_for('maintenance_photos', maintenance_id=maintenance_id))
         
-        for file in valid_files:
-            # Check if we've hit the per-record limit
-            if len(maintenance.get_photos()) >= MAX_PHOTOS_PER_RECORD:
-                break
-            
+        # Only as many files as the record has room for are processed
+        remaining_slots = MAX_PHOTOS_PER_RECORD - len(current_photos)
+        for file in valid_files[remaining_slots:]:
+            upload_results.append({'filename': file.filename, 'status': 'skipped',
+                                   'error': f'Maximum {MAX_PHOTOS_PER_RECORD} photos per record'})
+        valid_files = valid_files[:remaining_slots]
+        
+        # Ensure upload directory exists
+        os.makedirs(upload_dir, exist_ok=True)
+        
+        # Compress and store the files and their smaller derivatives locally, in parallel.
+        # Files are named by the hash of their content, so a photo already stored for
+        # another record is shared instead of stored twice.
+        compressed = compress_images_concurrently([(file, upload_dir) for file in valid_files])
+        
+        # Sizes come from the encoded buffers, so the quota is tracked without rescanning the folder
+        used_bytes = current_size_mb * 1024 * 1024
+        stale_files = []
+        for file, (stored, error) in zip(valid_files, compressed):
             filename = secure_filename(file.filename)
-            # Add UUID to prevent filename conflicts
-            name_part, ext = os.path.splitext(filename)
-            unique_filename = f"maintenance_{maintenance_id}_{uuid.uuid4().hex[:8]}{ext}"
-            
-            # Ensure upload directory exists
-            upload_dir = os.path.join(app.root_path, 'static', 'maintenance_photos')
-            os.makedirs(upload_dir, exist_ok=True)
-            
-            file_path = os.path.join(upload_dir, unique_filename)
-            
+            stored_filename, saved = stored or (None, {})
+            referenced = False
             try:
-                # Compress and save the file locally
-                compress_and_save_image(file, file_path)
+                if error:
+                    raise error
+                
+                if stored_filename in maintenance.get_photos():
+                    upload_results.append({'filename': file.filename, 'status': 'duplicate',
+                                           'stored_as': stored_filename})
+                    continue
                 
-                # Upload to cloud if enabled
-                cloud_url = None
-                if USE_CLOUD_STORAGE:
-                    with open(file_path, 'rb') as compressed_file:
-                        cloud_url = upload_to_cloud(compressed_file.read(), unique_filename)
+                # Referenced before anything else, so a shared photo can't be deleted while it is reused
+                referenced = True
+                saved = reference_upload('maintenance', file, stored_filename, saved)
+                
+                stored_bytes = sum(len(data) for _, data in saved.values())
+                if used_bytes + stored_bytes > MAX_TOTAL_STORAGE_MB * 1024 * 1024:
+                    raise ValueError(f'Storage limit ({MAX_TOTAL_STORAGE_MB}MB) reached')
+                used_bytes += stored_bytes
                 
                 # Add to maintenance record
-                maintenance.add_photo(unique_filename)
+                maintenance.add_photo(stored_filename)
                 uploaded_count += 1
+                upload_results.append({'filename': file.filename, 'status': 'uploaded', 'stored_as': stored_filename})
                 
-                if cloud_url:
-                    print(f"Photo uploaded to cloud: {cloud_url}")
+                # Queue the cloud upload from the same buffers (shared photos are already queued)
+                for key, (saved_path, data) in saved.items():
+                    queue_cloud_upload('maintenance', photo_set_filename(stored_filename, key), data)
                 
             except Exception as e:
                 flash(f'Error uploading {filename}: {str(e)}', 'error')
-                # Clean up partial file if it exists
-                if os.path.exists(file_path):
-                    os.remove(file_path)
+                upload_results.append({'filename': file.filename, 'status': 'failed', 'error': str(e)})
+                # Clean up files this upload created, unless another record references them by now
+                if referenced and release_file_reference('maintenance', stored_filename) and saved:
+                    stale_files.append(stored_filename)
         
+        db.session.commit()
+        for stored_filename in stale_files:
+            delete_unreferenced_file('maintenance', stored_filename)
         if uploaded_count > 0:
-            db.session.commit()
+            wake_cloud_upload_worker()
             flash(f'Successfully uploaded {uploaded_count} photo(s) for maintenance record.', 'success')
         
+        # API clients get the per-file results instead of a redirect
+        if request.accept_mimetypes.best == 'application/json':
+            return jsonify({'uploaded': uploaded_count, 'files': upload_results})
+        
         return redirect(url_for('view_maintenance', maintenance_id=maintenance_id))
     
     return render_template('maintenance_photos.html', maintenance=maintenance, form=form)
 
-@app.route('/delete_maintenance_photo/<int:maintenance_id>/<filename>', methods=['POST'])
+def send_media(file_path, mimetype, immutable=False):
+    """Send a media file, or hand it to the front proxy when MEDIA_SENDFILE is set.
+    
+    Fingerprinted (immutable) files are cached by browsers for MEDIA_MAX_AGE.
+    Media routes need a login, so the cache is private: shared caches keep no copy.
+    """
+    relative_path = os.path.relpath(file_path, app.root_path)
+    if MEDIA_SENDFILE == 'x-accel-redirect' and not relative_path.startswith('..'):
+        response = make_response('')
+        response.headers['X-Accel-Redirect'] = f"{MEDIA_ACCEL_PREFIX.rstrip('/')}/{relative_path.replace(os.sep, '/')}"
+        response.mimetype = mimetype
+    elif MEDIA_SENDFILE == 'x-sendfile':
+        response = make_response('')
+        response.headers['X-Sendfile'] = os.path.abspath(file_path)
+        response.mimetype = mimetype
+    else:
+        response = send_file(file_path, mimetype=mimetype, max_age=MEDIA_MAX_AGE if immutable else None)
+    
+    if immutable:
+        response.cache_control.public = False
+        response.cache_control.private = True
+        response.cache_control.max_age = MEDIA_MAX_AGE
+        response.cache_control.immutable = True
+    return response
+
+def is_fingerprinted_request(filename):
+    """Whether the requested media URL changes whenever the file does"""
+    return bool(request.args.get('v')) or bool(CONTENT_ADDRESSED_NAME.fullmatch(os.path.basename(filename)))
+
+@app.route('/photos/<kind>/<path:filename>')
+@login_required
+def serve_photo(kind, filename):
+    """Serve a photo in the smallest format the browser accepts, falling back to the JPEG"""
+    folder = PHOTO_FOLDERS.get(kind)
+    if folder is None:
+        abort(404)
+    if safe_join(photo_folder(kind), filename) is None:
+        abort(404)
+    
+    # Old flat URLs keep working after the photo store is sharded, and vice versa
+    file_path = choose_photo_variant(kind, filename, request.accept_mimetypes)
+    immutable = is_fingerprinted_request(filename)
+    if not os.path.isfile(file_path):
+        # A derivative that was never stored (links don't check the disk): the full size instead
+        full_size = photo_set_reference(filename)
+        if full_size == filename:
+            abort(404)
+        file_path = choose_photo_variant(kind, full_size, request.accept_mimetypes)
+        immutable = False
+        if not os.path.isfile(file_path):
+            abort(404)
+    mimetype = PHOTO_MIMETYPES.get(os.path.splitext(file_path)[1].lower())
+    response = send_media(file_path, mimetype, immutable=immutable)
+    response.vary.add('Accept')
+    return response
+
+@app.route('/img/<kind>/<path:filename>')
+@login_required
+def resized_image(kind, filename):
+    """Serve an image resized to ?w= pixels wide, from the resized image cache"""
+    if kind not in PHOTO_FOLDERS:
+        abort(404)
+    if safe_join(photo_folder(kind), filename) is None:
+        abort(404)
+    source_path = media_path(kind, filename)
+    if not os.path.isfile(source_path):
+        abort(404)
+    width = request.args.get('w', type=int)
+    if not width or width <= 0:
+        abort(400)
+    
+    # Round up to a known width so arbitrary ?w= values can't fill the cache
+    width = next((w for w in IMAGE_RESIZE_WIDTHS if w >= width), IMAGE_RESIZE_WIDTHS[-1])
+    stat = os.stat(source_path)
+    key = hashlib.sha256(f'{kind}/{filename}:{stat.st_mtime_ns}:{stat.st_size}:{width}'.encode()).hexdigest()
+    
+    def cached_path():
+        try:
+            return resized_image_cache.get(f'{key}.jpg', lambda path: resize_image_file(source_path, width, path))
+        except Exception as e:
+            print(f"Resize failed for {kind}/{filename}: {e}")
+            abort(404)
+    
+    immutable = is_fingerprinted_request(filename)
+    try:
+        response = send_media(cached_path(), 'image/jpeg', immutable=immutable)
+    except FileNotFoundError:
+        # Evicted by another request between the lookup and the send: resized again, once
+        response = send_media(cached_path(), 'image/jpeg', immutable=immutable)
+    return response
+
+@app.route('/delete_maintenance_photo/<int:maintenance_id>/<path:filename>', methods=['POST'])
 @login_required
 @requires_role('manager')
 def delete_maintenance_photo(maintenance_id, filename):
     """Delete a photo from a maintenance record"""
     maintenance = MaintenanceRecord.query.get_or_404(maintenance_id)
     
+    if filename not in maintenance.get_photos():
+        flash('Photo not found on this record.', 'warning')
+        return redirect(url_for('view_maintenance', maintenance_id=maintenance_id))
+    
     # Remove from database
     maintenance.remove_photo(filename)
+    unreferenced = release_file_reference('maintenance', filename)
     db.session.commit()
     
-    # Remove file from filesystem
-    file_path = os.path.join(app.root_path, 'static', 'maintenance_photos', filename)
-    if os.path.exists(file_path):
+    # Remove file and its derivatives from filesystem, unless another record shares it
+    if unreferenced:
         try:
-            os.remove(file_path)
+            delete_unreferenced_file('maintenance', filename)
             flash('Photo deleted successfully.', 'success')
         except Exception as e:
             flash(f'Photo removed from record but file deletion failed: {str(e)}', 'warning')
@@ -1431,9 +2994,9 @@ def storage_admin():
     """Storage management dashboard"""
     upload_dir = os.path.join(app.root_path, 'static', 'maintenance_photos')
     
-    # Get storage stats
-    current_size_mb = get_directory_size(upload_dir)
-    file_count = len(os.listdir(upload_dir)) if os.path.exists(upload_dir) else 0
+    # Get storage stats (one pass over the shard directories)
+    total_bytes, file_count = get_directory_stats(upload_dir)
+    current_size_mb = total_bytes / (1024 * 1024)
     
     # Get record stats
     total_records = MaintenanceRecord.query.count()
@@ -1450,6 +3013,48 @@ def storage_admin():
     
     return render_template('storage_admin.html', stats=stats)
 
+@app.route('/admin/profiles')
+@login_required
+@requires_role('admin')
+def profiles_admin():
+    """List stored request profiles, newest first"""
+    profiles = [dict(profile, created=profile['created'].isoformat(),
+                     url=url_for('download_profile', filename=profile['filename']))
+                for profile in list_request_profiles()]
+    return jsonify({'profiles': profiles,
+                    'profiler_enabled': PROFILER_ENABLED,
+                    'max_profiles': MAX_STORED_PROFILES})
+
+@app.route('/admin/profiles/<filename>')
+@login_required
+@requires_role('admin')
+def download_profile(filename):
+    """Download a stored .prof file (open with snakeviz or pstats)"""
+    filename = secure_filename(filename)
+    profile_path = os.path.join(PROFILE_DIR, filename)
+    
+    if not filename.endswith('.prof') or not os.path.exists(profile_path):
+        flash('Profile not found', 'error')
+        return redirect(url_for('profiles_admin'))
+    
+    return send_file(profile_path, as_attachment=True, download_name=filename)
+
+@app.route('/admin/profiles/<filename>/delete', methods=['POST'])
+@login_required
+@requires_role('admin')
+def delete_profile(filename):
+    """Delete a stored profile"""
+    filename = secure_filename(filename)
+    profile_path = os.path.join(PROFILE_DIR, filename)
+    
+    if filename.endswith('.prof') and os.path.exists(profile_path):
+        os.remove(profile_path)
+        flash('Profile deleted.', 'success')
+    else:
+        flash('Profile not found', 'error')
+    
+    return redirect(url_for('profiles_admin'))
+
 @app.route('/close_maintenance/<int:maintenance_id>', methods=['POST'])
 @login_required
 @requires_role('manager')
@@ -1473,7 +3078,12 @@ def close_maintenance(maintenance_id):
 @login_required
 @requires_role('manager')
 def revenue_reports():
-    """Generate revenue reports with time frame filters"""
+    """Generate revenue reports with time frame filters
+    
+    Revenue is summed per day, week or month (`bucket`, chosen from the range
+    by default) so long ranges send as few points as short ones. `max_points`
+    moves to a coarser bucket when there would be more points than that.
+    """
     from datetime import timedelta
     
     # Get date range from query params with error handling
@@ -1486,63 +3096,48 @@ def revenue_reports():
     
     location_filter = request.args.get('location', '')
     start_date = date.today() - timedelta(days=days)
+    bucket = choose_revenue_bucket(days, request.args.get('bucket', 'auto'),
+                                   request.args.get('max_points', type=int))
     
-    # Base query for play records in date range - only floor games with working counters
-    query = PlayRecord.query.join(Game).filter(
+    # Play records in date range - only floor games with working counters
+    conditions = [
         PlayRecord.date_recorded >= start_date,
         Game.location == 'Floor',
         Game.counter_status == 'Working'
-    )
+    ]
     
     # Apply additional location filter if specified (though floor is already filtered)
     if location_filter and location_filter != 'Floor':
-        query = query.filter(Game.location == location_filter)
-    
-    all_records = query.order_by(PlayRecord.date_recorded.desc()).all()
-    
-    # Get games with revenue in the period - only floor games with working counters
-    games_query = Game.query.join(PlayRecord).filter(
-        PlayRecord.date_recorded >= start_date,
-        Game.location == 'Floor',
-        Game.counter_status == 'Working'
-    )
-    if location_filter and location_filter != 'Floor':
-        games_query = games_query.filter(Game.location == location_filter)
-    
-    revenue_games = games_query.distinct().all()
+        conditions.append(Game.location == location_filter)
+    
+    # Revenue per bucket, summed by the database
+    period = sql_date_bucket(PlayRecord.date_recorded, bucket).label('period')
+    series = db.session.execute(
+        db.select(period, db.func.sum(PlayRecord.revenue), db.func.sum(PlayRecord.plays_count),
+                  db.func.count(PlayRecord.id))
+        .join(Game).where(*conditions).group_by(period).order_by(period)).all()
+    
+    # Revenue and plays per game in the period, top performers first
+    game_totals = db.session.execute(
+        db.select(Game, db.func.sum(PlayRecord.revenue).label('revenue'),
+                  db.func.sum(PlayRecord.plays_count).label('plays'))
+        .join(PlayRecord).where(*conditions)
+        .group_by(Game.id).order_by(db.desc('revenue'), Game.id)).all()
+    revenue_games = [game for game, _, _ in game_totals]
+    top_games = [{'game': game, 'revenue': revenue, 'plays': plays} for game, revenue, plays in game_totals[:10]]
     
     # Calculate statistics
-    total_revenue = sum(r.revenue for r in all_records)
-    total_plays = sum(r.plays_count for r in all_records)
+    revenue_by_period = {str(label): revenue for label, revenue, _, _ in series}
+    total_revenue = sum(revenue for _, revenue, _, _ in series)
+    total_plays = sum(plays for _, _, plays, _ in series)
+    record_count = sum(count for _, _, _, count in series)
     avg_daily_revenue = total_revenue / days if days > 0 else 0
     
-    # Top performing games in period
-    game_revenues = {}
-    for record in all_records:
-        if record.game.id not in game_revenues:
-            game_revenues[record.game.id] = {
-                'game': record.game,
-                'revenue': 0,
-                'plays': 0
-            }
-        game_revenues[record.game.id]['revenue'] += record.revenue
-        game_revenues[record.game.id]['plays'] += record.plays_count
-    
-    top_games = sorted(game_revenues.values(), key=lambda x: x['revenue'], reverse=True)[:10]
-    
-    # Daily revenue breakdown
-    daily_revenue = {}
-    for record in all_records:
-        day_str = record.date_recorded.strftime('%Y-%m-%d')
-        if day_str not in daily_revenue:
-            daily_revenue[day_str] = 0
-        daily_revenue[day_str] += record.revenue
-    
     # Get unique locations for filter dropdown
     locations = db.session.query(Game.location.distinct()).all()
     
     return render_template('revenue_reports.html',
-                         all_records=all_records,
+                         record_count=record_count,
                          revenue_games=revenue_games,
                          top_games=top_games,
                          days_filter=days,
@@ -1551,7 +3146,8 @@ def revenue_reports():
                          total_revenue=total_revenue,
                          total_plays=total_plays,
                          avg_daily_revenue=avg_daily_revenue,
-                         daily_revenue=daily_revenue,
+                         revenue_bucket=bucket,
+                         daily_revenue=revenue_by_period,
                          locations=[l[0] for l in locations])
 
 @app.route('/maintenance_reports')
@@ -1571,35 +3167,191 @@ def maintenance_reports():
     
     start_date = date.today() - timedelta(days=days)
     
-    # Get all maintenance records in date range
-    all_records = MaintenanceRecord.query.join(Game).filter(
-        MaintenanceRecord.date_reported >= start_date
-    ).order_by(MaintenanceRecord.date_reported.desc()).all()
-    
-    # Separate by status
-    open_records = [r for r in all_records if r.status in ['Open', 'In_Progress']]
-    closed_records = [r for r in all_records if r.status in ['Fixed', 'Deferred']]
-    
-    # Calculate statistics
-    total_cost = sum(r.cost or 0 for r in closed_records)
-    avg_resolution_days = 0
-    if closed_records:
-        resolution_times = []
-        for r in closed_records:
-            if r.date_fixed and r.date_reported:
-                days_to_fix = (r.date_fixed.date() - r.date_reported.date()).days
-                resolution_times.append(max(1, days_to_fix))  # At least 1 day
-        if resolution_times:
-            avg_resolution_days = sum(resolution_times) / len(resolution_times)
+    # Counts, cost and resolution times of every order in range, rows for this page only
+    report = maintenance_order_page(requested_page(), MAINTENANCE_PAGE_SIZE,
+                                    MaintenanceRecord.date_reported >= start_date)
     
+    # MTBF/MTTR tables, loaded from the shared cache when the template reads them
     return render_template('maintenance_reports.html', 
-                         all_records=all_records,
-                         open_records=open_records,
-                         closed_records=closed_records,
                          days_filter=days,
                          start_date=start_date,
-                         total_cost=total_cost,
-                         avg_resolution_days=avg_resolution_days)
+                         reliability=reliability_stats,
+                         **report)
+
+class FlowableStream(list):
+    """PDF story that pulls flowables from an iterator while the document is laid out.
+
+    doc.build() checks len() before every flowable, which tops the list up to
+    `lookahead` items, so only those are in memory instead of the whole report.
+    """
+    def __init__(self, flowables, lookahead=4):
+        super().__init__()
+        self._pending = iter(flowables)
+        self.lookahead = lookahead
+    
+    def __len__(self):
+        while list.__len__(self) < self.lookahead:
+            try:
+                self.append(next(self._pending))
+            except StopIteration:
+                break
+        return list.__len__(self)
+
+PDF_DETAIL_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('TOPPADDING', (0, 0), (-1, -1), 2),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+])
+
+PDF_SUMMARY_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 14),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+PDF_CELL_STYLE = ParagraphStyle('PdfCell', fontName='Helvetica', fontSize=8, leading=9.5)
+
+def pdf_cell(text):
+    """Table cell text that wraps within its column"""
+    return Paragraph(escape(text), PDF_CELL_STYLE) if text else ''
+
+def chunked_tables(header, rows, col_widths):
+    """LongTables of PDF_TABLE_CHUNK_ROWS rows each, repeating the header row on every page"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == PDF_TABLE_CHUNK_ROWS:
+            yield LongTable([header] + chunk, colWidths=col_widths, repeatRows=1, style=PDF_DETAIL_TABLE_STYLE)
+            chunk = []
+    if chunk:
+        yield LongTable([header] + chunk, colWidths=col_widths, repeatRows=1, style=PDF_DETAIL_TABLE_STYLE)
+
+def send_pdf_report(flowables, filename):
+    """Lay out a report from an iterator of flowables and send it.
+
+    The PDF is written to a spooled temporary file (on disk beyond
+    PDF_SPOOL_MAX_BYTES) that is streamed to the client and removed afterwards.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_BYTES)
+    doc = SimpleDocTemplate(spool, pagesize=letter, pageCompression=1,
+                            leftMargin=36, rightMargin=36, topMargin=36, bottomMargin=36)
+    try:
+        doc.build(FlowableStream(flowables))
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    return send_file(spool, as_attachment=True, download_name=filename, mimetype='application/pdf')
+
+def full_maintenance_report(title, conditions):
+    """Flowables for every maintenance order matching conditions and all of their work logs"""
+    styles = getSampleStyleSheet()
+    yield Paragraph(f"{title} - Full Detail", styles['Title'])
+    yield Spacer(1, 12)
+    
+    closed = MaintenanceRecord.status.in_(CLOSED_MAINTENANCE_STATUSES)
+    total, open_count, closed_count, total_cost = db.session.execute(db.select(
+        db.func.count(MaintenanceRecord.id),
+        db.func.count(db.case((MaintenanceRecord.status.in_(OPEN_MAINTENANCE_STATUSES), 1))),
+        db.func.count(db.case((closed, 1))),
+        db.func.coalesce(db.func.sum(db.case((closed, MaintenanceRecord.cost))), 0),
+    ).where(*conditions)).one()
+    yield Table([
+        ['Metric', 'Value'],
+        ['Total Records', str(total)],
+        ['Open Orders', str(open_count)],
+        ['Closed Orders', str(closed_count)],
+        ['Total Cost', f'${total_cost:.2f}']
+    ], style=PDF_SUMMARY_TABLE_STYLE)
+    yield Spacer(1, 20)
+    
+    newest_first = (MaintenanceRecord.date_reported.desc(), MaintenanceRecord.id.desc())
+    yield Paragraph("Maintenance Records", styles['Heading2'])
+    records = db.session.execute(
+        db.select(MaintenanceRecord.id, Game.name, MaintenanceRecord.issue_description, MaintenanceRecord.status,
+                  MaintenanceRecord.date_reported, MaintenanceRecord.date_fixed, MaintenanceRecord.cost,
+                  MaintenanceRecord.technician)
+        .join(Game).where(*conditions).order_by(*newest_first)
+        .execution_options(yield_per=PDF_FETCH_ROWS))
+    yield from chunked_tables(
+        ['#', 'Game', 'Issue', 'Status', 'Reported', 'Fixed', 'Cost', 'Technician'],
+        ([str(order_id), pdf_cell(name), pdf_cell(issue), (status or '').replace('_', ' '),
+          reported.strftime('%Y-%m-%d') if reported else '', fixed.strftime('%Y-%m-%d') if fixed else '',
+          f'${cost:.2f}' if cost else '$0', pdf_cell(technician)]
+         for order_id, name, issue, status, reported, fixed, cost, technician in records),
+        [35, 90, 170, 55, 50, 50, 40, 50])
+    
+    yield Spacer(1, 20)
+    yield Paragraph("Work Logs", styles['Heading2'])
+    work_logs = db.session.execute(
+        db.select(WorkLog.maintenance_id, Game.name, WorkLog.timestamp, User.username, WorkLog.time_spent,
+                  WorkLog.cost_incurred, WorkLog.work_description, WorkLog.parts_used)
+        .join(MaintenanceRecord, WorkLog.maintenance_id == MaintenanceRecord.id).join(Game)
+        .outerjoin(User, WorkLog.user_id == User.id)
+        .where(*conditions).order_by(*newest_first, WorkLog.timestamp)
+        .execution_options(yield_per=PDF_FETCH_ROWS))
+    yield from chunked_tables(
+        ['Order', 'Game', 'When', 'By', 'Hours', 'Cost', 'Work'],
+        ([str(order_id), pdf_cell(name), timestamp.strftime('%Y-%m-%d %H:%M') if timestamp else '',
+          pdf_cell(username), f'{hours:g}' if hours else '', f'${cost:.2f}' if cost else '',
+          pdf_cell(description + (f' (Parts: {parts})' if parts else ''))]
+         for order_id, name, timestamp, username, hours, cost, description, parts in work_logs),
+        [35, 80, 60, 55, 35, 40, 235])
+
+def full_revenue_report(title, conditions, days):
+    """Flowables for the revenue of every game and every play record matching conditions"""
+    styles = getSampleStyleSheet()
+    yield Paragraph(f"{title} - Full Detail", styles['Title'])
+    yield Spacer(1, 12)
+    
+    total, total_revenue, total_plays = db.session.execute(db.select(
+        db.func.count(PlayRecord.id),
+        db.func.coalesce(db.func.sum(PlayRecord.revenue), 0),
+        db.func.coalesce(db.func.sum(PlayRecord.plays_count), 0),
+    ).join(Game).where(*conditions)).one()
+    yield Table([
+        ['Metric', 'Value'],
+        ['Total Records', str(total)],
+        ['Total Revenue', f'${total_revenue:.2f}'],
+        ['Total Plays', str(total_plays)],
+        ['Avg Daily Revenue', f'${total_revenue / days:.2f}']
+    ], style=PDF_SUMMARY_TABLE_STYLE)
+    yield Spacer(1, 20)
+    
+    yield Paragraph("Revenue by Game", styles['Heading2'])
+    revenue = db.func.sum(PlayRecord.revenue)
+    games = db.session.execute(
+        db.select(Game.name, revenue, db.func.sum(PlayRecord.plays_count))
+        .join(PlayRecord).where(*conditions).group_by(Game.id).order_by(revenue.desc(), Game.id)
+        .execution_options(yield_per=PDF_FETCH_ROWS))
+    yield from chunked_tables(
+        ['Game', 'Revenue', 'Plays', 'Avg per Play'],
+        ([pdf_cell(name), f'${game_revenue:.2f}', str(plays), f'${game_revenue / plays:.2f}' if plays else '$0.00']
+         for name, game_revenue, plays in games),
+        [270, 90, 90, 90])
+    
+    yield Spacer(1, 20)
+    yield Paragraph("Play Records", styles['Heading2'])
+    records = db.session.execute(
+        db.select(PlayRecord.date_recorded, Game.name, PlayRecord.coin_count, PlayRecord.plays_count,
+                  PlayRecord.revenue)
+        .join(Game).where(*conditions).order_by(PlayRecord.date_recorded.desc(), PlayRecord.id.desc())
+        .execution_options(yield_per=PDF_FETCH_ROWS))
+    yield from chunked_tables(
+        ['Date', 'Game', 'Coin Count', 'Plays', 'Revenue'],
+        ([recorded.strftime('%Y-%m-%d'), pdf_cell(name), str(coin_count),
+          str(plays), f'${record_revenue:.2f}']
+         for recorded, name, coin_count, plays, record_revenue in records),
+        [70, 230, 80, 80, 80])
 
 @app.route('/export_maintenance_report')
 @login_required
@@ -1626,20 +3378,37 @@ def export_maintenance_report():
     
     start_date = date.today() - timedelta(days=days)
     
-    # Get records based on type
+    # Every order and work log, streamed into the PDF instead of the first 15
+    if request.args.get('detail') == 'full':
+        if report_type == 'open':
+            conditions, title = [MaintenanceRecord.status.in_(OPEN_MAINTENANCE_STATUSES)], "Open Maintenance Orders"
+        elif report_type == 'closed':
+            conditions = [MaintenanceRecord.status.in_(CLOSED_MAINTENANCE_STATUSES),
+                          MaintenanceRecord.date_reported >= start_date]
+            title = f"Closed Maintenance Orders (Last {days} Days)"
+        else:
+            conditions, title = [MaintenanceRecord.date_reported >= start_date], f"All Maintenance Orders (Last {days} Days)"
+        return send_pdf_report(full_maintenance_report(title, conditions),
+                               f'maintenance_report_{report_type}_{days}days_full.pdf')
+    
+    # Get records based on type - load games, work logs and their users up front
+    base_query = MaintenanceRecord.query.join(Game).options(
+        contains_eager(MaintenanceRecord.game),
+        selectinload(MaintenanceRecord.work_logs).joinedload(WorkLog.user)
+    )
     if report_type == 'open':
-        records = MaintenanceRecord.query.join(Game).filter(
+        records = base_query.filter(
             MaintenanceRecord.status.in_(['Open', 'In_Progress'])
         ).order_by(MaintenanceRecord.date_reported.desc()).all()
         title = f"Open Maintenance Orders"
     elif report_type == 'closed':
-        records = MaintenanceRecord.query.join(Game).filter(
+        records = base_query.filter(
             MaintenanceRecord.status.in_(['Fixed', 'Deferred']),
             MaintenanceRecord.date_reported >= start_date
         ).order_by(MaintenanceRecord.date_reported.desc()).all()
         title = f"Closed Maintenance Orders (Last {days} Days)"
     else:
-        records = MaintenanceRecord.query.join(Game).filter(
+        records = base_query.filter(
             MaintenanceRecord.date_reported >= start_date
         ).order_by(MaintenanceRecord.date_reported.desc()).all()
         title = f"All Maintenance Orders (Last {days} Days)"
@@ -1788,20 +3557,21 @@ def export_revenue_report():
     location_filter = request.args.get('location', '')
     start_date = date.today() - timedelta(days=days)
     
-    # Get records based on filters - only floor games with working counters
-    query = PlayRecord.query.join(Game).filter(
-        PlayRecord.date_recorded >= start_date,
-        Game.location == 'Floor',
-        Game.counter_status == 'Working'
-    )
-    
+    # Records based on filters - only floor games with working counters
+    conditions = [PlayRecord.date_recorded >= start_date, Game.location == 'Floor', Game.counter_status == 'Working']
     if location_filter and location_filter != 'Floor':
-        query = query.filter(Game.location == location_filter)
+        conditions.append(Game.location == location_filter)
         title = f"Revenue Report - {location_filter} (Last {days} Days)"
     else:
         title = f"Revenue Report - Floor Games with Working Counters (Last {days} Days)"
     
-    records = query.order_by(PlayRecord.date_recorded.desc()).all()
+    # Every game and play record, streamed into the PDF instead of the top 10 games
+    if request.args.get('detail') == 'full':
+        filename = f'revenue_report_{location_filter + "_" if location_filter else ""}{days}days_full.pdf'
+        return send_pdf_report(full_revenue_report(title, conditions, days), filename)
+    
+    records = PlayRecord.query.join(Game).options(contains_eager(PlayRecord.game)).filter(
+        *conditions).order_by(PlayRecord.date_recorded.desc()).all()
     
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter)
@@ -1960,12 +3730,13 @@ def _update_top_rankings():
     
     revenue_ranking.sort(key=lambda x: x[1], reverse=True)
     
-    # Update counters
-    for i, (game, _) in enumerate(revenue_ranking):
-        if i < 5:  # Top 5
-            game.times_in_top_5 += 1
-        if i < 10:  # Top 10
-            game.times_in_top_10 += 1
+    # Update counters with one UPDATE per ranking instead of one per game
+    top_10_ids = [game.id for game, _ in revenue_ranking[:10]]
+    if top_10_ids:
+        Game.query.filter(Game.id.in_(top_10_ids[:5])).update(
+            {Game.times_in_top_5: Game.times_in_top_5 + 1}, synchronize_session=False)
+        Game.query.filter(Game.id.in_(top_10_ids)).update(
+            {Game.times_in_top_10: Game.times_in_top_10 + 1}, synchronize_session=False)
     
     db.session.commit()
 
@@ -1973,70 +3744,78 @@ def _update_top_rankings():
 @login_required
 @requires_role('manager')
 def graphs():
-    """Dedicated graphs page with all visual analytics"""
+    """Dedicated graphs page with all visual analytics
+
+    Only the page shell is rendered here; its charts load from graphs_data.
+    """
+    return render_template('graphs.html', graphs_data_url=url_for('graphs_data'))
+
+def chart_series(pairs):
+    """Compact chart series from (label, value) pairs"""
+    labels, values = [], []
+    for label, value in pairs:
+        labels.append(label)
+        values.append(round(value or 0, 2))
+    return {'labels': labels, 'values': values}
+
+@ttl_cache(lambda: DASHBOARD_CACHE_SECONDS)
+def graphs_payload():
+    """Summary numbers and chart series for the graphs page, from three grouped queries"""
     from datetime import timedelta
     from collections import Counter
     
-    # Get basic stats - only count floor games with working counters for performance metrics
-    all_games = Game.query.all()
-    floor_games = Game.query.filter_by(location='Floor', counter_status='Working').all()
-    total_games = len(all_games)
-    total_plays = sum(game.total_plays for game in floor_games)  # Only floor games with working counters
-    total_revenue = sum(game.total_revenue for game in floor_games)  # Only floor games with working counters
-    floor_games_count = len(floor_games)
-    
-    # Daily revenue for last 30 days - only from floor games with working counters
+    # Performance metrics only count floor games with working counters
+    performing = (Game.location == 'Floor') & (Game.counter_status == 'Working')
+    groups = db.session.execute(db.select(
+        Game.status, Game.location, db.func.count(Game.id),
+        db.func.count(db.case((performing, 1))),
+        db.func.coalesce(db.func.sum(db.case((performing, Game.total_plays))), 0),
+        db.func.coalesce(db.func.sum(db.case((performing, Game.total_revenue))), 0.0),
+    ).group_by(Game.status, Game.location)).all()
+    
+    summary = {'total_games': 0, 'floor_games_count': 0, 'total_plays': 0, 'total_revenue': 0.0}
+    status_distribution = Counter()
+    location_distribution = Counter()
+    for status, location, games, floor_games, plays, revenue in groups:
+        summary['total_games'] += games
+        summary['floor_games_count'] += floor_games
+        summary['total_plays'] += plays
+        summary['total_revenue'] += revenue
+        status_distribution[status] += games
+        location_distribution[location] += games
+    summary['total_revenue'] = round(summary['total_revenue'], 2)
+    
+    # Daily revenue for last 30 days
     thirty_days_ago = date.today() - timedelta(days=30)
-    recent_records = PlayRecord.query.join(Game).filter(
-        PlayRecord.date_recorded >= thirty_days_ago,
-        Game.location == 'Floor',
-        Game.counter_status == 'Working'
-    ).all()
-    daily_revenue = {}
-    for record in recent_records:
-        day = record.date_recorded
-        if day not in daily_revenue:
-            daily_revenue[day] = 0
-        daily_revenue[day] += record.revenue
-    
-    # Top performers
-    performers = []
-    for game in floor_games:
-        try:
-            # Make game.date_added timezone-aware if it's naive
-            date_added = game.date_added
-            if date_added.tzinfo is None:
-                date_added = date_added.replace(tzinfo=dt.UTC)
-            days_active = (datetime.now(dt.UTC) - date_added).days or 1
-            daily_revenue_avg = game.total_revenue / days_active if game.total_revenue else 0
-            performers.append({
-                'game': game,
-                'daily_revenue': daily_revenue_avg,
-                'total_revenue': game.total_revenue or 0
-            })
-        except Exception as e:
-            # Skip games with data issues
-            continue
-    
-    top_performers = sorted(performers, key=lambda x: x['daily_revenue'], reverse=True)
-    print(f"Generated {len(top_performers)} performers for graphs")
-    
-    # Status distribution
-    status_distribution = Counter(game.status for game in all_games)
-    
-    # Location distribution  
-    location_distribution = Counter(game.location for game in all_games)
-    
-    return render_template('graphs.html',
-                         total_games=total_games,
-                         total_plays=total_plays,
-                         total_revenue=total_revenue,
-                         floor_games=floor_games,
-                         all_games=all_games,
-                         daily_revenue=daily_revenue,
-                         top_performers=top_performers,
-                         status_distribution=status_distribution,
-                         location_distribution=location_distribution)
+    daily_revenue = db.session.execute(
+        db.select(PlayRecord.date_recorded, db.func.sum(PlayRecord.revenue))
+        .join(Game).where(PlayRecord.date_recorded >= thirty_days_ago, performing)
+        .group_by(PlayRecord.date_recorded).order_by(PlayRecord.date_recorded)).all()
+    
+    # Top performers by average daily revenue since the game was added
+    days = sql_days_since(Game.date_added)
+    daily_average = db.func.coalesce(Game.total_revenue, 0) / db.case((days < 1, 1), else_=days)
+    top_performers = db.session.execute(
+        db.select(Game.name, daily_average).where(performing)
+        .order_by(daily_average.desc(), Game.id).limit(10)).all()
+    
+    return {
+        'summary': summary,
+        'daily_revenue': chart_series((day.isoformat(), revenue) for day, revenue in daily_revenue),
+        'top_performers': chart_series(top_performers),
+        'status_distribution': chart_series(sorted(status_distribution.items(), key=lambda item: item[0] or '')),
+        'location_distribution': chart_series(sorted(location_distribution.items(), key=lambda item: item[0] or '')),
+    }
+
+@app.route('/graphs/data')
+@login_required
+@requires_role('manager')
+def graphs_data():
+    """Chart series for the graphs page; its size doesn't grow with the number of games"""
+    response = jsonify(graphs_payload())
+    response.cache_control.private = True
+    response.cache_control.max_age = int(DASHBOARD_CACHE_SECONDS)
+    return response
 
 @app.route('/export_report_debug')
 @login_required
@@ -2456,19 +4235,40 @@ def delete_game(game_id):
         # Delete associated play records (cascade should handle this, but let's be explicit)
         PlayRecord.query.filter_by(game_id=game_id).delete()
         
-        # Delete associated maintenance records
+        # Release the photos of the associated maintenance records, then delete them
+        stale_files = []
+        for (photos,) in db.session.query(MaintenanceRecord.photos).filter(
+                MaintenanceRecord.game_id == game_id, MaintenanceRecord.photos.isnot(None)):
+            try:
+                photo_list = json.loads(photos) or []
+            except (json.JSONDecodeError, TypeError):
+                continue
+            for photo in photo_list:
+                if release_file_reference('maintenance', photo):
+                    stale_files.append(('maintenance', photo))
+        # Bulk deletes don't flush, so synced tablets get their tombstones here
+        maintenance_ids = [row_id for (row_id,) in db.session.query(MaintenanceRecord.id).filter_by(game_id=game_id)]
+        work_log_ids = [row_id for (row_id,) in db.session.query(WorkLog.id).filter(
+            WorkLog.maintenance_id.in_(maintenance_ids))] if maintenance_ids else []
+        version = next_sync_version(db.session.connection()) if maintenance_ids else None
+        add_sync_tombstones(db.session, WorkLog, work_log_ids, version)
+        add_sync_tombstones(db.session, MaintenanceRecord, maintenance_ids, version)
+        if work_log_ids:
+            WorkLog.query.filter(WorkLog.id.in_(work_log_ids)).delete(synchronize_session=False)
         MaintenanceRecord.query.filter_by(game_id=game_id).delete()
         
-        # Delete the game image if it exists
-        if game.image_filename:
-            image_path = os.path.join(app.config['UPLOAD_FOLDER'], game.image_filename)
-            if os.path.exists(image_path):
-                os.remove(image_path)
+        # Release the game image, it is removed below if nothing else uses it
+        if game.image_filename and release_file_reference('uploads', game.image_filename):
+            stale_files.append(('uploads', game.image_filename))
         
         # Delete the game itself
         game_name = game.name
         db.session.delete(game)
         db.session.commit()
+        reliability_stats.invalidate([game_id])  # The bulk delete above isn't seen by the flush hook
+        
+        for kind, filename in stale_files:
+            delete_unreferenced_file(kind, filename)
         
         flash(f'Game "{game_name}" and all associated records have been deleted successfully.', 'success')
     except Exception as e:
@@ -2506,13 +4306,11 @@ def inventory_list():
     
     items = query.order_by(InventoryItem.name.asc()).all()
     
-    # Get low stock items count for badge
-    low_stock_count = InventoryItem.query.filter(
-        InventoryItem.stock_quantity <= InventoryItem.minimum_stock
-    ).count()
-    
-    # Calculate total inventory value
-    total_value = sum(item.total_value() for item in InventoryItem.query.all())
+    # Get low stock items count for badge and total inventory value in one aggregate query
+    low_stock_count, total_value = db.session.query(
+        db.func.count(db.case((InventoryItem.stock_quantity <= InventoryItem.minimum_stock, 1))),
+        db.func.coalesce(db.func.sum(InventoryItem.stock_quantity * InventoryItem.unit_price), 0.0)
+    ).one()
     
     # Get pending requests count for current user
     pending_requests_count = 0
@@ -2917,6 +4715,527 @@ def delete_inventory_request(request_id):
     flash(f'Request #{request_id} deleted successfully.', 'success')
     return redirect(url_for('inventory_requests_list'))
 
+# =====================================
+# LIVE UPDATES (Server-Sent Events)
+# =====================================
+
+@app.route('/events')
+@login_required
+def live_event_stream():
+    """Server-Sent Events stream of live updates for the dashboard and work order pages.
+
+    Events: reading, revenue (plays/revenue added by a commit), work_order
+    (opened, closed, reopened) and low_stock. Users only get the events their
+    role may see. Browsers reconnect by themselves and send Last-Event-ID, so
+    events missed in between are replayed from the backlog.
+    """
+    roles = {role for role in ('readonly', 'operator', 'manager', 'admin') if current_user.has_role(role)}
+    subscriber = live_events.subscribe(request.headers.get('Last-Event-ID', type=int))
+
+    # Runs after the request context is gone, so it must not touch the database or current_user
+    def stream():
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    event = subscriber.get(timeout=LIVE_EVENTS_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ': keepalive\n\n'  # Also notices closed connections
+                    continue
+                if event is None:
+                    return
+                event_id, name, data, role = event
+                if role in roles:
+                    yield f'id: {event_id}\nevent: {name}\ndata: {data}\n\n'
+        finally:
+            live_events.unsubscribe(subscriber)
+
+    response = app.response_class(stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Don't let nginx buffer the stream
+    return response
+
+# =====================================
+# JSON API (v1)
+# =====================================
+
+# Resources served by /api/v1/<name>. 'fields' maps what a client may ask for with
+# ?fields= to column expressions, so only those columns are selected and rows are
+# serialized straight from the result tuples. Pages are ordered by 'key' and the
+# cursor is the key of the last row of the previous page. 'filters' are equality
+# filters (comma separated values match any), 'date' is filtered by ?since=/?until=.
+API_RESOURCES = {
+    'games': {
+        'role': 'readonly',
+        'model': Game,
+        'key': Game.id,
+        'fields': {
+            'id': Game.id,
+            'name': Game.name,
+            'manufacturer': Game.manufacturer,
+            'year': Game.year,
+            'genre': Game.genre,
+            'location': Game.location,
+            'floor_position': Game.floor_position,
+            'warehouse_section': Game.warehouse_section,
+            'status': Game.status,
+            'coins_per_play': Game.coins_per_play,
+            'total_plays': Game.total_plays,
+            'total_revenue': Game.total_revenue,
+            'counter_status': Game.counter_status,
+            'date_added': Game.date_added,
+        },
+        'default_fields': ('id', 'name', 'location', 'status', 'total_plays', 'total_revenue'),
+        'filters': {'location': Game.location, 'status': Game.status, 'genre': Game.genre,
+                    'counter_status': Game.counter_status},
+    },
+    'plays': {
+        'role': 'manager',
+        'model': PlayRecord,
+        'key': PlayRecord.id,
+        'fields': {
+            'id': PlayRecord.id,
+            'game_id': PlayRecord.game_id,
+            'coin_count': PlayRecord.coin_count,
+            'plays_count': PlayRecord.plays_count,
+            'revenue': PlayRecord.revenue,
+            'date_recorded': PlayRecord.date_recorded,
+            'notes': PlayRecord.notes,
+        },
+        'default_fields': ('id', 'game_id', 'coin_count', 'plays_count', 'revenue', 'date_recorded'),
+        'filters': {'game_id': PlayRecord.game_id},
+        'date': PlayRecord.date_recorded,
+    },
+    # One row per day, over the same play records as revenue_reports
+    'revenue/daily': {
+        'role': 'manager',
+        'model': PlayRecord,
+        'join': Game,
+        'where': (Game.location == 'Floor', Game.counter_status == 'Working'),
+        'key': PlayRecord.date_recorded,
+        'group_by': True,
+        'fields': {
+            'date': PlayRecord.date_recorded,
+            'revenue': db.func.sum(PlayRecord.revenue),
+            'plays': db.func.sum(PlayRecord.plays_count),
+            'games': db.func.count(db.distinct(PlayRecord.game_id)),
+        },
+        'default_fields': ('date', 'revenue', 'plays'),
+        'filters': {'game_id': PlayRecord.game_id},
+        'date': PlayRecord.date_recorded,
+    },
+    'maintenance': {
+        'role': 'manager',
+        'model': MaintenanceRecord,
+        'join': Game,
+        'key': MaintenanceRecord.id,
+        'fields': {
+            'id': MaintenanceRecord.id,
+            'game_id': MaintenanceRecord.game_id,
+            'game_name': Game.name,
+            'issue_description': MaintenanceRecord.issue_description,
+            'fix_description': MaintenanceRecord.fix_description,
+            'parts_used': MaintenanceRecord.parts_used,
+            'cost': MaintenanceRecord.cost,
+            'status': MaintenanceRecord.status,
+            'technician': MaintenanceRecord.technician,
+            'date_reported': MaintenanceRecord.date_reported,
+            'date_fixed': MaintenanceRecord.date_fixed,
+        },
+        'default_fields': ('id', 'game_id', 'game_name', 'issue_description', 'status', 'date_reported'),
+        'filters': {'status': MaintenanceRecord.status, 'game_id': MaintenanceRecord.game_id,
+                    'technician': MaintenanceRecord.technician},
+        'date': MaintenanceRecord.date_reported,
+    },
+    'inventory': {
+        'role': 'operator',
+        'model': InventoryItem,
+        'key': InventoryItem.id,
+        'fields': {
+            'id': InventoryItem.id,
+            'name': InventoryItem.name,
+            'description': InventoryItem.description,
+            'part_number': InventoryItem.part_number,
+            'supplier': InventoryItem.supplier,
+            'stock_quantity': InventoryItem.stock_quantity,
+            'minimum_stock': InventoryItem.minimum_stock,
+            'unit_price': InventoryItem.unit_price,
+            'last_restocked': InventoryItem.last_restocked,
+            'date_added': InventoryItem.date_added,
+        },
+        'default_fields': ('id', 'name', 'part_number', 'stock_quantity', 'minimum_stock', 'unit_price'),
+        'filters': {'supplier': InventoryItem.supplier, 'part_number': InventoryItem.part_number},
+    },
+}
+
+def api_error(message, status=400):
+    """JSON error response for the API"""
+    return jsonify({'error': message}), status
+
+def api_permission_error(role):
+    """JSON error response if the current user may not use an API resource needing role, else None"""
+    if not current_user.is_authenticated:
+        return api_error('Authentication required', 401)
+    if not current_user.has_role(role):
+        return api_error('You do not have permission to access this resource', 403)
+    return None
+
+def api_json_value(value):
+    """A column value as JSON (dates and times in ISO 8601)"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def parse_api_value(column, text):
+    """Convert a query string or cursor value to the column's Python type (ValueError if invalid)"""
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(text)
+    if python_type is date:
+        return date.fromisoformat(text)
+    return python_type(text)
+
+def encode_api_cursor(key):
+    """Opaque cursor for the page after the row with this key"""
+    return base64.urlsafe_b64encode(json.dumps(api_json_value(key)).encode()).decode().rstrip('=')
+
+def decode_api_cursor(column, cursor):
+    """Key value from an encode_api_cursor() cursor (ValueError if invalid)"""
+    try:
+        value = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError('Invalid cursor') from e
+    return parse_api_value(column, str(value))
+
+def build_api_query(resource, fields, args):
+    """SELECT for one page of a resource: the key followed by the requested fields.
+
+    Raises ValueError for invalid filters or cursors.
+    """
+    key = resource['key']
+    limit = min(max(args.get('limit', API_PAGE_SIZE, type=int) or API_PAGE_SIZE, 1), API_MAX_PAGE_SIZE)
+    query = db.select(key, *(resource['fields'][name] for name in fields)).select_from(resource['model'])
+    if 'join' in resource:
+        query = query.join(resource['join'])
+    query = query.where(*resource.get('where', ()))
+
+    for name, column in resource.get('filters', {}).items():
+        if args.get(name):
+            values = [parse_api_value(column, value) for value in args[name].split(',')]
+            query = query.where(column.in_(values) if len(values) > 1 else column == values[0])
+    if 'date' in resource:
+        if args.get('since'):
+            query = query.where(resource['date'] >= parse_api_value(resource['date'], args['since']))
+        if args.get('until'):
+            query = query.where(resource['date'] <= parse_api_value(resource['date'], args['until']))
+    if args.get('cursor'):
+        query = query.where(key > decode_api_cursor(key, args['cursor']))
+
+    if resource.get('group_by'):
+        query = query.group_by(key)
+    # One extra row tells whether there is a next page
+    return query.order_by(key).limit(limit + 1), limit
+
+@app.route('/api/v1/<path:resource_name>')
+def api_list(resource_name):
+    """Read-only JSON listing of an API_RESOURCES resource.
+
+    ?fields=id,name selects columns, ?cursor= continues from next_cursor and
+    ?limit= sets the page size. Responses carry an ETag, so unchanged pages cost
+    a 304 and no body.
+    """
+    resource = API_RESOURCES.get(resource_name)
+    if resource is None:
+        return api_error(f'Unknown resource: {resource_name}', 404)
+    error = api_permission_error(resource['role'])
+    if error:
+        return error
+
+    fields = [name.strip() for name in request.args.get('fields', '').split(',') if name.strip()]
+    fields = fields or list(resource['default_fields'])
+    unknown = [name for name in fields if name not in resource['fields']]
+    if unknown:
+        return api_error(f"Unknown field(s): {', '.join(unknown)}")
+
+    try:
+        query, limit = build_api_query(resource, fields, request.args)
+    except ValueError as e:
+        return api_error(str(e))
+    rows = db.session.execute(query).all()
+
+    page = rows[:limit]
+    response = jsonify({
+        'data': [{name: api_json_value(value) for name, value in zip(fields, row[1:])} for row in page],
+        'next_cursor': encode_api_cursor(page[-1][0]) if len(rows) > limit else None,
+    })
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.add_etag()
+    return response.make_conditional(request)
+
+def parse_reading(entry):
+    """Validate one readings:batch entry, returns (client_id, game_id, coin_count, date, notes).
+
+    Raises ValueError describing the first problem found.
+    """
+    if not isinstance(entry, dict):
+        raise ValueError('Entry must be an object')
+    client_id = entry.get('client_id')
+    if not isinstance(client_id, str) or not client_id or len(client_id) > 64:
+        raise ValueError('client_id must be a string of 1 to 64 characters')
+    game_id = entry.get('game_id')
+    if isinstance(game_id, bool) or not isinstance(game_id, int):
+        raise ValueError('game_id must be an integer')
+    coin_count = entry.get('coin_count')
+    if isinstance(coin_count, bool) or not isinstance(coin_count, int) or coin_count < 0:
+        raise ValueError('coin_count must be a non-negative integer')
+    try:
+        read_date = datetime.fromisoformat(entry.get('read_at')).date()
+    except (TypeError, ValueError):
+        raise ValueError('read_at must be an ISO 8601 date or time')
+    notes = entry.get('notes')
+    if notes is not None and not isinstance(notes, str):
+        raise ValueError('notes must be a string')
+    return client_id, game_id, coin_count, read_date, notes
+
+def latest_readings(game_ids):
+    """Latest stored (coin_count, date_recorded) of each game, in one query"""
+    if not game_ids:
+        return {}
+    ranked = db.select(
+        PlayRecord.game_id, PlayRecord.coin_count, PlayRecord.date_recorded,
+        db.func.row_number().over(partition_by=PlayRecord.game_id,
+                                  order_by=(PlayRecord.date_recorded.desc(), PlayRecord.id.desc())).label('position')
+    ).where(PlayRecord.game_id.in_(game_ids)).subquery()
+    rows = db.session.execute(db.select(ranked.c.game_id, ranked.c.coin_count, ranked.c.date_recorded)
+                              .where(ranked.c.position == 1))
+    return {game_id: (coin_count, date_recorded) for game_id, coin_count, date_recorded in rows}
+
+@app.route('/api/v1/readings:batch', methods=['POST'])
+@csrf.exempt
+def api_readings_batch():
+    """Record a batch of counter readings captured offline by a handheld collector.
+
+    Body: {"readings": [{"client_id", "game_id", "coin_count", "read_at"[, "notes"]}, ...]}.
+    client_id is the reading's idempotency key, so a batch whose response was lost
+    can be sent again. Each game's readings are applied in read_at order and, like
+    record_plays, may not go below the latest stored reading. All accepted readings
+    and the game totals are committed in one transaction. The response has one
+    result per entry, in request order: created, duplicate, rejected or invalid.
+    """
+    error = api_permission_error('manager')
+    if error:
+        return error
+    # Exempt from CSRF tokens, so only JSON is accepted: browsers won't send it cross-site without a CORS preflight
+    if not request.is_json:
+        return api_error('Expected a JSON body', 415)
+    body = request.get_json(silent=True)
+    entries = body.get('readings') if isinstance(body, dict) else None
+    if not isinstance(entries, list):
+        return api_error('Expected {"readings": [...]}')
+    if len(entries) > READINGS_BATCH_MAX:
+        return api_error(f'At most {READINGS_BATCH_MAX} readings per batch', 413)
+
+    results = [None] * len(entries)
+    readings = []
+    first_index = {}
+    for index, entry in enumerate(entries):
+        try:
+            client_id, game_id, coin_count, read_date, notes = parse_reading(entry)
+        except ValueError as e:
+            results[index] = {'status': 'invalid', 'error': str(e)}
+            continue
+        if client_id in first_index:
+            results[index] = {'status': 'duplicate'}  # Same result as the first copy, filled in below
+            continue
+        first_index[client_id] = index
+        readings.append((game_id, read_date, coin_count, index, client_id, notes))
+
+    game_ids = {reading[0] for reading in readings}
+    submitted = dict(db.session.execute(
+        db.select(ReadingSubmission.client_id, ReadingSubmission.play_record_id)
+        .where(ReadingSubmission.client_id.in_(first_index))).all()) if first_index else {}
+    games = {row.id: row for row in db.session.execute(
+        db.select(Game.id, Game.coins_per_play, Game.counter_status).where(Game.id.in_(game_ids)))} if game_ids else {}
+    latest = latest_readings(game_ids)
+
+    created = []
+    totals = {}
+    for game_id, read_date, coin_count, index, client_id, notes in sorted(readings):
+        if client_id in submitted:
+            results[index] = {'status': 'duplicate', 'play_record_id': submitted[client_id]}
+            continue
+        game = games.get(game_id)
+        last_coin_count, last_date = latest.get(game_id, (0, None))
+        if game is None:
+            reason = 'Unknown game'
+        elif game.counter_status != 'Working':
+            reason = f'Counter status is {game.counter_status.replace("_", " ")}'
+        elif last_date and read_date < last_date:
+            reason = f'Older than the latest stored reading ({last_date.isoformat()})'
+        elif coin_count < last_coin_count:
+            reason = f'Coin count ({coin_count}) is less than the previous reading ({last_coin_count})'
+        else:
+            reason = None
+        if reason:
+            results[index] = {'status': 'rejected', 'error': reason}
+            continue
+
+        new_plays = coin_count - last_coin_count
+        revenue = new_plays * game.coins_per_play
+        record = PlayRecord(game_id=game_id, coin_count=coin_count, plays_count=new_plays, revenue=revenue,
+                            date_recorded=read_date, notes=notes)
+        created.append((index, client_id, record))
+        latest[game_id] = (coin_count, read_date)
+        plays_total, revenue_total = totals.get(game_id, (0, 0.0))
+        totals[game_id] = (plays_total + new_plays, revenue_total + revenue)
+
+    if created:
+        db.session.add_all(record for _, _, record in created)
+        db.session.flush()  # Assigns the play record ids
+        db.session.add_all(ReadingSubmission(client_id=client_id, play_record_id=record.id)
+                           for _, client_id, record in created)
+        # One executemany for every game's totals, added in the database so concurrent updates aren't lost
+        game_table = Game.__table__
+        db.session.execute(
+            game_table.update().where(game_table.c.id == db.bindparam('game_id')).values(
+                total_plays=game_table.c.total_plays + db.bindparam('plays'),
+                total_revenue=game_table.c.total_revenue + db.bindparam('revenue'),
+                sync_version=next_sync_version(db.session.connection()),
+                updated_at=datetime.now(dt.UTC)),
+            [{'game_id': game_id, 'plays': plays, 'revenue': revenue} for game_id, (plays, revenue) in totals.items()])
+        # Filled in before the commit expires the records
+        for index, _, record in created:
+            results[index] = {'status': 'created', 'play_record_id': record.id,
+                              'plays_count': record.plays_count, 'revenue': record.revenue}
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return api_error('Some of these readings were submitted by another request at the same time, '
+                             'send the batch again', 409)
+
+    for index, entry in enumerate(entries):
+        if results[index] == {'status': 'duplicate'}:
+            original = results[first_index[entry['client_id']]]
+            results[index] = {'status': 'duplicate', 'play_record_id': original.get('play_record_id')}
+
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    return jsonify({'results': results, 'counts': counts})
+
+# Columns each /api/v1/sync entity sends. The first download (no cursor) is limited
+# to what a tablet needs (sync_initial_filter); later syncs send every changed row,
+# so a work order that was closed arrives once more with its final status.
+SYNC_FIELDS = {
+    'games': {
+        'id': Game.id,
+        'name': Game.name,
+        'location': Game.location,
+        'floor_position': Game.floor_position,
+        'warehouse_section': Game.warehouse_section,
+        'status': Game.status,
+        'counter_status': Game.counter_status,
+    },
+    'work_orders': {
+        'id': MaintenanceRecord.id,
+        'game_id': MaintenanceRecord.game_id,
+        'issue_description': MaintenanceRecord.issue_description,
+        'fix_description': MaintenanceRecord.fix_description,
+        'parts_used': MaintenanceRecord.parts_used,
+        'status': MaintenanceRecord.status,
+        'technician': MaintenanceRecord.technician,
+        'date_reported': MaintenanceRecord.date_reported,
+        'date_fixed': MaintenanceRecord.date_fixed,
+    },
+    'work_logs': {
+        'id': WorkLog.id,
+        'maintenance_id': WorkLog.maintenance_id,
+        'user_id': WorkLog.user_id,
+        'work_description': WorkLog.work_description,
+        'parts_used': WorkLog.parts_used,
+        'time_spent': WorkLog.time_spent,
+        'timestamp': WorkLog.timestamp,
+    },
+    'inventory': {
+        'id': InventoryItem.id,
+        'name': InventoryItem.name,
+        'part_number': InventoryItem.part_number,
+        'stock_quantity': InventoryItem.stock_quantity,
+        'minimum_stock': InventoryItem.minimum_stock,
+    },
+}
+
+def sync_initial_filter(entity):
+    """Filter for the first download of an entity, None for every row"""
+    if entity == 'work_orders':
+        return MaintenanceRecord.status.in_(OPEN_MAINTENANCE_STATUSES)
+    if entity == 'work_logs':
+        return WorkLog.maintenance_id.in_(db.select(MaintenanceRecord.id).where(
+            MaintenanceRecord.status.in_(OPEN_MAINTENANCE_STATUSES)))
+    return None
+
+@app.route('/api/v1/reliability')
+def api_reliability():
+    """MTBF and MTTR in days per ?group=game (default), manufacturer or genre, least reliable first"""
+    error = api_permission_error('manager')
+    if error:
+        return error
+    group = request.args.get('group', 'game')
+    try:
+        rows = reliability_stats.by(group)
+    except ValueError as e:
+        return api_error(str(e))
+    response = jsonify({'group': group, 'data': rows})
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.add_etag()
+    return response.make_conditional(request)
+
+@app.route('/api/v1/sync')
+def api_sync():
+    """Change feed for offline tablets.
+
+    Without ?cursor= every game, open work order (with its work logs) and
+    inventory item is sent. With the cursor of the previous response only rows
+    changed since then are sent, plus the ids of deleted rows, so a sync with
+    nothing new is a few bytes. Entities without changes are left out.
+    """
+    error = api_permission_error('operator')
+    if error:
+        return error
+    cursor = request.args.get('cursor')
+    if cursor is not None:
+        try:
+            since = int(cursor)
+        except ValueError:
+            return api_error('Invalid cursor')
+
+    # Rows are read up to the committed counter, later changes go in the next sync
+    until = db.session.execute(db.select(SyncCounter.value)).scalar() or 0
+    changes = {}
+    for entity, fields in SYNC_FIELDS.items():
+        model = SYNC_ENTITIES[entity]
+        query = db.select(*fields.values()).where(model.sync_version <= until)
+        if cursor is None:
+            initial = sync_initial_filter(entity)
+            if initial is not None:
+                query = query.where(initial)
+        else:
+            query = query.where(model.sync_version > since)
+        rows = db.session.execute(query.order_by(model.id)).all()
+        if rows:
+            changes[entity] = [{name: api_json_value(value) for name, value in zip(fields, row)} for row in rows]
+
+    deleted = {}
+    if cursor is not None:
+        for entity, row_id in db.session.execute(
+                db.select(SyncTombstone.entity, SyncTombstone.row_id)
+                .where(SyncTombstone.sync_version > since, SyncTombstone.sync_version <= until)
+                .order_by(SyncTombstone.id)):
+            deleted.setdefault(entity, []).append(row_id)
+
+    return jsonify({'cursor': str(until), 'full': cursor is None, 'changes': changes, 'deleted': deleted})
+
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
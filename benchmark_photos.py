@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark photo compression on a corpus of 12 MP phone-sized images.
+
+Times compress_and_save_image (full size plus derivatives) one image after
+another and on thread pools of different sizes, the way maintenance_photos
+processes a multi-photo upload.
+
+Usage:
+    python benchmark_photos.py                      # generated corpus of 10 images
+    python benchmark_photos.py --corpus ~/photos    # your own JPEGs
+    python benchmark_photos.py --workers 1,2,4,8 --images 20
+"""
+
+import os
+import sys
+import io
+import glob
+import time
+import shutil
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def generate_corpus(directory, count, size=(4000, 3000)):
+    """Write count noisy 12 MP JPEGs (noise keeps them as expensive as real photos)"""
+    from PIL import Image
+
+    paths = []
+    width, height = size
+    for i in range(count):
+        noise = Image.effect_noise(size, 40 + i)
+        gradient = Image.linear_gradient('L').resize(size)
+        image = Image.merge('RGB', (noise, gradient, gradient.rotate(90, expand=False)))
+        path = os.path.join(directory, f'corpus_{i:02d}.jpg')
+        image.save(path, 'JPEG', quality=92)
+        paths.append(path)
+    return paths
+
+
+def load_uploads(paths):
+    """Read the corpus into memory as upload objects, like request.files"""
+    from werkzeug.datastructures import FileStorage
+
+    uploads = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            data = f.read()
+        uploads.append((os.path.basename(path), data))
+    return [FileStorage(stream=io.BytesIO(data), filename=name) for name, data in uploads]
+
+
+def run_pass(uploads, output_dir, workers):
+    """Compress every upload, returns elapsed seconds"""
+    from app import compress_and_save_image
+
+    jobs = [(upload, os.path.join(output_dir, f'w{workers}_{i}.jpg')) for i, upload in enumerate(uploads)]
+    for upload, _ in jobs:
+        upload.stream.seek(0)
+
+    started = time.perf_counter()
+    if workers == 0:
+        for upload, path in jobs:
+            compress_and_save_image(upload, path)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(lambda job: compress_and_save_image(*job), jobs))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark sequential vs pooled photo compression')
+    parser.add_argument('--corpus', help='Directory of JPEGs to use instead of a generated corpus')
+    parser.add_argument('--images', type=int, default=10, help='Number of images to generate')
+    parser.add_argument('--workers', default='1,2,4,8', help='Comma separated pool sizes to try')
+    parser.add_argument('--repeat', type=int, default=2, help='Passes per configuration (best is reported)')
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp(prefix='arcade_photo_bench_')
+    try:
+        if args.corpus:
+            paths = sorted(glob.glob(os.path.join(args.corpus, '*.jp*g')))[:args.images]
+        else:
+            print(f"🖼️  Generating {args.images} 12 MP test images...")
+            paths = generate_corpus(temp_dir, args.images)
+        if not paths:
+            print("❌ No images found")
+            return 1
+
+        uploads = load_uploads(paths)
+        corpus_mb = sum(len(u.stream.getvalue()) for u in uploads) / (1024 * 1024)
+        print(f"📦 Corpus: {len(uploads)} images, {corpus_mb:.1f}MB, {os.cpu_count()} CPUs\n")
+
+        output_dir = os.path.join(temp_dir, 'out')
+        os.makedirs(output_dir)
+
+        configurations = [0] + [int(w) for w in args.workers.split(',') if w.strip()]
+        baseline = None
+        print(f"   {'mode':<16}{'total s':>10}{'per image ms':>14}{'speedup':>10}")
+        for workers in configurations:
+            elapsed = min(run_pass(uploads, output_dir, workers) for _ in range(args.repeat))
+            baseline = baseline or elapsed
+            label = 'sequential' if workers == 0 else f'{workers} threads'
+            print(f"   {label:<16}{elapsed:>10.2f}{elapsed / len(uploads) * 1000:>14.0f}{baseline / elapsed:>9.1f}x")
+
+        output_mb = sum(os.path.getsize(p) for p in glob.glob(os.path.join(output_dir, 'w0_*'))) / (1024 * 1024)
+        print(f"\n💾 Output per pass (full + derivatives): {output_mb:.1f}MB")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Route-level benchmark suite using the Flask test client.
+
+Generates synthetic datasets of increasing size (see generate_synthetic_data.py),
+logs in as each role and times the major endpoints. For every endpoint it
+records wall time, SQL query count and peak Python memory. Results are written
+as JSON, and a saved baseline can be compared against to catch regressions.
+
+Usage:
+    python benchmark_routes.py --sizes 50,500,2000 --output benchmark_results.json
+    python benchmark_routes.py --sizes 50,500,2000 --compare benchmark_baseline.json
+    python benchmark_routes.py --results new.json --compare benchmark_baseline.json
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+ROLES = ['admin', 'manager', 'operator', 'readonly']
+
+# (name, endpoint, needs game_id, query string)
+ENDPOINTS = [
+    ('home', 'home', False, {}),
+    ('games_list', 'games_list', False, {}),
+    ('game_detail', 'game_detail', True, {}),
+    ('record_plays', 'record_plays', True, {}),
+    ('revenue_reports', 'revenue_reports', False, {}),
+    ('maintenance_reports', 'maintenance_reports', False, {}),
+    ('graphs', 'graphs', False, {}),
+    ('export_report', 'export_report', False, {}),
+    ('export_csv', 'export_csv', False, {}),
+    ('inventory_list', 'inventory_list', False, {}),
+    ('maintenance_orders', 'maintenance_orders', False, {}),
+]
+
+
+@contextmanager
+def count_queries(engine):
+    """Collect every SQL statement executed on engine inside the block"""
+    from sqlalchemy import event
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def install_template_fallback(app):
+    """Render missing templates as empty pages so view code can still be timed.
+
+    Returns True when the fallback was needed. Timings then exclude template
+    rendering (and any lazy loads the templates would trigger).
+    """
+    from jinja2 import ChoiceLoader, FunctionLoader
+
+    if os.path.isdir(os.path.join(app.root_path, app.template_folder)):
+        return False
+    app.jinja_env.loader = ChoiceLoader([app.jinja_env.loader, FunctionLoader(lambda name: '')])
+    return True
+
+
+def login(client, username, password):
+    """Log the test client in, returns True on success"""
+    response = client.post('/login', data={'username': username, 'password': password})
+    return response.status_code == 302 and '/login' not in response.headers.get('Location', '')
+
+
+def measure_endpoint(client, url, engine, repeat):
+    """Time one URL, then count queries and peak memory on a separate traced run"""
+    client.get(url)  # Warm up caches and lazy imports
+    timings = []
+    status = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(url)
+        timings.append((time.perf_counter() - started) * 1000)
+        status = response.status_code
+
+    with count_queries(engine) as statements:
+        tracemalloc.start()
+        response = client.get(url)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'url': url,
+        'status': status,
+        'wall_ms_median': round(statistics.median(timings), 2),
+        'wall_ms_min': round(min(timings), 2),
+        'queries': len(statements),
+        'peak_kb': round(peak / 1024, 1),
+        'response_kb': round(len(response.get_data()) / 1024, 1),
+    }
+
+
+def run_worker(result_file, roles, repeat, password):
+    """Benchmark the database configured through DATABASE_URL (run in a subprocess)"""
+    from app import app, db, Game
+
+    app.config['WTF_CSRF_ENABLED'] = False
+    templates_stubbed = install_template_fallback(app)
+
+    # Requests must run outside this app context, otherwise g (and the
+    # logged in user) and the database session leak between requests
+    with app.app_context():
+        game = (Game.query.filter_by(location='Floor', counter_status='Working').order_by(Game.id).first()
+                or Game.query.order_by(Game.id).first())
+        game_id = game.id if game else 0
+        engine = db.engine
+    with app.test_request_context():
+        from flask import url_for
+        urls = [(name, url_for(endpoint, game_id=game_id, **params) if needs_game else url_for(endpoint, **params))
+                for name, endpoint, needs_game, params in ENDPOINTS]
+
+    results = {}
+    for role in roles:
+        client = app.test_client()
+        if not login(client, role, password):
+            results[role] = {'error': f'Could not log in as {role}'}
+            continue
+        results[role] = {name: measure_endpoint(client, url, engine, repeat) for name, url in urls}
+
+    with open(result_file, 'w') as f:
+        json.dump({'templates_stubbed': templates_stubbed, 'results': results}, f)
+
+
+def run_benchmarks(sizes, years, seed, roles, repeat, password):
+    """Generate each dataset and benchmark it in a fresh interpreter"""
+    from generate_synthetic_data import generate
+
+    output = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sizes': sizes,
+            'years': years,
+            'seed': seed,
+            'repeat': repeat,
+        },
+        'results': {}
+    }
+
+    with tempfile.TemporaryDirectory(prefix='arcade_bench_') as temp_dir:
+        for size in sizes:
+            db_path = os.path.join(temp_dir, f'bench_{size}.db')
+            result_file = os.path.join(temp_dir, f'bench_{size}.json')
+            print(f"📦 Generating dataset with {size} games...")
+            counts = generate(db_path, games=size, years=years, seed=seed, password=password, verbose=False)
+            print(f"⏱️  Benchmarking {size} games ({counts['play_records']:,} play records)...")
+
+            env = dict(os.environ, DATABASE_URL=f'sqlite:///{db_path}')
+            cmd = [sys.executable, os.path.abspath(__file__), '--worker', '--result-file', result_file,
+                   '--roles', ','.join(roles), '--repeat', str(repeat), '--password', password]
+            proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(f"❌ Benchmark failed for {size} games:\n{proc.stderr}")
+                continue
+
+            with open(result_file) as f:
+                worker_output = json.load(f)
+            if worker_output['templates_stubbed']:
+                output['meta']['templates_stubbed'] = True
+            output['results'][str(size)] = dict(worker_output['results'], _counts=counts)
+
+    return output
+
+
+def compare_results(baseline, current, threshold, min_ms=5.0, min_kb=256.0):
+    """Return a list of regressions of current against baseline"""
+    regressions = []
+    for size, roles in current['results'].items():
+        for role, endpoints in roles.items():
+            if role.startswith('_') or 'error' in endpoints:
+                continue
+            for name, cur in endpoints.items():
+                base = baseline.get('results', {}).get(size, {}).get(role, {}).get(name)
+                if not base:
+                    continue
+                label = f'{size} games / {role} / {name}'
+                if cur['status'] != base['status']:
+                    regressions.append(f"{label}: status {base['status']} -> {cur['status']}")
+                if cur['queries'] > base['queries']:
+                    regressions.append(f"{label}: queries {base['queries']} -> {cur['queries']}")
+                slower = cur['wall_ms_median'] - base['wall_ms_median']
+                if slower > min_ms and cur['wall_ms_median'] > base['wall_ms_median'] * (1 + threshold):
+                    regressions.append(f"{label}: wall time {base['wall_ms_median']:.1f}ms -> "
+                                       f"{cur['wall_ms_median']:.1f}ms")
+                bigger = cur['peak_kb'] - base['peak_kb']
+                if bigger > min_kb and cur['peak_kb'] > base['peak_kb'] * (1 + threshold):
+                    regressions.append(f"{label}: peak memory {base['peak_kb']:.0f}KB -> {cur['peak_kb']:.0f}KB")
+    return regressions
+
+
+def print_results(output, baseline=None):
+    """Print a table of results, with deltas if a baseline is given"""
+    for size, roles in output['results'].items():
+        counts = roles.get('_counts', {})
+        print(f"\n=== {size} games ({counts.get('play_records', 0):,} play records) ===")
+        for role, endpoints in roles.items():
+            if role.startswith('_'):
+                continue
+            print(f"\n  [{role}]")
+            if 'error' in endpoints:
+                print(f"    {endpoints['error']}")
+                continue
+            print(f"    {'endpoint':<22}{'status':>7}{'ms':>10}{'queries':>9}{'peak KB':>10}{'vs base':>10}")
+            for name, cur in endpoints.items():
+                delta = ''
+                base = (baseline or {}).get('results', {}).get(size, {}).get(role, {}).get(name)
+                if base and base['wall_ms_median']:
+                    delta = f"{(cur['wall_ms_median'] / base['wall_ms_median'] - 1) * 100:+.0f}%"
+                print(f"    {name:<22}{cur['status']:>7}{cur['wall_ms_median']:>10.1f}{cur['queries']:>9}"
+                      f"{cur['peak_kb']:>10.0f}{delta:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the main routes against generated datasets')
+    parser.add_argument('--sizes', default='50,500,2000', help='Comma separated game counts to benchmark')
+    parser.add_argument('--years', type=float, default=1.0, help='Years of daily readings per dataset')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for the generated data')
+    parser.add_argument('--roles', default=','.join(ROLES), help='Comma separated roles to log in as')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed requests per endpoint')
+    parser.add_argument('--password', default='password123', help='Password of the generated users')
+    parser.add_argument('--output', default='benchmark_results.json', help='Where to write the JSON results')
+    parser.add_argument('--compare', metavar='BASELINE', help='Baseline JSON to compare against')
+    parser.add_argument('--results', help='Compare an existing results file instead of running benchmarks')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed slowdown/memory growth (0.2 = 20%%)')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    roles = [r.strip() for r in args.roles.split(',') if r.strip()]
+
+    if args.worker:
+        run_worker(args.result_file, roles, args.repeat, args.password)
+        return 0
+
+    if args.results:
+        with open(args.results) as f:
+            output = json.load(f)
+    else:
+        sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+        output = run_benchmarks(sizes, args.years, args.seed, roles, args.repeat, args.password)
+        with open(args.output, 'w') as f:
+            json.dump(output, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    print_results(output, baseline)
+    if output['meta'].get('templates_stubbed'):
+        print("\n⚠️  templates/ not found - pages were rendered with empty templates, timings exclude rendering")
+
+    if baseline:
+        regressions = compare_results(baseline, output, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) against {args.compare}:")
+            for regression in regressions:
+                print(f"   - {regression}")
+            return 1
+        print(f"\n✅ No regressions against {args.compare}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
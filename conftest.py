@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# Point the app at a throwaway database before any test module imports it,
+# so the test suite never touches arcade.db
+_test_dir = tempfile.mkdtemp(prefix='arcade_tests_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_test_dir, 'test.db')}"
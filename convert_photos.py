@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Backfill WebP/AVIF variants for photos that were stored as JPEG only.
+
+Walks static/maintenance_photos and static/uploads and writes a variant next to
+every image (including the _medium/_thumb derivatives) on a thread pool.
+serve_photo() then hands browsers the smallest variant they accept.
+
+Usage:
+    python convert_photos.py                        # formats from PHOTO_FORMATS (or webp)
+    python convert_photos.py --formats webp,avif --workers 4
+    python convert_photos.py --dry-run
+"""
+
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+SOURCE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif'}
+
+
+def find_jobs(directories, formats, force=False):
+    """List (source path, [formats]) for every image missing a variant"""
+    from app import alternate_filename
+
+    jobs = []
+    for directory in directories:
+        if not os.path.isdir(directory):
+            continue
+        for dirpath, dirnames, filenames in os.walk(directory):
+            for filename in sorted(filenames):
+                if os.path.splitext(filename)[1].lower() not in SOURCE_EXTENSIONS:
+                    continue
+                path = os.path.join(dirpath, filename)
+                missing = [fmt for fmt in formats if force or not os.path.exists(alternate_filename(path, fmt))]
+                if missing:
+                    jobs.append((path, missing))
+    return jobs
+
+
+def convert(path, formats):
+    """Decode one image and write its variants, returns (source bytes, {format: bytes})"""
+    from PIL import Image, ImageOps
+    from app import save_alternate_formats
+
+    with Image.open(path) as image:
+        if getattr(image, 'is_animated', False):
+            return os.path.getsize(path), {}
+        # Variants carry no EXIF, so bake the orientation in like browsers show it
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+        saved = save_alternate_formats(image, path, formats)
+    return os.path.getsize(path), {fmt: os.path.getsize(p) for fmt, p in saved.items()}
+
+
+def main():
+    from app import app, enabled_photo_formats, PHOTO_FORMAT_OPTIONS, PHOTO_WORKERS
+
+    parser = argparse.ArgumentParser(description='Backfill WebP/AVIF variants for stored photos')
+    parser.add_argument('--formats', default=','.join(enabled_photo_formats()) or 'webp',
+                        help='Comma separated formats to write (webp, avif)')
+    parser.add_argument('--dirs', default='maintenance_photos,uploads',
+                        help='Comma separated folders under static/ to convert')
+    parser.add_argument('--workers', type=int, default=PHOTO_WORKERS, help='Conversion threads')
+    parser.add_argument('--force', action='store_true', help='Re-encode variants that already exist')
+    parser.add_argument('--dry-run', action='store_true', help='Only list how many files would be converted')
+    args = parser.parse_args()
+
+    from PIL import Image
+    Image.init()
+    formats = []
+    for fmt in (f.strip().lower() for f in args.formats.split(',') if f.strip()):
+        if fmt not in PHOTO_FORMAT_OPTIONS:
+            print(f"❌ Unknown format: {fmt}")
+            return 1
+        if fmt.upper() not in Image.SAVE:
+            print(f"⚠️  This Pillow can't encode {fmt.upper()}, skipping it")
+            continue
+        formats.append(fmt)
+    if not formats:
+        print("❌ No usable formats")
+        return 1
+
+    directories = [os.path.join(app.static_folder, d.strip()) for d in args.dirs.split(',') if d.strip()]
+    jobs = find_jobs(directories, formats, args.force)
+    print(f"🖼️  {len(jobs)} images need {', '.join(formats)} variants")
+    if args.dry_run or not jobs:
+        return 0
+
+    started = time.perf_counter()
+    source_bytes = 0
+    variant_bytes = {fmt: 0 for fmt in formats}
+    failed = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = [(path, executor.submit(convert, path, missing)) for path, missing in jobs]
+        for done, (path, future) in enumerate(futures, 1):
+            try:
+                size, variants = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"   ❌ {path}: {e}")
+                continue
+            if variants:
+                source_bytes += size
+            for fmt, variant_size in variants.items():
+                variant_bytes[fmt] += variant_size
+            if done % 100 == 0:
+                print(f"   ... {done}/{len(jobs)}")
+
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ Converted {len(jobs) - failed} images in {elapsed:.1f}s ({failed} failed)")
+    if source_bytes:
+        for fmt, total in variant_bytes.items():
+            print(f"   {fmt}: {total / (1024 * 1024):.1f}MB vs {source_bytes / (1024 * 1024):.1f}MB original "
+                  f"({(1 - total / source_bytes) * 100:.0f}% smaller)")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
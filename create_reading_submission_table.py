@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the reading_submission table (idempotency keys of
+coin readings sent to /api/v1/readings:batch).
+"""
+
+from app import app, db
+from sqlalchemy import inspect
+
+def table_exists(table_name):
+    """Check if a table exists in the database"""
+    inspector = inspect(db.engine)
+    return table_name in inspector.get_table_names()
+
+def main():
+    with app.app_context():
+        print("Checking database schema...")
+        
+        if table_exists('reading_submission'):
+            print("✓ reading_submission table already exists")
+        else:
+            print("Creating reading_submission table...")
+            db.create_all()
+            print("✓ reading_submission table created successfully!")
+        
+        print("\nDatabase migration complete!")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the stored_file table (photo reference counts).
+Existing maintenance photos, game images and profile pictures are registered
+with the number of records that reference them.
+"""
+
+import json
+from collections import Counter
+
+from app import app, db, StoredFile, MaintenanceRecord, Game, User, add_file_reference
+from sqlalchemy import inspect
+
+def table_exists(table_name):
+    """Check if a table exists in the database"""
+    inspector = inspect(db.engine)
+    return table_name in inspector.get_table_names()
+
+def count_references():
+    """Count how many records reference each stored file, keyed by (kind, filename)"""
+    references = Counter()
+    for (photos,) in db.session.query(MaintenanceRecord.photos).filter(MaintenanceRecord.photos.isnot(None)):
+        try:
+            for photo in json.loads(photos) or []:
+                references[('maintenance', photo)] += 1
+        except (json.JSONDecodeError, TypeError):
+            continue
+    for (filename,) in db.session.query(Game.image_filename).filter(Game.image_filename.isnot(None)):
+        references[('uploads', filename)] += 1
+    for (filename,) in db.session.query(User.profile_picture).filter(User.profile_picture.isnot(None)):
+        references[('profile', filename)] += 1
+    return references
+
+def main():
+    with app.app_context():
+        print("Checking database schema...")
+
+        if table_exists('stored_file'):
+            print("✓ stored_file table already exists")
+        else:
+            print("Creating stored_file table...")
+            db.create_all()
+            print("✓ stored_file table created successfully!")
+
+        if StoredFile.query.first():
+            print("✓ References already registered")
+        else:
+            references = count_references()
+            for (kind, filename), count in references.items():
+                for _ in range(count):
+                    add_file_reference(kind, filename)
+                db.session.flush()
+            db.session.commit()
+            print(f"✓ Registered {len(references)} stored files")
+
+        print("\nDatabase migration complete!")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Migration script for the /api/v1/sync change feed.
+Adds the indexed sync_version and updated_at columns to the game,
+maintenance_record, work_log and inventory_item tables, and creates the
+sync_counter and sync_tombstone tables.
+"""
+
+from app import app, db, SYNC_ENTITIES
+from sqlalchemy import inspect, text
+
+COLUMNS = {
+    'sync_version': 'INTEGER NOT NULL DEFAULT 0',
+    'updated_at': 'DATETIME',
+}
+
+def table_exists(table_name):
+    """Check if a table exists in the database"""
+    inspector = inspect(db.engine)
+    return table_name in inspector.get_table_names()
+
+def add_sync_columns(table_name):
+    """Add the missing sync columns and their indexes to a table"""
+    inspector = inspect(db.engine)
+    columns = {column['name'] for column in inspector.get_columns(table_name)}
+    indexes = {index['name'] for index in inspector.get_indexes(table_name)}
+    with db.engine.begin() as connection:
+        for column_name, definition in COLUMNS.items():
+            if column_name in columns:
+                print(f"✓ {table_name}.{column_name} already exists")
+            else:
+                connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {definition}"))
+                print(f"✓ Added {column_name} to {table_name}")
+            index_name = f"ix_{table_name}_{column_name}"
+            if index_name not in indexes:
+                connection.execute(text(f"CREATE INDEX {index_name} ON {table_name} ({column_name})"))
+                print(f"✓ Created index {index_name}")
+
+def main():
+    with app.app_context():
+        print("Checking database schema...")
+
+        for model in SYNC_ENTITIES.values():
+            add_sync_columns(model.__tablename__)
+
+        if table_exists('sync_counter') and table_exists('sync_tombstone'):
+            print("✓ sync_counter and sync_tombstone tables already exist")
+        else:
+            print("Creating sync_counter and sync_tombstone tables...")
+            db.create_all()
+            print("✓ Sync tables created successfully!")
+
+        print("\nDatabase migration complete!")
+
+if __name__ == '__main__':
+    main()
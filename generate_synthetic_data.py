@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic arcade fleet for scale testing.
+
+Fills a fresh SQLite database with a reproducible (seeded) set of games,
+daily coin counter readings, maintenance orders with work logs, inventory
+items, stock history and inventory requests. Rows are bulk inserted with
+executemany inside large transactions, so millions of play records only
+take a few minutes.
+
+Usage:
+    python generate_synthetic_data.py --db instance/arcade_synthetic.db --games 500 --years 3
+    DATABASE_URL=sqlite:////full/path/to/arcade_synthetic.db python app.py
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+from datetime import datetime, date, timedelta
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+BATCH_SIZE = 100000  # Rows per executemany call
+
+TITLES = ['Galaxy', 'Street', 'Turbo', 'Dragon', 'Neon', 'Mega', 'Space', 'Pixel', 'Thunder', 'Shadow',
+          'Cyber', 'Rally', 'Ninja', 'Robo', 'Laser', 'Atomic', 'Crystal', 'Blaster', 'Monster', 'Star']
+SUFFIXES = ['Fighter', 'Racer', 'Invaders', 'Hunter', 'Quest', 'Blitz', 'Warriors', 'Pinball', 'Derby', 'Strike',
+            'Commando', 'Legends', 'Rampage', 'Drift', 'Arena', 'Patrol', 'Frenzy', 'Storm', 'Dash', 'Mania']
+MANUFACTURERS = ['Namco', 'Sega', 'Capcom', 'Konami', 'Atari', 'Midway', 'Taito', 'Williams', 'Stern', 'Raw Thrills']
+GENRES = ['Fighting', 'Racing', 'Shooter', 'Pinball', 'Puzzle', 'Sports', 'Platformer', 'Rhythm', 'Redemption']
+ISSUES = ['Coin mech jammed', 'Monitor flickering', 'Joystick not registering', 'No sound from speakers',
+          'Button stuck', 'Ticket dispenser empty error', 'Power supply failing', 'Flipper coil weak',
+          'Marquee light out', 'Game resets randomly', 'Steering wheel loose', 'Gun calibration off']
+FIXES = ['Cleaned and re-seated', 'Replaced microswitch', 'Replaced power supply', 'Recalibrated',
+         'Replaced fuse', 'Tightened connections', 'Replaced bulb', 'Reflowed solder joints']
+PARTS = ['Microswitch', 'Joystick', 'Push Button', 'Coin Mech', 'Power Supply', 'Fuse 5A', 'Flipper Coil',
+         'LED Strip', 'Speaker', 'Ticket Dispenser', 'Monitor Cap Kit', 'Trackball', 'Gun Sensor', 'Belt']
+SUPPLIERS = ['Suzo-Happ', 'Arcade Parts Co', 'Marco Specialties', 'Pinball Life', 'Betson']
+
+
+def create_schema(db_path):
+    """Create all application tables in the target database"""
+    from sqlalchemy import create_engine
+    from app import db
+
+    engine = create_engine(f'sqlite:///{os.path.abspath(db_path)}')
+    db.metadata.create_all(engine)
+    engine.dispose()
+
+
+def _ts(value):
+    """Format a datetime the way SQLAlchemy stores it in SQLite"""
+    return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+
+
+def _insert_batches(cursor, sql, rows):
+    """executemany over any iterable of rows in BATCH_SIZE chunks"""
+    batch = []
+    count = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            cursor.executemany(sql, batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        cursor.executemany(sql, batch)
+        count += len(batch)
+    return count
+
+
+def generate_users(cursor, rng, password):
+    """Create one account per role plus extra technicians"""
+    from werkzeug.security import generate_password_hash
+
+    password_hash = generate_password_hash(password)
+    created = _ts(datetime.now())
+    users = [('admin', 'admin'), ('manager', 'manager'), ('operator', 'operator'), ('readonly', 'readonly')]
+    users += [(f'tech{i}', 'operator') for i in range(1, 6)]
+    rows = [(i, username, password_hash, role, 1, created, 0)
+            for i, (username, role) in enumerate(users, 1)]
+    cursor.executemany(
+        'INSERT INTO user (id, username, password_hash, role, is_active, created_at, must_change_password) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+    technicians = [(row[0], row[1]) for row in rows if row[3] in ('operator', 'manager')]
+    return rows, technicians
+
+
+def generate_games(rng, num_games, start_date, end_date):
+    """Build the game fleet in memory (totals are filled in from play records)"""
+    span_days = (end_date - start_date).days
+    games = []
+    for game_id in range(1, num_games + 1):
+        location = rng.choices(['Floor', 'Warehouse', 'Shipped'], weights=[65, 25, 10])[0]
+        if location == 'Shipped':
+            status = 'Retired'
+        else:
+            status = rng.choices(['Working', 'Being_Fixed', 'Not_Working'], weights=[85, 10, 5])[0]
+        counter_status = rng.choices(['Working', 'No_Counter', 'Broken_Counter'], weights=[90, 5, 5])[0]
+        # Most of the fleet was in place at the start, the rest arrived over time
+        added_offset = 0 if rng.random() < 0.6 else rng.randint(0, max(span_days - 30, 0))
+        # Games moved off the floor stopped producing readings at some point
+        if location == 'Floor':
+            last_offset = span_days
+        else:
+            last_offset = rng.randint(added_offset, span_days)
+        games.append({
+            'id': game_id,
+            'name': f'{rng.choice(TITLES)} {rng.choice(SUFFIXES)} {game_id}',
+            'manufacturer': rng.choice(MANUFACTURERS),
+            'year': rng.randint(1978, 2024),
+            'genre': rng.choice(GENRES),
+            'location': location,
+            'floor_position': f'Row {rng.randint(1, 20)}' if location == 'Floor' else None,
+            'warehouse_section': f'Bay {rng.choice("ABCDEF")}' if location == 'Warehouse' else None,
+            'status': status,
+            'coins_per_play': rng.choice([0.25, 0.5, 0.75, 1.0, 2.0]),
+            'counter_status': counter_status,
+            'date_added': datetime.combine(start_date + timedelta(days=added_offset), datetime.min.time()),
+            'added_offset': added_offset,
+            'last_offset': last_offset,
+            'popularity': rng.lognormvariate(3.0, 0.6),  # Mean plays per day
+            'total_plays': 0,
+            'total_revenue': 0.0,
+        })
+    return games
+
+
+def play_record_rows(rng, games, start_date):
+    """Yield daily cumulative coin counter readings for every game with a working counter"""
+    day_strings = {}
+    for game in games:
+        if game['counter_status'] != 'Working':
+            continue
+        coin_count = rng.randint(0, 50000)
+        popularity = game['popularity']
+        spread = popularity * 0.4
+        price = game['coins_per_play']
+        total_plays = 0
+        for offset in range(game['added_offset'], game['last_offset'] + 1):
+            day = day_strings.get(offset)
+            if day is None:
+                day = (start_date + timedelta(days=offset)).isoformat()
+                day_strings[offset] = day
+            if offset == game['added_offset']:
+                # Baseline reading, no plays yet
+                yield (game['id'], coin_count, 0, 0.0, day, 'Baseline coin count')
+                continue
+            plays = int(rng.gauss(popularity, spread))
+            if plays < 0:
+                plays = 0
+            coin_count += plays
+            total_plays += plays
+            yield (game['id'], coin_count, plays, plays * price, day, None)
+        game['total_plays'] = total_plays
+        game['total_revenue'] = total_plays * price
+
+
+def maintenance_rows(rng, games, technicians, start_date, end_date):
+    """Build maintenance orders and their work logs"""
+    orders = []
+    work_logs = []
+    order_id = 0
+    now = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+    for game in games:
+        active_days = game['last_offset'] - game['added_offset'] + 1
+        # Roughly one breakdown every two months of service
+        num_orders = sum(1 for _ in range(active_days // 60 + 1) if rng.random() < 0.7)
+        for _ in range(num_orders):
+            order_id += 1
+            reported = game['date_added'] + timedelta(days=rng.randint(0, active_days - 1),
+                                                      minutes=rng.randint(8 * 60, 22 * 60))
+            age_days = (now - reported).days
+            if age_days < 14 and rng.random() < 0.7:
+                status = rng.choice(['Open', 'In_Progress'])
+            else:
+                status = rng.choices(['Fixed', 'Deferred'], weights=[90, 10])[0]
+            date_fixed = None
+            if status == 'Fixed':
+                date_fixed = reported + timedelta(days=rng.randint(0, min(age_days, 21)), hours=rng.randint(1, 8))
+            technician_id, technician_name = rng.choice(technicians)
+            cost = round(rng.uniform(5, 400), 2) if status == 'Fixed' else None
+            fix = rng.choice(FIXES)
+            orders.append((order_id, game['id'], rng.choice(ISSUES), fix if status != 'Open' else None,
+                           cost, _ts(reported), _ts(date_fixed) if date_fixed else None, status,
+                           technician_name))
+            if status == 'Open':
+                continue
+            last_time = date_fixed or now
+            for _ in range(rng.randint(1, 4)):
+                logged = reported + (last_time - reported) * rng.random()
+                work_logs.append((order_id, technician_id, f'{fix} - {rng.choice(PARTS).lower()} checked',
+                                  rng.choice(PARTS) if rng.random() < 0.5 else None,
+                                  round(rng.uniform(0.25, 4), 2), round(rng.uniform(0, 120), 2), _ts(logged)))
+    return orders, work_logs
+
+
+def inventory_rows(rng, num_items, num_games, user_ids, start_date, end_date):
+    """Build inventory items, compatibility links, stock history, alerts and requests"""
+    items = []
+    compatibility = []
+    history = []
+    alerts = []
+    span_days = (end_date - start_date).days
+    start = datetime.combine(start_date, datetime.min.time())
+    for item_id in range(1, num_items + 1):
+        part = rng.choice(PARTS)
+        minimum_stock = rng.randint(2, 10)
+        quantity = rng.randint(20, 60)
+        added = start + timedelta(days=rng.randint(0, max(span_days // 4, 1)))
+        history.append((item_id, 'added', quantity, 0, quantity, 'Initial stock', _ts(added), user_ids[0]))
+        # Usage and restocks over the life of the item
+        timestamp = added
+        for _ in range(rng.randint(2, 30)):
+            timestamp += timedelta(days=rng.randint(1, max(span_days // 15, 2)))
+            if timestamp.date() > end_date:
+                break
+            if quantity <= minimum_stock and rng.random() < 0.8:
+                change, change_type, reason = rng.randint(10, 40), 'added', 'Restock order received'
+            else:
+                change = -min(quantity, rng.randint(1, 5))
+                change_type, reason = 'used', 'Used in repair'
+            previous = quantity
+            quantity += change
+            history.append((item_id, change_type, change, previous, quantity, reason, _ts(timestamp),
+                            rng.choice(user_ids)))
+        items.append((item_id, f'{part} #{item_id}', f'Replacement {part.lower()}', quantity,
+                       round(rng.uniform(1, 250), 2), minimum_stock, rng.choice(SUPPLIERS),
+                       f'P-{rng.randint(10000, 99999)}', _ts(added)))
+        for game_id in rng.sample(range(1, num_games + 1), min(num_games, rng.randint(1, 8))):
+            compatibility.append((item_id, game_id))
+        if quantity <= minimum_stock:
+            alerts.append((item_id, _ts(timestamp), 0, 0))
+    return items, compatibility, history, alerts
+
+
+def request_rows(rng, num_requests, num_items, user_ids, start_date, end_date):
+    """Build inventory requests from technicians"""
+    rows = []
+    span_days = (end_date - start_date).days
+    start = datetime.combine(start_date, datetime.min.time())
+    for _ in range(num_requests):
+        requested = start + timedelta(days=rng.randint(0, span_days), hours=rng.randint(8, 20))
+        status = rng.choices(['Pending', 'Approved', 'Ordered', 'Received', 'Rejected'],
+                             weights=[20, 10, 10, 50, 10])[0]
+        fulfilled = _ts(requested + timedelta(days=rng.randint(1, 14))) if status in ('Received', 'Rejected') else None
+        existing = num_items and rng.random() < 0.8
+        item_id = rng.randint(1, num_items) if existing else None
+        rows.append((item_id, f'{rng.choice(PARTS)}', rng.randint(1, 20), 'Needed for repairs',
+                     rng.choice(['Low', 'Normal', 'High', 'Urgent']), status, rng.choice(user_ids),
+                     _ts(requested), fulfilled))
+    return rows
+
+
+def generate(db_path, games=200, years=2.0, items=150, requests=100, seed=42, end_date=None,
+             password='password123', verbose=True):
+    """Fill a fresh database at db_path with a synthetic fleet and return row counts"""
+    def log(message):
+        if verbose:
+            print(message)
+
+    rng = random.Random(seed)
+    end_date = end_date or date.today()
+    start_date = end_date - timedelta(days=max(int(years * 365), 1))
+
+    create_schema(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA synchronous = OFF')
+    conn.execute('PRAGMA journal_mode = MEMORY')
+    cursor = conn.cursor()
+    counts = {}
+
+    try:
+        started = time.time()
+        users, technicians = generate_users(cursor, rng, password)
+        user_ids = [row[0] for row in users]
+        counts['users'] = len(users)
+
+        fleet = generate_games(rng, games, start_date, end_date)
+        log(f"🎮 Generating play records for {games} games from {start_date} to {end_date}...")
+        counts['play_records'] = _insert_batches(
+            cursor,
+            'INSERT INTO play_record (game_id, coin_count, plays_count, revenue, date_recorded, notes) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            play_record_rows(rng, fleet, start_date))
+        conn.commit()
+        log(f"   ✓ {counts['play_records']:,} play records ({time.time() - started:.1f}s)")
+
+        cursor.executemany(
+            'INSERT INTO game (id, name, manufacturer, year, genre, location, floor_position, warehouse_section, '
+            'status, coins_per_play, total_plays, total_revenue, counter_status, date_added, '
+            'times_in_top_5, times_in_top_10) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, 0)',
+            [(g['id'], g['name'], g['manufacturer'], g['year'], g['genre'], g['location'], g['floor_position'],
+              g['warehouse_section'], g['status'], g['coins_per_play'], g['total_plays'],
+              round(g['total_revenue'], 2), g['counter_status'], _ts(g['date_added'])) for g in fleet])
+        counts['games'] = len(fleet)
+
+        log("🔧 Generating maintenance orders and work logs...")
+        orders, work_logs = maintenance_rows(rng, fleet, technicians, start_date, end_date)
+        counts['maintenance_records'] = _insert_batches(
+            cursor,
+            'INSERT INTO maintenance_record (id, game_id, issue_description, fix_description, cost, '
+            'date_reported, date_fixed, status, technician) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            orders)
+        counts['work_logs'] = _insert_batches(
+            cursor,
+            'INSERT INTO work_log (maintenance_id, user_id, work_description, parts_used, time_spent, '
+            'cost_incurred, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            work_logs)
+        conn.commit()
+
+        log("📦 Generating inventory, stock history and requests...")
+        item_rows, compatibility, history, alerts = inventory_rows(rng, items, games, user_ids, start_date, end_date)
+        counts['inventory_items'] = _insert_batches(
+            cursor,
+            'INSERT INTO inventory_item (id, name, description, stock_quantity, unit_price, minimum_stock, '
+            'supplier, part_number, date_added) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            item_rows)
+        if games:
+            _insert_batches(cursor, 'INSERT INTO item_game_compatibility (item_id, game_id) VALUES (?, ?)',
+                            compatibility)
+        counts['stock_history'] = _insert_batches(
+            cursor,
+            'INSERT INTO stock_history (item_id, change_type, quantity_change, previous_quantity, new_quantity, '
+            'reason, timestamp, user_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            history)
+        counts['low_stock_alerts'] = _insert_batches(
+            cursor,
+            'INSERT INTO low_stock_alert (item_id, alert_triggered, email_sent, resolved) VALUES (?, ?, ?, ?)',
+            alerts)
+        counts['inventory_requests'] = _insert_batches(
+            cursor,
+            'INSERT INTO inventory_request (item_id, item_name, quantity_requested, reason, urgency, status, '
+            'requested_by_id, date_requested, date_fulfilled) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            request_rows(rng, requests, items, user_ids, start_date, end_date))
+        conn.commit()
+        log(f"✅ Done in {time.time() - started:.1f}s")
+    finally:
+        conn.close()
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic arcade database for scale testing')
+    parser.add_argument('--db', default='instance/arcade_synthetic.db', help='Path of the database to create')
+    parser.add_argument('--games', type=int, default=200, help='Number of games in the fleet')
+    parser.add_argument('--years', type=float, default=2.0, help='Years of daily coin readings')
+    parser.add_argument('--items', type=int, default=150, help='Number of inventory items')
+    parser.add_argument('--requests', type=int, default=100, help='Number of inventory requests')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (same seed and end date give the same data)')
+    parser.add_argument('--end-date', type=lambda s: datetime.strptime(s, '%Y-%m-%d').date(), default=None,
+                        help='Last day of generated readings, YYYY-MM-DD (default: today)')
+    parser.add_argument('--password', default='password123', help='Password for all generated users')
+    parser.add_argument('--force', action='store_true', help='Overwrite the database file if it exists')
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        if not args.force:
+            print(f"❌ {args.db} already exists. Use --force to overwrite it.")
+            return 1
+        os.remove(args.db)
+    os.makedirs(os.path.dirname(os.path.abspath(args.db)), exist_ok=True)
+
+    counts = generate(args.db, games=args.games, years=args.years, items=args.items, requests=args.requests,
+                      seed=args.seed, end_date=args.end_date, password=args.password)
+
+    print("\n📊 Rows generated:")
+    for table, count in counts.items():
+        print(f"   {table}: {count:,}")
+    print(f"\n👤 Log in as admin / manager / operator / readonly with password '{args.password}'")
+    print(f"🚀 Run the app against it with: DATABASE_URL=sqlite:///{os.path.abspath(args.db)} python app.py")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Concurrent load test simulating a real shift.
+
+Starts the app as a local server against a temporary copy of a synthetic
+database (see generate_synthetic_data.py) and replays a mix of users in
+parallel threads:
+
+- technicians viewing work orders and logging work through update_maintenance
+- collectors entering coin counts through record_plays
+- managers pulling reports and exports
+- read-only users browsing the dashboard, games list and game pages
+
+Reports throughput, latency percentiles and error rates, including
+"database is locked" errors seen in the server log. Everything runs offline.
+
+Usage:
+    python load_test.py --games 300 --duration 60
+    python load_test.py --journal-mode wal --server waitress --threads 8 --output wal_waitress.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import socket
+import sqlite3
+import argparse
+import tempfile
+import threading
+import subprocess
+import urllib.parse
+import urllib.request
+import urllib.error
+import http.cookiejar
+from datetime import date, datetime
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Which account each kind of virtual user logs in with.
+# update_maintenance and record_plays require the manager role.
+PERSONA_ACCOUNTS = {
+    'technician': 'manager',
+    'collector': 'manager',
+    'manager': 'manager',
+    'viewer': 'readonly',
+}
+
+
+def serve(host, port, server, threads, processes):
+    """Run the app for the load test (called in the server subprocess)"""
+    from app import app
+    from benchmark_routes import install_template_fallback
+
+    # Virtual users post forms directly, without fetching CSRF tokens first
+    app.config['WTF_CSRF_ENABLED'] = False
+    install_template_fallback(app)
+
+    if server == 'waitress':
+        from waitress import serve as waitress_serve
+        waitress_serve(app, host=host, port=port, threads=threads)
+    else:
+        from werkzeug.serving import run_simple
+        run_simple(host, port, app, threaded=processes == 1, processes=processes)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class Session:
+    """Minimal HTTP client with a cookie jar that does not follow redirects"""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect())
+
+    def request(self, method, path, data=None):
+        """Send a request and return (status, location header)"""
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        req = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with self.opener.open(req, timeout=self.timeout) as response:
+                response.read()
+                return response.status, response.headers.get('Location', '')
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code, e.headers.get('Location', '')
+
+
+class Fleet:
+    """Ids and coin counters read from the database before the run"""
+
+    def __init__(self, db_path):
+        conn = sqlite3.connect(db_path)
+        try:
+            self.game_ids = [row[0] for row in conn.execute('SELECT id FROM game')]
+            self.counter_game_ids = [row[0] for row in conn.execute(
+                "SELECT id FROM game WHERE counter_status = 'Working'")]
+            self.open_order_ids = [row[0] for row in conn.execute(
+                "SELECT id FROM maintenance_record WHERE status IN ('Open', 'In_Progress')")]
+            if not self.open_order_ids:
+                self.open_order_ids = [row[0] for row in conn.execute('SELECT id FROM maintenance_record LIMIT 200')]
+            self.coin_counts = dict(conn.execute(
+                'SELECT game_id, MAX(coin_count) FROM play_record GROUP BY game_id').fetchall())
+        finally:
+            conn.close()
+        self.lock = threading.Lock()
+
+    def next_coin_count(self, game_id, rng):
+        """Return a reading higher than the last one sent for this game"""
+        with self.lock:
+            count = self.coin_counts.get(game_id, 0) + rng.randint(1, 200)
+            self.coin_counts[game_id] = count
+            return count
+
+
+def technician_action(rng, fleet):
+    order_id = rng.choice(fleet.open_order_ids)
+    if rng.random() < 0.5:
+        return 'view_maintenance', 'GET', f'/view_maintenance/{order_id}', None
+    return 'update_maintenance', 'POST', f'/update_maintenance/{order_id}', {
+        'status': rng.choice(['Open', 'In_Progress']),
+        'work_notes': 'Load test work entry',
+        'time_spent': f'{rng.uniform(0.25, 2):.2f}',
+        'parts_used': '',
+    }
+
+
+def collector_action(rng, fleet):
+    game_id = rng.choice(fleet.counter_game_ids)
+    if rng.random() < 0.3:
+        return 'record_plays_form', 'GET', f'/record_plays/{game_id}', None
+    return 'record_plays', 'POST', f'/record_plays/{game_id}', {
+        'coin_count': fleet.next_coin_count(game_id, rng),
+        'date': date.today().isoformat(),
+        'notes': '',
+    }
+
+
+def manager_action(rng, fleet):
+    name, path = rng.choices([
+        ('revenue_reports', '/revenue_reports?days=30'),
+        ('maintenance_reports', '/maintenance_reports?days=30'),
+        ('maintenance_orders', '/maintenance_orders'),
+        ('graphs', '/graphs'),
+        ('export_csv', '/export_csv'),
+        ('export_report', '/export_report'),
+    ], weights=[25, 20, 25, 15, 10, 5])[0]
+    return name, 'GET', path, None
+
+
+def viewer_action(rng, fleet):
+    name, path = rng.choices([
+        ('home', '/'),
+        ('games_list', '/games'),
+        ('game_detail', f'/game/{rng.choice(fleet.game_ids)}'),
+    ], weights=[40, 30, 30])[0]
+    return name, 'GET', path, None
+
+
+PERSONA_ACTIONS = {
+    'technician': technician_action,
+    'collector': collector_action,
+    'manager': manager_action,
+    'viewer': viewer_action,
+}
+
+
+def virtual_user(persona, base_url, password, fleet, deadline, think_time, seed, results):
+    """Log in and keep issuing requests for this persona until the deadline"""
+    rng = random.Random(seed)
+    session = Session(base_url)
+    status, location = session.request('POST', '/login', {'username': PERSONA_ACCOUNTS[persona],
+                                                          'password': password})
+    if status != 302 or '/login' in location:
+        results.append((persona, 'login', status, 0.0, 'login_failed'))
+        return
+
+    while time.time() < deadline:
+        action, method, path, data = PERSONA_ACTIONS[persona](rng, fleet)
+        started = time.perf_counter()
+        error = None
+        try:
+            status, location = session.request(method, path, data)
+            if status >= 500:
+                error = f'http_{status}'
+            elif status == 302 and '/login' in location:
+                error = 'logged_out'
+        except (urllib.error.URLError, socket.timeout, ConnectionError) as e:
+            status, error = 0, f'connection: {e.__class__.__name__}'
+        results.append((persona, action, status, (time.perf_counter() - started) * 1000, error))
+        if think_time:
+            time.sleep(rng.uniform(0, think_time * 2))
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(results, elapsed, server_log):
+    """Build the report from raw (persona, action, status, ms, error) tuples"""
+    by_action = {}
+    errors = {}
+    for persona, action, status, latency, error in results:
+        stats = by_action.setdefault(action, {'latencies': [], 'errors': 0, 'statuses': {}})
+        stats['latencies'].append(latency)
+        stats['statuses'][str(status)] = stats['statuses'].get(str(status), 0) + 1
+        if error:
+            stats['errors'] += 1
+            errors[error] = errors.get(error, 0) + 1
+
+    actions = {}
+    for action, stats in sorted(by_action.items()):
+        latencies = sorted(stats['latencies'])
+        actions[action] = {
+            'requests': len(latencies),
+            'errors': stats['errors'],
+            'statuses': stats['statuses'],
+            'p50_ms': round(percentile(latencies, 50), 1),
+            'p90_ms': round(percentile(latencies, 90), 1),
+            'p99_ms': round(percentile(latencies, 99), 1),
+            'max_ms': round(latencies[-1], 1) if latencies else 0.0,
+        }
+
+    all_latencies = sorted(r[3] for r in results if r[1] != 'login')
+    total = len(all_latencies)
+    total_errors = sum(errors.values())
+    return {
+        'requests': total,
+        'elapsed_s': round(elapsed, 1),
+        'throughput_rps': round(total / elapsed, 1) if elapsed else 0.0,
+        'error_rate': round(total_errors / total, 4) if total else 0.0,
+        'p50_ms': round(percentile(all_latencies, 50), 1),
+        'p90_ms': round(percentile(all_latencies, 90), 1),
+        'p99_ms': round(percentile(all_latencies, 99), 1),
+        'errors': errors,
+        'database_locked': server_log.count('database is locked'),
+        'actions': actions,
+    }
+
+
+def print_summary(summary):
+    print(f"\n📈 {summary['requests']} requests in {summary['elapsed_s']}s "
+          f"= {summary['throughput_rps']} req/s, error rate {summary['error_rate'] * 100:.2f}%")
+    print(f"   latency p50 {summary['p50_ms']}ms  p90 {summary['p90_ms']}ms  p99 {summary['p99_ms']}ms")
+    print(f"   'database is locked' in server log: {summary['database_locked']}")
+    for error, count in summary['errors'].items():
+        print(f"   error {error}: {count}")
+    print(f"\n   {'action':<22}{'requests':>9}{'errors':>8}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}")
+    for action, stats in summary['actions'].items():
+        print(f"   {action:<22}{stats['requests']:>9}{stats['errors']:>8}{stats['p50_ms']:>9.1f}"
+              f"{stats['p90_ms']:>9.1f}{stats['p99_ms']:>9.1f}{stats['max_ms']:>9.1f}")
+
+
+def wait_for_server(base_url, proc, timeout=60):
+    """Poll the login page until the server answers"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            return False
+        try:
+            with urllib.request.urlopen(base_url + '/login', timeout=2):
+                return True
+        except urllib.error.HTTPError:
+            return True
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            time.sleep(0.2)
+    return False
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def run_load_test(args):
+    from generate_synthetic_data import generate
+
+    temp_dir = tempfile.mkdtemp(prefix='arcade_load_')
+    server = None
+    try:
+        db_path = os.path.join(temp_dir, 'load_test.db')
+        if args.db:
+            print(f"📦 Copying {args.db}...")
+            shutil.copy2(args.db, db_path)
+        else:
+            print(f"📦 Generating dataset with {args.games} games...")
+            generate(db_path, games=args.games, years=args.years, seed=args.seed, password=args.password,
+                     verbose=False)
+        if args.journal_mode:
+            conn = sqlite3.connect(db_path)
+            conn.execute(f'PRAGMA journal_mode = {args.journal_mode}')
+            conn.close()
+
+        fleet = Fleet(db_path)
+        port = args.port or free_port()
+        base_url = f'http://127.0.0.1:{port}'
+        server_log_path = os.path.join(temp_dir, 'server.log')
+        env = dict(os.environ, DATABASE_URL=f'sqlite:///{db_path}')
+        cmd = [sys.executable, os.path.abspath(__file__), '--serve', '--port', str(port), '--server', args.server,
+               '--threads', str(args.threads), '--processes', str(args.processes)]
+        print(f"🚀 Starting {args.server} server on {base_url}...")
+        with open(server_log_path, 'w') as log:
+            server = subprocess.Popen(cmd, env=env, stdout=log, stderr=subprocess.STDOUT)
+        if not wait_for_server(base_url, server):
+            with open(server_log_path) as f:
+                print(f"❌ Server did not start:\n{f.read()}")
+            return None
+
+        personas = (['technician'] * args.technicians + ['collector'] * args.collectors +
+                    ['manager'] * args.managers + ['viewer'] * args.viewers)
+        results = []
+        deadline = time.time() + args.duration
+        print(f"⏱️  Running {len(personas)} virtual users for {args.duration}s...")
+        started = time.time()
+        threads = [threading.Thread(target=virtual_user, daemon=True,
+                                    args=(persona, base_url, args.password, fleet, deadline, args.think_time,
+                                          args.seed + i, results))
+                   for i, persona in enumerate(personas)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.time() - started
+
+        with open(server_log_path, errors='replace') as f:
+            server_log = f.read()
+        summary = summarize(results, elapsed, server_log)
+        summary['config'] = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'server': args.server,
+            'threads': args.threads,
+            'processes': args.processes,
+            'journal_mode': args.journal_mode or 'default',
+            'games': args.games if not args.db else args.db,
+            'users': {p: personas.count(p) for p in PERSONA_ACTIONS},
+            'duration_s': args.duration,
+            'think_time_s': args.think_time,
+        }
+        return summary
+    finally:
+        if server and server.poll() is None:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate a shift of concurrent users against a local server')
+    parser.add_argument('--games', type=int, default=300, help='Games in the generated dataset')
+    parser.add_argument('--years', type=float, default=1.0, help='Years of readings in the generated dataset')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for data generation and user behaviour')
+    parser.add_argument('--db', help='Copy this SQLite database instead of generating one')
+    parser.add_argument('--password', default='password123', help='Password of the generated users')
+    parser.add_argument('--duration', type=int, default=30, help='Seconds to run the load')
+    parser.add_argument('--think-time', type=float, default=0.2, help='Mean pause between requests per user (s)')
+    parser.add_argument('--technicians', type=int, default=4)
+    parser.add_argument('--collectors', type=int, default=3)
+    parser.add_argument('--managers', type=int, default=2)
+    parser.add_argument('--viewers', type=int, default=6)
+    parser.add_argument('--server', choices=['werkzeug', 'waitress'], default='werkzeug',
+                        help='WSGI server to run the app under (waitress must be installed)')
+    parser.add_argument('--threads', type=int, default=8, help='Worker threads (waitress)')
+    parser.add_argument('--processes', type=int, default=1, help='Worker processes (werkzeug, 1 = threaded)')
+    parser.add_argument('--journal-mode', choices=['delete', 'truncate', 'wal'],
+                        help='SQLite journal mode to set on the test database')
+    parser.add_argument('--port', type=int, help='Port for the server (default: any free port)')
+    parser.add_argument('--output', help='Write the summary as JSON to this file')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve('127.0.0.1', args.port, args.server, args.threads, args.processes)
+        return 0
+
+    summary = run_load_test(args)
+    if summary is None:
+        return 1
+    print_summary(summary)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n💾 Summary written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
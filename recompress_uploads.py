@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Recompress existing game images and profile pictures through the photo pipeline.
+
+Images uploaded before the pipeline existed were saved as-is, often as 10MB
+phone photos. Every image referenced by a game (and, by default, every profile
+picture) is decoded, resized, stripped of metadata and stored with its
+derivatives under its content hash, on a thread pool. The database references
+and reference counts are moved to the new file and the original is deleted.
+
+Usage:
+    python recompress_uploads.py --dry-run
+    python recompress_uploads.py --workers 4
+    python recompress_uploads.py --kinds uploads
+"""
+
+import io
+import os
+import re
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import (app, db, Game, User, StoredFile, PHOTO_WORKERS, photo_folder, media_path, derivative_filename,
+                 compress_and_store_image, add_file_reference, delete_stored_file)
+
+# Which column references the images of each kind
+REFERENCES = {
+    'uploads': Game.image_filename,
+    'profile': User.profile_picture,
+}
+
+PROCESSED_NAME = re.compile(r'[0-9a-f]{64}\.jpg')
+
+
+def find_jobs(kinds):
+    """List (kind, filename) for every referenced image that hasn't been through the pipeline"""
+    jobs = []
+    for kind in kinds:
+        column = REFERENCES[kind]
+        for (filename,) in db.session.query(column).filter(column.isnot(None)).distinct().order_by(column):
+            if not os.path.exists(media_path(kind, filename)):
+                continue
+            if PROCESSED_NAME.fullmatch(os.path.basename(filename)) and os.path.exists(
+                    media_path(kind, derivative_filename(filename, 'thumb'))):
+                continue
+            jobs.append((kind, filename))
+    return jobs
+
+
+def recompress(kind, filename):
+    """Run one stored image through the pipeline, returns (old bytes, new filename, new bytes)"""
+    from werkzeug.datastructures import FileStorage
+
+    with open(media_path(kind, filename), 'rb') as f:
+        data = f.read()
+    upload = FileStorage(stream=io.BytesIO(data), filename=os.path.basename(filename))
+    new_filename, saved = compress_and_store_image(upload, photo_folder(kind), keep_invalid=False)
+    return len(data), new_filename, sum(len(d) for _, d in saved.values())
+
+
+def move_references(kind, old_filename, new_filename, new_bytes):
+    """Point every reference to old_filename at new_filename, returns how many were moved"""
+    column = REFERENCES[kind]
+    model = column.class_
+    moved = model.query.filter(column == old_filename).update({column: new_filename}, synchronize_session=False)
+    StoredFile.query.filter_by(kind=kind, filename=old_filename).delete(synchronize_session=False)
+    for _ in range(moved):
+        add_file_reference(kind, new_filename, new_bytes or None)
+        db.session.flush()
+    return moved
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompress stored game images and profile pictures')
+    parser.add_argument('--kinds', default='uploads,profile', help='Comma separated kinds (uploads, profile)')
+    parser.add_argument('--workers', type=int, default=PHOTO_WORKERS, help='Compression threads')
+    parser.add_argument('--dry-run', action='store_true', help='Only list how many images would be recompressed')
+    args = parser.parse_args()
+
+    kinds = [k.strip() for k in args.kinds.split(',') if k.strip()]
+    unknown = [k for k in kinds if k not in REFERENCES]
+    if unknown:
+        print(f"❌ Unknown kind(s): {', '.join(unknown)}")
+        return 1
+
+    with app.app_context():
+        jobs = find_jobs(kinds)
+        print(f"🖼️  {len(jobs)} images to recompress")
+        if args.dry_run or not jobs:
+            return 0
+
+        started = time.perf_counter()
+        before = after = 0
+        failed = 0
+        stale = []
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            futures = [(kind, filename, executor.submit(recompress, kind, filename)) for kind, filename in jobs]
+            for done, (kind, filename, future) in enumerate(futures, 1):
+                try:
+                    old_bytes, new_filename, new_bytes = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"   ❌ {kind}/{filename}: {e}")
+                    continue
+                before += old_bytes
+                after += new_bytes
+                if new_filename != filename:
+                    move_references(kind, filename, new_filename, new_bytes)
+                    stale.append((kind, filename))
+                if done % 100 == 0:
+                    db.session.commit()
+                    print(f"   ... {done}/{len(jobs)}")
+        db.session.commit()
+
+        # Originals are only removed once nothing points at them any more
+        for kind, filename in stale:
+            delete_stored_file(kind, filename)
+
+        elapsed = time.perf_counter() - started
+        print(f"\n✅ Recompressed {len(jobs) - failed} images in {elapsed:.1f}s ({failed} failed)")
+        print(f"   {before / (1024 * 1024):.1f}MB originals -> {after / (1024 * 1024):.1f}MB "
+              f"with derivatives (images already stored once are not counted)")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
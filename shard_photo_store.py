@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Move stored photos into the two-level hashed subdirectory layout.
+
+Files at the top of static/maintenance_photos, static/uploads and
+static/profile_pics are moved to ab/cd/<name>, next to their derivatives and
+variants, and every stored reference (maintenance record photos, game images,
+profile pictures, stored_file and cloud_upload rows) is rewritten to the
+sharded path. The app finds files in either layout, so this can run while it
+is serving, and running it again only picks up what is left.
+
+Usage:
+    python shard_photo_store.py --dry-run
+    python shard_photo_store.py
+"""
+
+import os
+import sys
+import json
+import argparse
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import (app, db, MaintenanceRecord, Game, User, StoredFile, CloudUpload, PHOTO_FOLDERS,
+                 CONTENT_ADDRESSED_NAME, photo_folder, sharded_filename, is_sharded_filename)
+
+# Which column references the images of each kind (maintenance photos are a JSON list)
+REFERENCES = {
+    'uploads': Game.image_filename,
+    'profile': User.profile_picture,
+}
+
+
+def find_flat_files(kind):
+    """List the files still stored at the top of a kind's folder"""
+    directory = photo_folder(kind)
+    if not os.path.isdir(directory):
+        return []
+    with os.scandir(directory) as entries:
+        return sorted(entry.name for entry in entries
+                      if entry.is_file(follow_symlinks=False) and not entry.name.startswith('.'))
+
+
+def move_files(kind, filenames):
+    """Move flat files into their shard, returns (moved, skipped)"""
+    directory = photo_folder(kind)
+    moved = skipped = 0
+    for filename in filenames:
+        source = os.path.join(directory, filename)
+        target = os.path.join(directory, sharded_filename(filename))
+        if os.path.exists(target):
+            # Content-addressed names are identical files, anything else is left alone
+            if CONTENT_ADDRESSED_NAME.fullmatch(filename):
+                os.remove(source)
+                moved += 1
+            else:
+                print(f"   ⚠️  {kind}/{filename} already exists in its shard, skipped")
+                skipped += 1
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(source, target)
+        moved += 1
+    return moved, skipped
+
+
+def rewrite_maintenance_photos():
+    """Point maintenance record photo lists at the sharded paths, returns records changed"""
+    changed = 0
+    records = MaintenanceRecord.query.filter(MaintenanceRecord.photos.isnot(None))
+    for record in records.yield_per(500):
+        photos = record.get_photos()
+        sharded = [sharded_filename(photo) for photo in photos]
+        if sharded != photos:
+            record.photos = json.dumps(sharded)
+            changed += 1
+    return changed
+
+
+def rewrite_column(column):
+    """Rewrite flat filenames in a model column to sharded paths, returns rows changed"""
+    model = column.class_
+    changed = 0
+    for (filename,) in db.session.query(column).filter(column.isnot(None)).distinct().all():
+        if not is_sharded_filename(filename):
+            changed += model.query.filter(column == filename).update(
+                {column: sharded_filename(filename)}, synchronize_session=False)
+    return changed
+
+
+def rewrite_stored_files():
+    """Rename stored_file rows, merging counts if the sharded row already exists"""
+    changed = 0
+    for stored in StoredFile.query.all():
+        if is_sharded_filename(stored.filename):
+            continue
+        target = StoredFile.query.filter_by(kind=stored.kind, filename=sharded_filename(stored.filename)).first()
+        if target is not None:
+            target.ref_count += stored.ref_count
+            db.session.delete(stored)
+        else:
+            stored.filename = sharded_filename(stored.filename)
+        db.session.flush()
+        changed += 1
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Move stored photos into hashed subdirectories')
+    parser.add_argument('--dry-run', action='store_true', help='Only list how many files would be moved')
+    args = parser.parse_args()
+
+    with app.app_context():
+        flat = {kind: find_flat_files(kind) for kind in PHOTO_FOLDERS}
+        for kind, filenames in flat.items():
+            print(f"📁 {PHOTO_FOLDERS[kind]}: {len(filenames)} files to move")
+        if args.dry_run:
+            return 0
+
+        skipped = 0
+        for kind, filenames in flat.items():
+            moved, kind_skipped = move_files(kind, filenames)
+            skipped += kind_skipped
+            print(f"✓ Moved {moved} files in {PHOTO_FOLDERS[kind]}")
+
+        print(f"✓ Rewrote {rewrite_maintenance_photos()} maintenance records")
+        for kind, column in REFERENCES.items():
+            print(f"✓ Rewrote {rewrite_column(column)} {PHOTO_FOLDERS[kind]} references")
+        print(f"✓ Rewrote {rewrite_stored_files()} stored files")
+        print(f"✓ Rewrote {rewrite_column(CloudUpload.filename)} cloud uploads")
+        db.session.commit()
+
+        print("\nPhoto store migration complete!")
+    return 1 if skipped else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests for the read-only JSON API (/api/v1).
+
+Run with: python -m pytest test_api.py -q
+"""
+
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db, Game, API_RESOURCES
+from benchmark_routes import count_queries, install_template_fallback, login
+from generate_synthetic_data import generate
+
+
+@pytest.fixture(scope='module')
+def fleet():
+    """A small synthetic fleet in the test database"""
+    app.config['WTF_CSRF_ENABLED'] = False
+    install_template_fallback(app)
+    with app.app_context():
+        db.drop_all()
+        engine = db.engine
+    generate(engine.url.database, games=30, years=0.1, items=20, requests=5, verbose=False)
+    return engine
+
+
+@pytest.fixture
+def client(fleet):
+    client = app.test_client()
+    assert login(client, 'admin', 'password123')
+    return client
+
+
+def _pages(client, url):
+    """Follow next_cursor through every page, returns all rows"""
+    rows = []
+    cursor = None
+    while True:
+        response = client.get(url + (f'&cursor={cursor}' if cursor else ''))
+        assert response.status_code == 200
+        body = response.get_json()
+        rows.extend(body['data'])
+        cursor = body['next_cursor']
+        if not cursor:
+            return rows
+
+
+def test_fields_are_projected(client):
+    body = client.get('/api/v1/games?fields=id,name&limit=5').get_json()
+    assert len(body['data']) == 5
+    assert all(set(row) == {'id', 'name'} for row in body['data'])
+
+    assert client.get('/api/v1/games?fields=id,password_hash').status_code == 400
+
+
+def test_cursor_pages_cover_every_row_once(client):
+    rows = _pages(client, '/api/v1/games?fields=id&limit=7')
+    with app.app_context():
+        assert [row['id'] for row in rows] == [game_id for (game_id,) in
+                                               db.session.query(Game.id).order_by(Game.id)]
+
+    days = _pages(client, '/api/v1/revenue/daily?fields=date,revenue&limit=3')
+    assert [row['date'] for row in days] == sorted({row['date'] for row in days})
+
+
+def test_unchanged_page_is_not_modified(client):
+    response = client.get('/api/v1/inventory')
+    assert response.headers['ETag']
+    again = client.get('/api/v1/inventory', headers={'If-None-Match': response.headers['ETag']})
+    assert again.status_code == 304
+    assert again.data == b''
+
+
+def test_filters_and_errors(client):
+    rows = client.get('/api/v1/maintenance?status=Open,In_Progress&fields=status&limit=1000').get_json()['data']
+    assert {row['status'] for row in rows} <= {'Open', 'In_Progress'}
+
+    assert client.get('/api/v1/plays?game_id=abc').status_code == 400
+    assert client.get('/api/v1/plays?cursor=!!!').status_code == 400
+    assert client.get('/api/v1/nothing').status_code == 404
+    assert app.test_client().get('/api/v1/games').status_code == 401
+
+
+@pytest.mark.parametrize('resource', sorted(API_RESOURCES))
+def test_one_query_per_page(fleet, client, resource):
+    fields = ','.join(API_RESOURCES[resource]['fields'])
+    with count_queries(fleet) as statements:
+        response = client.get(f'/api/v1/{resource}?fields={fields}&limit=1000')
+    assert response.status_code == 200
+    assert len(statements) <= 2  # The logged in user and the page
+
+
+def _reading(client_id, game_id, coin_count, read_at):
+    return {'client_id': client_id, 'game_id': game_id, 'coin_count': coin_count, 'read_at': read_at}
+
+
+def test_readings_batch(fleet, client):
+    from datetime import date
+    from app import PlayRecord, latest_readings
+
+    with app.app_context():
+        game = Game.query.filter_by(counter_status='Working').order_by(Game.id).first()
+        game_id, plays_before = game.id, game.total_plays
+        last_coin_count, _ = latest_readings({game_id})[game_id]
+    today = date.today().isoformat()
+    batch = [
+        _reading('r2', game_id, last_coin_count + 30, today),
+        _reading('r1', game_id, last_coin_count + 10, today),  # Applied first: readings go in order
+        _reading('r1', game_id, last_coin_count + 10, today),
+        _reading('low', game_id, last_coin_count - 1, today),
+        _reading('bad', game_id, 'many', today),
+        _reading('ghost', 10 ** 9, 5, today),
+    ]
+
+    with count_queries(fleet) as statements:
+        response = client.post('/api/v1/readings:batch', json={'readings': batch})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [r['status'] for r in results] == ['created', 'created', 'duplicate', 'rejected', 'invalid', 'rejected']
+    assert [r['plays_count'] for r in results[:2]] == [20, 10]
+    assert results[2]['play_record_id'] == results[1]['play_record_id']
+    assert len(statements) <= 12  # Not one per reading
+
+    # Sending the batch again changes nothing
+    again = client.post('/api/v1/readings:batch', json={'readings': batch[:2]}).get_json()['results']
+    assert [r['status'] for r in again] == ['duplicate', 'duplicate']
+    with app.app_context():
+        assert db.session.get(Game, game_id).total_plays == plays_before + 30
+        assert PlayRecord.query.filter_by(game_id=game_id, coin_count=last_coin_count + 30).count() == 1
+
+    assert client.post('/api/v1/readings:batch', data='readings').status_code == 415
+
+
+def test_sync_sends_only_changes(fleet, client):
+    from app import WorkLog
+
+    full = client.get('/api/v1/sync').get_json()
+    assert full['full'] and {'games', 'work_orders', 'inventory'} <= set(full['changes'])
+    assert {row['status'] for row in full['changes']['work_orders']} <= {'Open', 'In_Progress'}
+
+    nothing = client.get(f"/api/v1/sync?cursor={full['cursor']}")
+    assert nothing.get_json() == {'cursor': full['cursor'], 'full': False, 'changes': {}, 'deleted': {}}
+    assert len(nothing.data) < 100
+
+    with app.app_context():
+        game = Game.query.order_by(Game.id).first()
+        game.status = 'Being_Fixed'
+        log = WorkLog.query.order_by(WorkLog.id).first()
+        log_id = log.id
+        db.session.delete(log)
+        db.session.commit()
+        game_id = game.id
+
+    delta = client.get(f"/api/v1/sync?cursor={full['cursor']}").get_json()
+    assert [row['id'] for row in delta['changes']['games']] == [game_id]
+    assert delta['changes']['games'][0]['status'] == 'Being_Fixed'
+    assert delta['deleted'] == {'work_logs': [log_id]}
+    assert int(delta['cursor']) > int(full['cursor'])
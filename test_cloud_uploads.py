@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Cloud upload outbox tests, run offline against moto's S3 stand-in.
+
+Run with: python -m pytest test_cloud_uploads.py -q
+(needs boto3 and moto: pip install -r requirements_cloud.txt moto)
+"""
+
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+pytest.importorskip('boto3')
+moto = pytest.importorskip('moto')
+
+import app as arcade
+from app import app, db, CloudUpload
+
+BUCKET = 'arcade-test-photos'
+
+
+@pytest.fixture
+def s3(monkeypatch, tmp_path):
+    """A mocked bucket, cloud storage switched on and photos served from tmp_path"""
+    monkeypatch.setattr(arcade, 'USE_CLOUD_STORAGE', True)
+    monkeypatch.setattr(arcade, 'AWS_BUCKET_NAME', BUCKET)
+    monkeypatch.setattr(arcade, 'AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setattr(arcade, 'AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.setattr(arcade, '_s3_client', None)
+    monkeypatch.setattr(app, 'static_folder', str(tmp_path))
+    (tmp_path / 'maintenance_photos').mkdir()
+
+    with moto.mock_aws():
+        client = arcade.get_s3_client()
+        client.create_bucket(Bucket=BUCKET)
+        with app.app_context():
+            db.create_all()
+            CloudUpload.query.delete()
+            db.session.commit()
+            yield client
+
+
+def _queue(tmp_path, filename, data=b'jpeg bytes'):
+    (tmp_path / 'maintenance_photos' / filename).write_bytes(data)
+    arcade.queue_cloud_upload('maintenance', filename)
+    db.session.commit()
+
+
+def test_outbox_upload_records_url(s3, tmp_path):
+    _queue(tmp_path, 'a.jpg')
+    _queue(tmp_path, 'a.webp', b'webp bytes')
+
+    assert arcade.process_cloud_uploads() == (2, 0)
+
+    entries = CloudUpload.query.order_by(CloudUpload.id).all()
+    assert [e.status for e in entries] == ['Uploaded', 'Uploaded']
+    assert entries[0].url.endswith(f'{BUCKET}.s3.{arcade.AWS_REGION}.amazonaws.com/maintenance_photos/a.jpg')
+    obj = s3.get_object(Bucket=BUCKET, Key='maintenance_photos/a.webp')
+    assert obj['Body'].read() == b'webp bytes'
+    assert obj['ContentType'] == 'image/webp'
+
+    # Nothing is due any more
+    assert arcade.process_cloud_uploads() == (0, 0)
+
+
+def test_failed_upload_backs_off_then_gives_up(s3, tmp_path, monkeypatch):
+    monkeypatch.setattr(arcade, 'AWS_BUCKET_NAME', 'missing-bucket')
+    _queue(tmp_path, 'b.jpg')
+
+    assert arcade.process_cloud_uploads() == (0, 1)
+    entry = CloudUpload.query.one()
+    assert entry.status == 'Pending'
+    assert entry.attempts == 1
+    assert 'NoSuchBucket' in entry.last_error
+
+    # Retried only once the backoff delay has passed
+    assert arcade.process_cloud_uploads() == (0, 0)
+
+    monkeypatch.setattr(arcade, 'CLOUD_UPLOAD_MAX_ATTEMPTS', 2)
+    entry.next_attempt_at = entry.created_at
+    db.session.commit()
+    assert arcade.process_cloud_uploads() == (0, 1)
+    assert CloudUpload.query.one().status == 'Failed'
+
+
+def test_deleted_file_is_not_retried(s3, tmp_path):
+    arcade.queue_cloud_upload('maintenance', 'gone.jpg')
+    db.session.commit()
+
+    assert arcade.process_cloud_uploads() == (0, 1)
+    assert CloudUpload.query.one().status == 'Failed'
+
+
+def test_entries_are_claimed_by_one_worker(s3, tmp_path):
+    _queue(tmp_path, 'd.jpg')
+
+    claimed = arcade.claim_cloud_uploads()
+    assert [e.status for e in claimed] == ['Uploading']
+    assert arcade.claim_cloud_uploads() == []  # Another worker finds nothing due
+    assert arcade.process_cloud_uploads() == (0, 0)
+
+    # The claiming worker died: once the lease runs out the entry is due again
+    claimed[0].next_attempt_at = claimed[0].created_at
+    db.session.commit()
+    assert arcade.process_cloud_uploads() == (1, 0)
+    assert CloudUpload.query.one().status == 'Uploaded'
+
+
+def test_queued_buffer_is_uploaded_without_reading_disk(s3):
+    data = memoryview(bytearray(b'x' * 300000))
+    arcade.queue_cloud_upload('maintenance', 'buffered.jpg', data)  # Not on disk at all
+    db.session.commit()
+
+    assert arcade.process_cloud_uploads() == (1, 0)
+    body = s3.get_object(Bucket=BUCKET, Key='maintenance_photos/buffered.jpg')['Body'].read()
+    assert body == bytes(data)
+    assert not arcade._cloud_upload_buffers
+
+
+def test_queue_is_noop_without_cloud_storage(s3, monkeypatch):
+    monkeypatch.setattr(arcade, 'USE_CLOUD_STORAGE', False)
+    arcade.queue_cloud_upload('maintenance', 'c.jpg')
+    db.session.commit()
+
+    assert CloudUpload.query.count() == 0
+
+
+def test_buffers_are_kept_only_for_committed_uploads(s3, monkeypatch):
+    data = memoryview(bytearray(b'y' * 1000))
+    arcade.queue_cloud_upload('maintenance', 'rolled_back.jpg', data)
+    db.session.rollback()
+    assert not arcade._cloud_upload_buffers
+
+    # Buffers of entries uploaded elsewhere expire, and the oldest go beyond the size cap
+    monkeypatch.setattr(arcade, 'CLOUD_UPLOAD_BUFFER_SECONDS', -1)
+    arcade.queue_cloud_upload('maintenance', 'expired.jpg', data)
+    db.session.commit()
+    assert not arcade._cloud_upload_buffers
+
+    monkeypatch.setattr(arcade, 'CLOUD_UPLOAD_BUFFER_SECONDS', 300)
+    monkeypatch.setattr(arcade, 'CLOUD_UPLOAD_BUFFER_MAX_MB', 0)
+    arcade.queue_cloud_upload('maintenance', 'too_big.jpg', data)
+    db.session.commit()
+    assert not arcade._cloud_upload_buffers
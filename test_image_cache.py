@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for the resized image cache behind /img/<kind>/<filename>?w=.
+
+Run with: python -m pytest test_image_cache.py -q
+"""
+
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PIL import Image
+
+import app as arcade
+from app import app, db, ResizedImageCache, User
+from benchmark_routes import login
+
+
+def _render(size):
+    def render(path):
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+    return render
+
+
+def _fail_render(path):
+    raise AssertionError('cached file was rendered again')
+
+
+def test_evicts_least_recently_used_by_bytes(tmp_path):
+    cache = ResizedImageCache(str(tmp_path), max_bytes=250)
+    cache.get('a.jpg', _render(100))
+    cache.get('b.jpg', _render(100))
+    cache.get('a.jpg', _render(100))  # a is now the most recently used
+    cache.get('c.jpg', _render(100))
+
+    assert sorted(os.listdir(tmp_path)) == ['a.jpg', 'c.jpg']
+
+
+def test_hit_does_not_render_again(tmp_path):
+    cache = ResizedImageCache(str(tmp_path), max_bytes=1000)
+    renders = []
+
+    def render(path):
+        renders.append(path)
+        _render(10)(path)
+
+    assert cache.get('a.jpg', render) == cache.get('a.jpg', render)
+    assert len(renders) == 1
+
+
+def test_existing_files_are_reused_after_restart(tmp_path):
+    ResizedImageCache(str(tmp_path), max_bytes=1000).get('a.jpg', _render(10))
+
+    cache = ResizedImageCache(str(tmp_path), max_bytes=1000)
+    cache.get('a.jpg', _fail_render)
+    assert cache._total_bytes == 10
+
+
+def test_concurrent_misses_share_one_render(tmp_path):
+    cache = ResizedImageCache(str(tmp_path), max_bytes=1000)
+    renders = []
+
+    def slow_render(path):
+        renders.append(path)
+        time.sleep(0.2)
+        _render(10)(path)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get('a.jpg', slow_render)))
+               for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(renders) == 1
+    assert len(results) == 10 and len(set(results)) == 1
+
+
+def test_resized_images_need_a_login():
+    response = app.test_client().get('/img/maintenance/photo.jpg?w=320')
+    assert response.status_code == 302
+    assert '/login' in response.headers['Location']
+
+
+def test_entry_evicted_before_the_send_is_resized_again(tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, 'WTF_CSRF_ENABLED', False)
+    monkeypatch.setattr(app, 'static_folder', str(tmp_path / 'static'))
+    (tmp_path / 'static' / 'maintenance_photos').mkdir(parents=True)
+    Image.new('RGB', (800, 600), 'red').save(tmp_path / 'static' / 'maintenance_photos' / 'photo.jpg')
+    cache = ResizedImageCache(str(tmp_path / 'cache'), max_bytes=10 ** 6)
+    monkeypatch.setattr(arcade, 'resized_image_cache', cache)
+    with app.app_context():
+        db.create_all()
+        if not User.query.filter_by(username='cache_viewer').first():
+            user = User(username='cache_viewer', role='readonly', must_change_password=False)
+            user.set_password('password123')
+            db.session.add(user)
+            db.session.commit()
+
+    sent = []
+    send_media = arcade.send_media
+
+    def send_after_eviction(path, *args, **kwargs):
+        if not sent:
+            # Another request adds an entry and evicts this one first
+            cache.max_bytes = 1
+            cache.get('other.jpg', _render(10))
+            cache.max_bytes = 10 ** 6
+        sent.append(path)
+        return send_media(path, *args, **kwargs)
+
+    monkeypatch.setattr(arcade, 'send_media', send_after_eviction)
+    client = app.test_client()
+    assert login(client, 'cache_viewer', 'password123')
+    response = client.get('/img/maintenance/photo.jpg?w=320')
+    assert response.status_code == 200
+    assert response.data.startswith(b'\xff\xd8')
+    assert len(sent) == 2 and os.path.exists(sent[1])
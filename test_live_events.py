@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the live update broadcaster behind /events.
+
+Run with: python -m pytest test_live_events.py -q
+"""
+
+import os
+import sys
+import pytest
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db, live_events, LiveEventBroadcaster, Game, MaintenanceRecord, PlayRecord
+from benchmark_routes import install_template_fallback
+from generate_synthetic_data import generate
+
+
+@pytest.fixture(scope='module')
+def fleet():
+    """A small synthetic fleet in the test database"""
+    install_template_fallback(app)
+    with app.app_context():
+        db.drop_all()
+        db_path = db.engine.url.database
+    generate(db_path, games=5, years=0.05, items=5, requests=0, verbose=False)
+
+
+def _drain(subscriber):
+    events = []
+    while not subscriber.empty():
+        events.append(subscriber.get_nowait())
+    return [(name, data) for _, name, data, _ in events]
+
+
+def test_reconnect_replays_missed_events():
+    broadcaster = LiveEventBroadcaster(backlog=3)
+    for n in range(5):
+        broadcaster.publish('reading', {'n': n})
+
+    replayed = broadcaster.subscribe(last_event_id=3)
+    assert [data for _, data in _drain(replayed)] == ['{"n":3}', '{"n":4}']
+
+
+def test_slow_subscriber_is_dropped():
+    broadcaster = LiveEventBroadcaster(queue_size=2)
+    slow = broadcaster.subscribe()
+    for n in range(3):
+        broadcaster.publish('reading', {'n': n})
+
+    assert slow.get_nowait() is None  # Its stream ends, the browser reconnects
+    assert not broadcaster._subscribers
+
+
+def test_events_are_published_after_commit_only(fleet):
+    subscriber = live_events.subscribe()
+    try:
+        with app.app_context():
+            game = Game.query.filter_by(counter_status='Working').first()
+            db.session.add(PlayRecord(game_id=game.id, coin_count=10 ** 7, plays_count=4, revenue=1.0))
+            db.session.flush()
+            assert subscriber.empty()
+            db.session.rollback()
+            assert subscriber.empty()
+
+            day = date(2024, 5, 4)
+            db.session.add(PlayRecord(game_id=game.id, coin_count=10 ** 7, plays_count=4, revenue=1.0, date_recorded=day))
+            db.session.add(PlayRecord(game_id=game.id, coin_count=10 ** 7 + 2, plays_count=2, revenue=0.5,
+                                      date_recorded=day))
+            order = MaintenanceRecord(game_id=game.id, issue_description='Stuck coin', status='Open')
+            db.session.add(order)
+            db.session.commit()
+            assert sorted(_drain(subscriber)) == [
+                ('reading', f'{{"game_id":{game.id},"coin_count":10000000,"plays":4,"revenue":1.0,"date":"2024-05-04"}}'),
+                ('reading', f'{{"game_id":{game.id},"coin_count":10000002,"plays":2,"revenue":0.5,"date":"2024-05-04"}}'),
+                ('revenue', '{"plays":6,"revenue":1.5}'),  # One per commit
+                ('work_order', f'{{"id":{order.id},"game_id":{game.id},"status":"Open","change":"opened"}}'),
+            ]
+
+            order.status = 'Fixed'
+            db.session.commit()
+            assert [name for name, _ in _drain(subscriber)] == ['work_order']
+    finally:
+        live_events.unsubscribe(subscriber)
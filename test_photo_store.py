@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Tests for the photo store: the hashed subdirectory layout and shared file references.
+
+Run with: python -m pytest test_photo_store.py -q
+"""
+
+import io
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PIL import Image
+from sqlalchemy import event
+from werkzeug.datastructures import FileStorage
+
+import app as arcade
+from app import app, db, derivative_filenames, sharded_filename, StoredFile, User
+from benchmark_routes import login
+
+DIGEST = 'ab12' + '0' * 60
+
+
+def _upload(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), color).save(buffer, 'PNG')
+    buffer.seek(0)
+    return FileStorage(stream=buffer, filename='photo.png')
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    """An empty StoredFile table, photos stored under tmp_path"""
+    monkeypatch.setattr(app, 'static_folder', str(tmp_path))
+    with app.app_context():
+        db.create_all()
+        StoredFile.query.delete()
+        db.session.commit()
+        yield
+
+
+def _store_and_reference(color):
+    upload = _upload(color)
+    filename, saved = arcade.compress_and_store_image(upload, arcade.photo_folder('maintenance'))
+    saved = arcade.reference_upload('maintenance', upload, filename, saved)
+    db.session.commit()
+    return filename, saved
+
+
+def test_photo_set_shares_one_shard():
+    filename = sharded_filename(f'{DIGEST}.jpg')
+    assert filename == f'ab/12/{DIGEST}.jpg'
+    assert {os.path.dirname(sharded_filename(name)) for name in derivative_filenames(filename)} == {'ab/12'}
+    # Names that aren't content hashes are sharded by a hash of the name
+    assert sharded_filename('legacy_photo.jpg').count('/') == 2
+    assert sharded_filename(sharded_filename('legacy_photo.jpg')) == sharded_filename('legacy_photo.jpg')
+
+
+def test_media_path_finds_both_layouts(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'static_folder', str(tmp_path))
+    folder = tmp_path / 'maintenance_photos'
+    (folder / 'ab' / '12').mkdir(parents=True)
+    (folder / f'{DIGEST}.jpg').write_bytes(b'flat')
+    (folder / 'ab' / '12' / f'{DIGEST}_thumb.jpg').write_bytes(b'sharded')
+
+    with app.app_context():
+        # A sharded reference to a file that hasn't been moved yet
+        assert arcade.media_path('maintenance', f'ab/12/{DIGEST}.jpg') == str(folder / f'{DIGEST}.jpg')
+        # A flat reference to a file that has
+        assert arcade.media_path('maintenance', f'{DIGEST}_thumb.jpg') == str(folder / 'ab' / '12' / f'{DIGEST}_thumb.jpg')
+
+
+def test_new_photos_are_stored_sharded(tmp_path):
+    filename, saved = arcade.compress_and_store_image(_upload('red'), str(tmp_path))
+
+    assert filename == sharded_filename(filename)
+    assert all(os.path.dirname(path) == str(tmp_path / os.path.dirname(filename)) for path, _ in saved.values())
+    assert arcade.compress_and_store_image(_upload('red'), str(tmp_path)) == (filename, {})
+
+
+def test_shared_file_is_deleted_with_its_last_reference(store):
+    filename, saved = _store_and_reference('blue')
+    assert saved
+    assert _store_and_reference('blue') == (filename, {})
+    path = arcade.media_path('maintenance', filename)
+
+    assert not arcade.release_file_reference('maintenance', filename)
+    db.session.commit()
+    assert arcade.release_file_reference('maintenance', filename)
+    db.session.commit()
+    # Referenced again before the delete ran: the file stays
+    assert arcade.add_file_reference('maintenance', filename)
+    db.session.commit()
+    assert not arcade.delete_unreferenced_file('maintenance', filename)
+    assert os.path.exists(path)
+
+    assert arcade.release_file_reference('maintenance', filename)
+    db.session.commit()
+    assert arcade.delete_unreferenced_file('maintenance', filename)
+    assert not os.path.exists(path)
+    assert StoredFile.query.count() == 0
+
+
+def test_deduplicated_file_deleted_meanwhile_is_stored_again(store):
+    upload = _upload('green')
+    filename, saved = arcade.compress_and_store_image(upload, arcade.photo_folder('maintenance'))
+    assert saved
+    upload = _upload('green')
+    assert arcade.compress_and_store_image(upload, arcade.photo_folder('maintenance')) == (filename, {})
+    # The last reference to the file is dropped before this upload references it
+    arcade.delete_stored_file('maintenance', filename)
+
+    saved = arcade.reference_upload('maintenance', upload, filename, {})
+    db.session.commit()
+    assert saved and os.path.exists(arcade.media_path('maintenance', filename))
+    stored = StoredFile.query.filter_by(kind='maintenance', filename=filename).one()
+    assert (stored.ref_count, stored.size_bytes) == (1, sum(len(data) for _, data in saved.values()))
+
+
+def test_concurrent_first_references_are_both_counted(store):
+    filename, _ = arcade.compress_and_store_image(_upload('yellow'), arcade.photo_folder('maintenance'))
+    raced = []
+
+    def insert_competing_row(conn, cursor, statement, parameters, context, executemany):
+        # Another upload inserts the row right after this one found none
+        if statement.startswith('UPDATE stored_file') and not raced:
+            raced.append(statement)
+            cursor.connection.execute(
+                'INSERT INTO stored_file (kind, filename, size_bytes, ref_count) VALUES (?, ?, 0, 1)',
+                ('maintenance', filename))
+
+    event.listen(db.engine, 'after_cursor_execute', insert_competing_row)
+    try:
+        assert arcade.add_file_reference('maintenance', filename)
+        db.session.commit()
+    finally:
+        event.remove(db.engine, 'after_cursor_execute', insert_competing_row)
+    assert StoredFile.query.filter_by(kind='maintenance', filename=filename).one().ref_count == 2
+
+
+def test_cleanup_keeps_photos_with_references(store):
+    shared, _ = _store_and_reference('purple')
+    released, _ = _store_and_reference('orange')
+    assert arcade.release_file_reference('maintenance', released)
+    db.session.commit()
+
+    assert arcade.cleanup_old_photos(max_age_days=-1) == 1  # Every file counts as old
+    assert all(os.path.exists(arcade.media_path('maintenance', name)) for name in derivative_filenames(shared)
+               if name.endswith('.jpg'))
+    assert not any(os.path.exists(arcade.media_path('maintenance', name)) for name in derivative_filenames(released))
+    assert [stored.filename for stored in StoredFile.query.all()] == [shared]
+
+
+def test_photos_need_a_login():
+    response = app.test_client().get(f'/photos/maintenance/ab/12/{DIGEST}.jpg')
+    assert response.status_code == 302
+    assert '/login' in response.headers['Location']
+
+
+def test_photo_urls_do_not_touch_the_disk(monkeypatch):
+    def no_disk(*args, **kwargs):
+        raise AssertionError('URL built from the disk')
+
+    with app.test_request_context():
+        monkeypatch.setattr(os.path, 'exists', no_disk)
+        monkeypatch.setattr(os, 'stat', no_disk)
+        url = arcade.get_cloud_url(f'ab/12/{DIGEST}.jpg', 'thumb')
+        monkeypatch.undo()
+    assert url == f'/photos/maintenance/ab/12/{DIGEST}_thumb.jpg'
+
+
+def test_missing_derivative_is_served_full_size(store, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, 'WTF_CSRF_ENABLED', False)
+    folder = tmp_path / 'maintenance_photos' / 'ab' / '12'
+    folder.mkdir(parents=True)
+    (folder / f'{DIGEST}.jpg').write_bytes(b'full size')
+    if not User.query.filter_by(username='photo_viewer').first():
+        user = User(username='photo_viewer', role='readonly', must_change_password=False)
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.commit()
+
+    client = app.test_client()
+    assert login(client, 'photo_viewer', 'password123')
+    response = client.get(f'/photos/maintenance/ab/12/{DIGEST}_thumb.jpg')
+    assert response.status_code == 200
+    assert response.data == b'full size'
+    assert 'immutable' not in response.headers.get('Cache-Control', '')
+    assert client.get(f'/photos/maintenance/ab/12/{"cd" * 32}_thumb.jpg').status_code == 404
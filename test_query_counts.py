@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Query-count regression tests.
+
+Seeds a small and a large synthetic fleet and checks that every route stays
+within a fixed budget of SQL statements for both. A budget that only holds
+for the small fleet means a new N+1 query pattern was introduced.
+
+Run with: python -m pytest test_query_counts.py -q
+"""
+
+import base64
+import os
+import re
+import sys
+import zlib
+import pytest
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db, choose_revenue_bucket, maintenance_order_page, dashboard_payload, graphs_payload, Game, MaintenanceRecord, InventoryItem, PlayRecord
+from benchmark_routes import count_queries, install_template_fallback, login
+from generate_synthetic_data import generate
+
+FLEET_SIZES = [10, 1000]
+
+# Maximum SQL statements per request, including the logged in user lookup.
+# Budgets must not depend on the number of games - fix the query instead.
+QUERY_BUDGETS = {
+    'home': 5,
+    'games_list': 3,
+    'game_detail': 5,
+    'record_plays': 3,
+    'revenue_reports': 4,
+    'maintenance_reports': 2,
+    'maintenance_orders': 2,
+    'view_maintenance': 2,
+    'graphs': 4,
+    'graphs_data': 4,
+    'reports': 6,
+    'export_csv': 2,
+    'export_report': 7,
+    'export_revenue_report': 2,
+    'export_maintenance_report': 4,
+    'inventory_list': 4,
+    'inventory_detail': 4,
+    'low_stock_alerts': 3,
+    'inventory_requests_list': 3,
+    'manage_users': 2,
+    'storage_admin': 3,
+}
+
+
+@pytest.fixture(scope='module', params=FLEET_SIZES, ids=lambda n: f'{n}_games')
+def fleet(request):
+    """Fill the test database with a synthetic fleet of the given size"""
+    app.config['WTF_CSRF_ENABLED'] = False
+    install_template_fallback(app)
+    with app.app_context():
+        db.drop_all()
+        engine = db.engine
+        db_path = engine.url.database
+    generate(db_path, games=request.param, years=0.1, items=50, requests=20, verbose=False)
+    dashboard_payload.cache_clear()  # Budgets count the queries of cold dashboards
+    graphs_payload.cache_clear()
+    with app.app_context():
+        ids = {
+            'game_id': Game.query.filter_by(counter_status='Working').order_by(Game.id).first().id,
+            'maintenance_id': MaintenanceRecord.query.order_by(MaintenanceRecord.id).first().id,
+            'item_id': InventoryItem.query.order_by(InventoryItem.id).first().id,
+        }
+    return engine, ids
+
+
+@pytest.fixture
+def client(fleet):
+    client = app.test_client()
+    assert login(client, 'admin', 'password123')
+    return client
+
+
+def _url(endpoint, ids):
+    from flask import url_for
+
+    with app.test_request_context():
+        view_args = next(app.url_map.iter_rules(endpoint)).arguments
+        return url_for(endpoint, **{name: ids[name] for name in view_args})
+
+
+@pytest.mark.parametrize('endpoint', sorted(QUERY_BUDGETS))
+def test_route_query_budget(fleet, client, endpoint):
+    engine, ids = fleet
+    url = _url(endpoint, ids)
+    with count_queries(engine) as statements:
+        response = client.get(url)
+    assert response.status_code == 200, f'{url} returned {response.status_code}'
+    assert len(statements) <= QUERY_BUDGETS[endpoint], (
+        f'{url} ran {len(statements)} queries (budget {QUERY_BUDGETS[endpoint]}):\n' + '\n'.join(statements))
+
+
+def test_inventory_value_is_not_computed_from_loaded_items(fleet, client):
+    """The inventory total comes from one aggregate, not from every InventoryItem"""
+    engine, ids = fleet
+    with count_queries(engine) as statements:
+        client.get('/inventory')
+    full_item_loads = [s for s in statements if s.lstrip().startswith('SELECT inventory_item.id')]
+    assert len(full_item_loads) == 1  # Only the listed page of items
+
+
+def test_dashboard_is_reused_between_requests(fleet, client):
+    engine, ids = fleet
+    dashboard_payload.cache_clear()
+    client.get('/')
+    with count_queries(engine) as statements:
+        response = client.get('/')
+    assert response.status_code == 200
+    assert len(statements) == 1  # Only the logged in user
+
+
+def test_dashboard_floor_count_is_explicit(fleet):
+    with app.app_context():
+        payload = dashboard_payload()
+        floor_count = Game.query.filter_by(location='Floor').count()
+    assert payload['floor_count'] == floor_count
+    assert type(payload['floor_games_preview']) is list
+    assert len(payload['floor_games_preview']) == min(floor_count, 10)
+
+
+def test_graph_series_stay_small(fleet, client):
+    """The graphs page downloads compact series, not one entry per game"""
+    response = client.get('/graphs/data')
+    assert response.status_code == 200
+    assert len(response.get_json()['top_performers']['labels']) <= 10
+    assert len(response.data) < 4096
+
+
+def test_long_revenue_ranges_are_bucketed(fleet, client):
+    """A three year revenue report costs the same queries as the default 30 days"""
+    engine, ids = fleet
+    with count_queries(engine) as statements:
+        response = client.get('/revenue_reports?days=1100')
+    assert response.status_code == 200
+    assert len(statements) <= QUERY_BUDGETS['revenue_reports']
+
+    assert [choose_revenue_bucket(days) for days in (30, 365, 1100)] == ['day', 'week', 'month']
+    assert choose_revenue_bucket(30, 'week') == 'week'
+    assert choose_revenue_bucket(365, max_points=60) == 'week'
+    assert choose_revenue_bucket(365, 'day', max_points=20) == 'month'
+
+
+def test_maintenance_totals_come_from_sql(fleet, client):
+    """Counts and resolution times cover every order while only one page of rows is loaded"""
+    with app.test_request_context():
+        records = MaintenanceRecord.query.all()
+        closed = [r for r in records if r.status in ('Fixed', 'Deferred')]
+        resolution = sorted(max(1, (r.date_fixed.date() - r.date_reported.date()).days)
+                            for r in closed if r.date_fixed and r.date_reported)
+
+        page = maintenance_order_page(1, 5)
+        assert page['all_count'] == len(records)
+        assert len(page['all_records']) == min(5, len(records))
+        assert page['closed_count'] == len(closed)
+        assert page['total_cost'] == pytest.approx(sum(r.cost or 0 for r in closed))
+        assert page['max_closed_cost'] == pytest.approx(max((r.cost or 0 for r in closed), default=0))
+        assert page['costly_closed_count'] == len([r for r in closed if r.cost and r.cost > 50])
+        assert page['issue_categories']['screen'] == len(
+            [r for r in records if any(word in r.issue_description.lower() for word in ('screen', 'display', 'monitor'))])
+        assert page['avg_resolution_days'] == pytest.approx(sum(resolution) / len(resolution))
+        middle = (len(resolution) - 1) // 2
+        assert page['median_resolution_days'] == pytest.approx((resolution[middle] + resolution[-middle - 1]) / 2)
+
+        seen = [r.id for n in range(1, page['page_count'] + 1) for r in maintenance_order_page(n, 5)['all_records']]
+        assert sorted(seen) == sorted(r.id for r in records)
+
+
+def test_median_does_not_depend_on_page_size(fleet):
+    """An even number of resolved orders averages the two middle ones, whichever page is shown"""
+    from datetime import datetime, timedelta
+
+    with app.test_request_context():
+        game = Game(name='Median Test', location='Warehouse')
+        db.session.add(game)
+        db.session.flush()
+        reported = datetime(2024, 1, 10)
+        for days in (2, 3, 1, 10):
+            db.session.add(MaintenanceRecord(game_id=game.id, issue_description='Test', status='Fixed',
+                                             date_reported=reported, date_fixed=reported + timedelta(days=days)))
+        db.session.commit()
+        try:
+            for per_page in (1, 2, 50):
+                page = maintenance_order_page(1, per_page, MaintenanceRecord.game_id == game.id)
+                assert page['median_resolution_days'] == 2.5
+                assert page['avg_resolution_days'] == 4
+        finally:
+            MaintenanceRecord.query.filter_by(game_id=game.id).delete()
+            db.session.delete(game)
+            db.session.commit()
+
+
+@pytest.mark.parametrize('url', ['/export_maintenance_report?type=all&days=3650&detail=full',
+                                 '/export_revenue_report?days=7&detail=full'])
+def test_full_detail_exports_stream_rows(fleet, client, url):
+    """Full-detail PDFs fetch rows in batches from a fixed set of queries, whatever the row count"""
+    engine, ids = fleet
+    with count_queries(engine) as statements:
+        response = client.get(url)
+        pdf = response.data
+    assert response.status_code == 200
+    assert response.mimetype == 'application/pdf'
+    assert pdf.startswith(b'%PDF')
+    assert len(statements) <= 4  # The logged in user, the summary and one query per table
+
+
+def test_full_revenue_export_lays_out_every_row(fleet, client):
+    """The streamed story is consumed to the end, so a long export has every page and row"""
+    days = 30
+    with app.app_context():
+        conditions = (PlayRecord.date_recorded >= date.today() - timedelta(days=days),
+                      Game.location == 'Floor', Game.counter_status == 'Working')
+        rows = PlayRecord.query.join(Game).filter(*conditions).count()
+        oldest = db.session.query(db.func.min(PlayRecord.date_recorded)).join(Game).filter(*conditions).scalar()
+    response = client.get(f'/export_revenue_report?days={days}&detail=full')
+    assert response.status_code == 200
+
+    pdf = response.data
+    pages = len(re.findall(rb'/Type /Page\b(?!s)', pdf))
+    assert pages > 1
+    assert pages >= rows // 60  # No page holds more than ~50 play record rows
+    # Page contents are ASCII85 encoded and deflated
+    text = b''.join(zlib.decompress(base64.a85decode(stream.strip(), adobe=True))
+                    for stream in re.findall(rb'stream\r?\n(.*?)endstream', pdf, re.S))
+    assert f'({oldest:%Y-%m-%d})'.encode() in text  # The last row of the last table
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests for the MTBF/MTTR reliability numbers.
+
+Run with: python -m pytest test_reliability.py -q
+"""
+
+import os
+import sys
+import pytest
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db, reliability_stats, Game, MaintenanceRecord
+from benchmark_routes import count_queries, install_template_fallback, login
+from generate_synthetic_data import generate
+
+
+@pytest.fixture(scope='module')
+def fleet():
+    """A small synthetic fleet in the test database"""
+    app.config['WTF_CSRF_ENABLED'] = False
+    install_template_fallback(app)
+    with app.app_context():
+        db.drop_all()
+        engine = db.engine
+    generate(engine.url.database, games=20, years=0.5, items=5, requests=0, verbose=False)
+    reliability_stats.clear()
+    return engine
+
+
+def _expected(records):
+    """MTBF and MTTR of one game's work orders, computed in Python"""
+    records = sorted(records, key=lambda r: (r.date_reported, r.id))
+    gaps = [(b.date_reported - a.date_reported).total_seconds() / 86400 for a, b in zip(records, records[1:])]
+    repairs = [(r.date_fixed - r.date_reported).total_seconds() / 86400 for r in records
+               if r.status in ('Fixed', 'Deferred') and r.date_fixed]
+    return (sum(gaps) / len(gaps) if gaps else None,
+            sum(repairs) / len(repairs) if repairs else None)
+
+
+def test_per_game_numbers_match_python(fleet):
+    with app.app_context():
+        by_game = {row['game']: row for row in reliability_stats.by('game')}
+        records = {}
+        for record in MaintenanceRecord.query.all():
+            records.setdefault(record.game_id, []).append(record)
+
+        assert set(by_game) == set(records)
+        for game_id, game_records in records.items():
+            mtbf, mttr = _expected(game_records)
+            assert by_game[game_id]['failures'] == len(game_records)
+            assert by_game[game_id]['mtbf_days'] == pytest.approx(mtbf, abs=0.01)
+            assert by_game[game_id]['mttr_days'] == pytest.approx(mttr, abs=0.01)
+
+        manufacturers = reliability_stats.by('manufacturer')
+        assert sum(row['failures'] for row in manufacturers) == sum(map(len, records.values()))
+        with pytest.raises(ValueError):
+            reliability_stats.by('colour')
+
+
+def test_closing_an_order_refreshes_only_its_game(fleet):
+    with app.app_context():
+        reliability_stats.games()
+        game = Game.query.order_by(Game.id).first()
+        reported = datetime.now() - timedelta(days=2)
+        order = MaintenanceRecord(game_id=game.id, issue_description='Coin door jammed', status='Open',
+                                  date_reported=reported)
+        db.session.add(order)
+        db.session.commit()
+        order.status = 'Fixed'
+        order.date_fixed = reported + timedelta(days=1)
+        db.session.commit()
+
+        with count_queries(fleet) as statements:
+            by_game = {row['game']: row for row in reliability_stats.by('game')}
+        assert len(statements) == 1
+        assert 'IN' in statements[0]  # Only the changed game is queried
+        records = MaintenanceRecord.query.filter_by(game_id=game.id).all()
+        assert by_game[game.id]['failures'] == len(records)
+        assert by_game[game.id]['mttr_days'] == pytest.approx(_expected(records)[1], abs=0.01)
+
+        with count_queries(fleet) as statements:
+            reliability_stats.by('genre')
+        assert not statements
+
+
+def test_any_work_order_write_refreshes_its_game(fleet):
+    with app.app_context():
+        order = MaintenanceRecord.query.filter(MaintenanceRecord.status == 'Fixed',
+                                               MaintenanceRecord.date_fixed.isnot(None)).first()
+        game_id = order.game_id
+        reliability_stats.games()
+        order.date_fixed = order.date_fixed + timedelta(days=30)  # Only the date changes
+        db.session.commit()
+
+        by_game = {row['game']: row for row in reliability_stats.by('game')}
+        records = MaintenanceRecord.query.filter_by(game_id=game_id).all()
+        assert by_game[game_id]['mttr_days'] == pytest.approx(_expected(records)[1], abs=0.01)
+
+        order.date_fixed = order.date_fixed + timedelta(days=1)
+        db.session.rollback()  # Rolled back changes don't refresh anything
+        with count_queries(fleet) as statements:
+            reliability_stats.games()
+        assert not statements
+
+    client = app.test_client()
+    assert login(client, 'admin', 'password123')
+    client.post(f'/delete_game/{game_id}')
+    with app.app_context():
+        assert db.session.get(Game, game_id) is None
+        assert game_id not in {row['game'] for row in reliability_stats.by('game')}
+
+
+def test_reliability_api(fleet):
+    client = app.test_client()
+    assert app.test_client().get('/api/v1/reliability').status_code == 401
+    assert login(client, 'admin', 'password123')
+
+    response = client.get('/api/v1/reliability?group=genre')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['group'] == 'genre'
+    assert all({'genre', 'games', 'failures', 'repairs', 'mtbf_days', 'mttr_days'} == set(row) for row in body['data'])
+    assert client.get('/api/v1/reliability?group=colour').status_code == 400